@@ -1,5 +1,6 @@
 from typing import Mapping, Optional
 
+from ...helper.cache import UserInfoCache
 from .._classdef import Containers
 
 
@@ -107,6 +108,7 @@ class UserInfo_at(object):
         else:
             self._priv_like = 1
             self._priv_reply = 1
+        UserInfoCache.add_user(self._user_id, self._portrait, self._user_name)
         return self
 
     def _init_null(self) -> "UserInfo_at":
@@ -1,5 +1,6 @@
 from typing import List, Optional
 
+from ...helper.cache import UserInfoCache
 from .._classdef import TypeMessage
 
 
@@ -34,6 +35,7 @@ class UserInfo_bawu(object):
         self._user_name = data_proto.user_name
         self._nick_name_new = data_proto.name_show
         self._level = data_proto.user_level
+        UserInfoCache.add_user(self._user_id, self._portrait, self._user_name)
 
     def __str__(self) -> str:
         return self._user_name or self._portrait or str(self._user_id)
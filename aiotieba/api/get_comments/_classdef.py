@@ -1,6 +1,7 @@
 from typing import Iterable, List, Optional
 
 from ...helper import removeprefix
+from ...helper.cache import UserInfoCache
 from .._classdef import Containers, Forum, TypeMessage
 from .._classdef.contents import (
     FragAt,
@@ -224,6 +225,7 @@ class UserInfo_c(object):
         self._is_god = bool(data_proto.new_god_data.status)
         self._priv_like = priv_like if (priv_like := data_proto.priv_sets.like) else 1
         self._priv_reply = priv_reply if (priv_reply := data_proto.priv_sets.reply) else 1
+        UserInfoCache.add_user(self._user_id, self._portrait, self._user_name)
         return self
 
     def _init_null(self) -> "UserInfo_c":
@@ -760,6 +762,7 @@ class UserInfo_ct(object):
         self._nick_name_new = data_proto.name_show
         self._level = data_proto.level_id
         self._is_god = bool(data_proto.new_god_data.status)
+        UserInfoCache.add_user(self._user_id, self._portrait, self._user_name)
         return self
 
     def _init_null(self) -> "UserInfo_ct":
@@ -1364,6 +1367,7 @@ class UserInfo_cp(object):
         self._is_god = bool(data_proto.new_god_data.status)
         self._priv_like = priv_like if (priv_like := data_proto.priv_sets.like) else 1
         self._priv_reply = priv_reply if (priv_reply := data_proto.priv_sets.reply) else 1
+        UserInfoCache.add_user(self._user_id, self._portrait, self._user_name)
         return self
 
     def _init_null(self) -> "UserInfo_cp":
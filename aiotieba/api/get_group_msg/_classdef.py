@@ -1,5 +1,6 @@
 from typing import List
 
+from ...helper.cache import UserInfoCache
 from .._classdef import TypeMessage
 
 
@@ -28,6 +29,7 @@ class UserInfo_ws(object):
         else:
             self._portrait = portrait
         self._user_name = data_proto.userName
+        UserInfoCache.add_user(self._user_id, self._portrait, self._user_name)
         return self
 
     def _init_null(self) -> "UserInfo_ws":
@@ -1,5 +1,6 @@
 from typing import Iterable, List, Optional
 
+from ...helper.cache import UserInfoCache
 from .._classdef import Containers, TypeMessage, VoteInfo
 from .._classdef.contents import FragAt, FragEmoji, FragLink, FragmentUnknown, FragText, TypeFragment, TypeFragText
 
@@ -145,6 +146,7 @@ class UserInfo_home(object):
             self._is_god = bool(data_proto.new_god_data.status)
             self._priv_like = priv_like if (priv_like := data_proto.priv_sets.like) else 1
             self._priv_reply = priv_reply if (priv_reply := data_proto.priv_sets.reply) else 1
+            UserInfoCache.add_user(self._user_id, self._portrait, self._user_name)
 
         else:
             self._user_id = 0
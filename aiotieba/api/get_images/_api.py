@@ -25,21 +25,34 @@ def headers_checker(response: aiohttp.ClientResponse) -> None:
         raise ContentTypeError(f"Expect jpeg, png or bmp, got {response.content_type}")
 
 
-def parse_body(body: bytes) -> "np.ndarray":
+def parse_body(body: bytes, reduce: int = 1) -> "np.ndarray":
     import cv2 as cv
     import numpy as np
 
-    image = cv.imdecode(np.frombuffer(body, np.uint8), cv.IMREAD_COLOR)
+    if reduce == 1:
+        flags = cv.IMREAD_COLOR
+    elif reduce == 2:
+        flags = cv.IMREAD_REDUCED_COLOR_2
+    elif reduce == 4:
+        flags = cv.IMREAD_REDUCED_COLOR_4
+    elif reduce == 8:
+        flags = cv.IMREAD_REDUCED_COLOR_8
+    else:
+        raise ValueError(f"Invalid reduce={reduce}")
+
+    image = cv.imdecode(np.frombuffer(body, np.uint8), flags)
     if image is None:
         raise RuntimeError("Error in cv2.imdecode")
 
     return image
 
 
-async def request(http_core: HttpCore, url: yarl.URL) -> "np.ndarray":
+async def request(http_core: HttpCore, url: yarl.URL, max_size: int = 0, reduce: int = 1) -> "np.ndarray":
     request = pack_web_get_request(http_core, url, [])
 
     __log__ = "url={url}"  # noqa: F841
 
-    body = await send_request(request, http_core.network, read_bufsize=512 * 1024, headers_checker=headers_checker)
-    return parse_body(body)
+    body = await send_request(
+        request, http_core.network, read_bufsize=512 * 1024, headers_checker=headers_checker, max_size=max_size
+    )
+    return parse_body(body, reduce)
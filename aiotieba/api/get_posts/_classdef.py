@@ -1,6 +1,7 @@
-from typing import Iterable, List, Optional
+from typing import TYPE_CHECKING, Iterable, List, Optional
 
 from ...helper import removeprefix
+from ...helper.cache import UserInfoCache
 from .._classdef import Containers, Forum, TypeMessage, VirtualImage, VoteInfo
 from .._classdef.contents import (
     FragAt,
@@ -13,6 +14,9 @@ from .._classdef.contents import (
     TypeFragText,
 )
 
+if TYPE_CHECKING:
+    from ..get_comments import Comment as Comment_c
+
 Forum_p = Forum
 VirtualImage_p = VirtualImage
 
@@ -732,6 +736,7 @@ class UserInfo_p(object):
         self._is_god = bool(data_proto.new_god_data.status)
         self._priv_like = priv_like if (priv_like := data_proto.priv_sets.like) else 1
         self._priv_reply = priv_reply if (priv_reply := data_proto.priv_sets.reply) else 1
+        UserInfoCache.add_user(self._user_id, self._portrait, self._user_name)
         return self
 
     def _init_null(self) -> "UserInfo_p":
@@ -944,6 +949,7 @@ class Post(object):
         contents (Contents_p): 正文内容碎片列表
         sign (str): 小尾巴文本内容
         comments (list[Comment_p]): 楼中楼列表
+        all_comments (list[Comment_c]): 展开后的完整楼中楼列表
 
         fid (int): 所在吧id
         fname (str): 所在贴吧名
@@ -966,6 +972,7 @@ class Post(object):
         '_contents',
         '_sign',
         '_comments',
+        '_all_comments',
         '_fid',
         '_fname',
         '_tid',
@@ -986,6 +993,7 @@ class Post(object):
         self._contents = Contents_p()._init(data_proto.content)
         self._sign = "".join(p.text for p in data_proto.signature.content if p.type == 0)
         self._comments = [Comment_p(p) for p in data_proto.sub_post_list.sub_post_list]
+        self._all_comments = []
         self._pid = data_proto.id
         self._author_id = data_proto.author_id
         self._vimage = VirtualImage_p()._init(data_proto)
@@ -1055,6 +1063,18 @@ class Post(object):
 
         return self._comments
 
+    @property
+    def all_comments(self) -> List["Comment_c"]:
+        """
+        展开后的完整楼中楼列表
+
+        Note:
+            仅在get_posts的expand_comments为True且该楼层的楼中楼被截断时填充 否则为空列表
+            元素类型与get_comments返回的楼中楼相同
+        """
+
+        return self._all_comments
+
     @property
     def fid(self) -> int:
         """
@@ -1603,6 +1623,7 @@ class UserInfo_pt(object):
         self._is_god = bool(data_proto.new_god_data.status)
         self._priv_like = priv_like if (priv_like := data_proto.priv_sets.like) else 1
         self._priv_reply = priv_reply if (priv_reply := data_proto.priv_sets.reply) else 1
+        UserInfoCache.add_user(self._user_id, self._portrait, self._user_name)
         return self
 
     def _init_null(self) -> "UserInfo_pt":
@@ -1,5 +1,6 @@
 from typing import Optional
 
+from ...helper.cache import UserInfoCache
 from .._classdef import Containers, TypeMessage
 
 
@@ -40,6 +41,7 @@ class UserInfo_reply(object):
         self._nick_name_new = data_proto.name_show
         self._priv_like = priv_like if (priv_like := data_proto.priv_sets.like) else 1
         self._priv_reply = priv_reply if (priv_reply := data_proto.priv_sets.reply) else 1
+        UserInfoCache.add_user(self._user_id, self._portrait, self._user_name)
         return self
 
     def _init_null(self) -> "UserInfo_reply":
@@ -197,6 +199,7 @@ class UserInfo_reply_p(object):
         self._user_id = data_proto.id
         self._user_name = data_proto.name
         self._nick_name_new = data_proto.name_show
+        UserInfoCache.add_user(self._user_id, '', self._user_name)
         return self
 
     def _init_null(self) -> "UserInfo_reply_p":
@@ -313,6 +316,7 @@ class UserInfo_reply_t(object):
         self._user_id = data_proto.id
         self._portrait = data_proto.portrait
         self._nick_name_new = data_proto.name_show
+        UserInfoCache.add_user(self._user_id, self._portrait, '')
         return self
 
     def _init_null(self) -> "UserInfo_reply_t":
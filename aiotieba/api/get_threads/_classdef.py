@@ -1,5 +1,6 @@
 from typing import Dict, Iterable, List, Optional
 
+from ...helper.cache import UserInfoCache
 from .._classdef import Containers, Forum, TypeMessage, VirtualImage, VoteInfo
 from .._classdef.contents import (
     FragAt,
@@ -477,6 +478,7 @@ class UserInfo_t(object):
         self._is_god = bool(data_proto.new_god_data.status)
         self._priv_like = priv_like if (priv_like := data_proto.priv_sets.like) else 1
         self._priv_reply = priv_reply if (priv_reply := data_proto.priv_sets.reply) else 1
+        UserInfoCache.add_user(self._user_id, self._portrait, self._user_name)
         return self
 
     def _init_null(self) -> "UserInfo_t":
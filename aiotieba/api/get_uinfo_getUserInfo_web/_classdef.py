@@ -1,5 +1,7 @@
 from typing import Mapping, Optional
 
+from ...helper.cache import UserInfoCache
+
 
 class UserInfo_guinfo_web(object):
     """
@@ -29,6 +31,7 @@ class UserInfo_guinfo_web(object):
             self._portrait = data_map['portrait']
             self._user_name = user_name if (user_name := data_map['uname']) != self._user_id else ''
             self._nick_name_new = data_map['show_nickname']
+            UserInfoCache.add_user(self._user_id, self._portrait, self._user_name)
         else:
             self._user_id = 0
             self._portrait = ''
@@ -1,5 +1,6 @@
 from typing import Optional
 
+from ...helper.cache import UserInfoCache
 from .._classdef import TypeMessage
 
 
@@ -44,6 +45,7 @@ class UserInfo_guinfo_app(object):
             self._gender = data_proto.sex
             self._is_vip = bool(data_proto.vipInfo.v_status)
             self._is_god = bool(data_proto.new_god_data.status)
+            UserInfoCache.add_user(self._user_id, self._portrait, self._user_name)
         else:
             self._user_id = 0
             self._portrait = ''
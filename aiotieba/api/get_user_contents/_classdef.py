@@ -1,5 +1,6 @@
 from typing import Iterable, List
 
+from ...helper.cache import UserInfoCache
 from .._classdef import Containers, TypeMessage, VoteInfo
 from .._classdef.contents import FragAt, FragEmoji, FragLink, FragmentUnknown, FragText, TypeFragment, TypeFragText
 
@@ -138,6 +139,7 @@ class UserInfo_u(object):
             self._portrait = portrait
         self._user_name = data_proto.user_name
         self._nick_name_new = data_proto.name_show
+        UserInfoCache.add_user(self._user_id, self._portrait, self._user_name)
 
     def __str__(self) -> str:
         return self._user_name or self._portrait or str(self._user_id)
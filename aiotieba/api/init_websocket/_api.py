@@ -1,12 +1,13 @@
 import binascii
+import functools
 import time
-from typing import List
+from typing import List, Optional
 
 from Crypto.Cipher import PKCS1_v1_5
 from Crypto.PublicKey import RSA
 
 from ...const import MAIN_VERSION
-from ...core import Account, WsCore
+from ...core import Account, WsConnection, WsCore
 from ...exception import TiebaServerError
 from ...helper import pack_json
 from ._classdef import WsMsgGroupInfo
@@ -20,6 +21,17 @@ PUBLIC_KEY = binascii.a2b_base64(
 )
 
 
+@functools.lru_cache(maxsize=1)
+def _rsa_chiper() -> PKCS1_v1_5.PKCS115_Cipher:
+    return PKCS1_v1_5.new(RSA.import_key(PUBLIC_KEY))
+
+
+@functools.lru_cache(maxsize=64)
+def _encrypt_sec_key(aes_ecb_sec_key: bytes) -> bytes:
+    # 密钥在账号的生命周期内不变 重连时复用加密结果以省去RSA运算
+    return _rsa_chiper().encrypt(aes_ecb_sec_key)
+
+
 def pack_proto(core: Account) -> bytes:
     req_proto = UpdateClientInfoReqIdl_pb2.UpdateClientInfoReqIdl()
     req_proto.data.bduss = core._BDUSS
@@ -34,9 +46,7 @@ def pack_proto(core: Account) -> bytes:
     }
     req_proto.data.device = pack_json(device)
 
-    rsa_chiper = PKCS1_v1_5.new(RSA.import_key(PUBLIC_KEY))
-    secret_key = rsa_chiper.encrypt(core.aes_ecb_sec_key)
-    req_proto.data.secretKey = secret_key
+    req_proto.data.secretKey = _encrypt_sec_key(core.aes_ecb_sec_key)
     req_proto.data.stoken = core._STOKEN
     req_proto.cuid = f"{core.cuid}|com.baidu.tieba{MAIN_VERSION}"
 
@@ -55,10 +65,10 @@ def parse_body(body: bytes) -> List[WsMsgGroupInfo]:
     return groups
 
 
-async def request(ws_core: WsCore) -> List[WsMsgGroupInfo]:
+async def request(ws_core: WsCore, conn: Optional[WsConnection] = None) -> List[WsMsgGroupInfo]:
     data = pack_proto(ws_core.account)
 
-    resp = await ws_core.send(data, CMD, compress=False, encrypt=False)
+    resp = await ws_core.send(data, CMD, compress=False, encrypt=False, conn=conn)
     groups = parse_body(await resp.read())
 
     return groups
@@ -54,14 +54,15 @@ async def request(http_core: HttpCore):
         query_string=f'skey={req_query_skey}',
     )
 
+    proxy, proxy_auth = http_core.network.select_proxy()
     request = aiohttp.ClientRequest(
         aiohttp.hdrs.METH_POST,
         url,
         headers=headers,
         data=payload,
         loop=http_core.loop,
-        proxy=http_core.network.proxy,
-        proxy_auth=http_core.network.proxy,
+        proxy=proxy,
+        proxy_auth=proxy_auth,
         ssl=False,
     )
 
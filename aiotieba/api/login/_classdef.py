@@ -1,5 +1,7 @@
 from typing import Mapping, Optional
 
+from ...helper.cache import UserInfoCache
+
 
 class UserInfo_login(object):
     """
@@ -22,6 +24,7 @@ class UserInfo_login(object):
             self._user_id = int(data_map['id'])
             self._portrait = data_map['portrait']
             self._user_name = data_map['name']
+            UserInfoCache.add_user(self._user_id, self._portrait, self._user_name)
         else:
             self._user_id = 0
             self._portrait = ''
@@ -1,2 +1,2 @@
 from ._api import CMD, parse_body
-from ._classdef import WsNotify
+from ._classdef import NotifyStream, WsNotify
@@ -1,4 +1,10 @@
+import asyncio
+import collections
+from typing import Awaitable, Callable, Deque, Optional, Union
+
+from ...enums import OverflowPolicy
 from .._classdef import TypeMessage
+from ..get_group_msg import WsMsgGroup
 
 
 class WsNotify(object):
@@ -74,3 +80,129 @@ class WsNotify(object):
         """
 
         return self._create_time
+
+
+TypeNotifyItem = Union[WsNotify, WsMsgGroup]
+
+
+class NotifyStream(object):
+    """
+    websocket主动推送的异步迭代流
+
+    Args:
+        loop (asyncio.AbstractEventLoop): 事件循环
+        maxsize (int, optional): 缓冲队列的最大长度. Defaults to 256.
+        overflow (OverflowPolicy, optional): 缓冲队列已满时的处理策略. Defaults to OverflowPolicy.DROP_OLDEST.
+        fetch_msgs (bool, optional): True则迭代得到推送所对应的消息组WsMsgGroup False则迭代得到推送提醒WsNotify.
+            Defaults to False.
+
+    Attributes:
+        dropped (int): 因缓冲队列已满而被丢弃的条目数
+
+    Note:
+        流被关闭后 仍会先迭代完缓冲队列中剩余的条目再结束
+    """
+
+    __slots__ = [
+        'maxsize',
+        'overflow',
+        'fetch_msgs',
+        'dropped',
+        '_items',
+        '_waiter',
+        '_closed',
+        '_start',
+        '_on_close',
+        'loop',
+    ]
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        maxsize: int = 256,
+        overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        fetch_msgs: bool = False,
+    ) -> None:
+        self.loop = loop
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.fetch_msgs = fetch_msgs
+        self.dropped = 0
+
+        self._items: Deque[TypeNotifyItem] = collections.deque()
+        self._waiter: Optional[asyncio.Future] = None
+        self._closed = False
+        self._start: Optional[Callable[[], Awaitable[bool]]] = None
+        self._on_close: Optional[Callable[["NotifyStream"], None]] = None
+
+    async def __aenter__(self) -> "NotifyStream":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __aiter__(self) -> "NotifyStream":
+        return self
+
+    async def __anext__(self) -> TypeNotifyItem:
+        if self._start is not None:
+            start, self._start = self._start, None
+            if not await start():
+                self.close()
+
+        while not self._items:
+            if self._closed:
+                raise StopAsyncIteration
+            self._waiter = self.loop.create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+
+        return self._items.popleft()
+
+    @property
+    def closed(self) -> bool:
+        """
+        流是否已关闭
+        """
+
+        return self._closed
+
+    def put(self, item: TypeNotifyItem) -> None:
+        """
+        向缓冲队列放入一个条目
+
+        Args:
+            item (WsNotify | WsMsgGroup): 待放入的条目
+        """
+
+        if self._closed:
+            return
+
+        if len(self._items) >= self.maxsize:
+            self.dropped += 1
+            if self.overflow == OverflowPolicy.DROP_NEWEST:
+                return
+            self._items.popleft()
+
+        self._items.append(item)
+        self.__wakeup()
+
+    def close(self) -> None:
+        """
+        关闭流 不再接收新的推送
+        """
+
+        if self._closed:
+            return
+        self._closed = True
+        self.__wakeup()
+
+        if self._on_close is not None:
+            on_close, self._on_close = self._on_close, None
+            on_close(self)
+
+    def __wakeup(self) -> None:
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
@@ -1,5 +1,6 @@
 from typing import Optional
 
+from ...helper.cache import UserInfoCache
 from .._classdef import TypeMessage
 
 
@@ -48,6 +49,7 @@ class UserInfo_TUid(object):
             self._age = float(data_proto.tb_age)
             self._sign = data_proto.intro
             self._is_god = bool(data_proto.new_god_data.status)
+            UserInfoCache.add_user(self._user_id, self._portrait, self._user_name)
         else:
             self._user_id = 0
             self._portrait = ''
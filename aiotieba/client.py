@@ -1,6 +1,20 @@
 import asyncio
+import collections
 import socket
-from typing import TYPE_CHECKING, Dict, List, Literal, Optional, Tuple, Union
+import time
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import aiohttp
 import yarl
@@ -57,6 +71,7 @@ from .api import (
     init_z_id,
     login,
     move,
+    push_notify,
     recommend,
     recover,
     remove_fan,
@@ -79,11 +94,42 @@ from .api import (
 )
 from .api._classdef import UserInfo
 from .api.get_homepage import UserInfo_home
-from .core import Account, HttpCore, Network, TimeConfig, WsCore
-from .helper import GroupType, PostSortType, ReqUInfo, ThreadSortType, WsStatus, handle_exception, is_portrait
-from .helper.cache import ForumInfoCache
+from .const import APP_BASE_HOST, APP_SECURE_SCHEME, WEB_BASE_HOST
+from .core import (
+    REQUEST_PRIORITY,
+    Account,
+    CircuitBreakers,
+    Hedger,
+    HttpCore,
+    Network,
+    PinnedResolver,
+    ProxyPool,
+    RateLimiter,
+    RequestBudget,
+    SharedNetwork,
+    TimeConfig,
+    WsConnection,
+    WsCore,
+    request_priority,
+)
+from .exception import PageFetchError
+from .helper import (
+    GroupType,
+    OverflowPolicy,
+    PostSortType,
+    Priority,
+    ReqUInfo,
+    ThreadSortType,
+    WsStatus,
+    handle_exception,
+    is_portrait,
+)
+from .helper.cache import ForumInfoCache, UserInfoCache
+from .helper.retry import RetryPolicies
+from .helper.singleflight import SingleFlight
 from .logging import get_logger as LOG
-from .typing import TypeUserInfo
+from .request import warmup_conns
+from .typing import Comments, Posts, Threads, TypeUserInfo
 
 if TYPE_CHECKING:
     import numpy as np
@@ -92,7 +138,7 @@ if TYPE_CHECKING:
 def _try_websocket(func):
     async def awrapper(self: "Client", *args, **kwargs):
         if self._try_ws:
-            await self.init_websocket()
+            await self._try_init_websocket()
         return await func(self, *args, **kwargs)
 
     awrapper.__name__ = func.__name__
@@ -110,6 +156,94 @@ def _force_websocket(func):
     return awrapper
 
 
+def _priority(priority: Priority):
+    """
+    设置方法的默认请求优先级
+    若调用方已通过request_priority指定优先级 则沿用调用方的优先级
+    """
+
+    def wrapper(func):
+        async def awrapper(self: "Client", *args, **kwargs):
+            if REQUEST_PRIORITY.get() is not None:
+                return await func(self, *args, **kwargs)
+            with request_priority(priority):
+                return await func(self, *args, **kwargs)
+
+        awrapper.__name__ = func.__name__
+
+        return awrapper
+
+    return wrapper
+
+
+def _retry(func):
+    async def awrapper(self: "Client", *args, **kwargs):
+        return await self._retry_policies.call(func.__name__, lambda: func(self, *args, **kwargs))
+
+    awrapper.__name__ = func.__name__
+
+    return awrapper
+
+
+def _single_flight(func):
+    async def awrapper(self: "Client", *args, **kwargs):
+        return await self._single_flight.do(func.__name__, args, kwargs, lambda: func(self, *args, **kwargs))
+
+    awrapper.__name__ = func.__name__
+
+    return awrapper
+
+
+TypePage = TypeVar('TypePage', Threads, Posts, Comments)
+
+
+async def _iter_pages(fetch: Callable[[int], Awaitable[TypePage]], pn: int, prefetch: int) -> AsyncIterator[TypePage]:
+    """
+    逐页迭代 并在调用者处理当前页时预取后继页
+
+    Args:
+        fetch (Callable[[int], Awaitable[TypePage]]): 输入页码返回该页内容的协程函数
+        pn (int): 起始页码
+        prefetch (int): 预取深度
+
+    Yields:
+        TypePage: 页内容
+
+    Raises:
+        PageFetchError: 某一页请求失败 此时返回的是空页 不能据此判断已到达末页
+    """
+
+    async def fetch_bulk(_pn: int) -> TypePage:
+        # 预取任务默认以批量爬取的优先级发出请求
+        if REQUEST_PRIORITY.get() is not None:
+            return await fetch(_pn)
+        with request_priority(Priority.BULK):
+            return await fetch(_pn)
+
+    prefetch = max(prefetch, 0)
+    tasks = collections.deque(asyncio.ensure_future(fetch_bulk(pn + i)) for i in range(prefetch + 1))
+    next_pn = pn + prefetch + 1
+
+    try:
+        while tasks:
+            page = await tasks.popleft()
+            # 请求失败时返回的空页没有页码
+            if not page.page.current_page:
+                raise PageFetchError(next_pn - len(tasks) - 1)
+            if not page.has_more:
+                if page:
+                    yield page
+                break
+
+            tasks.append(asyncio.ensure_future(fetch_bulk(next_pn)))
+            next_pn += 1
+            yield page
+
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
 class Client(object):
     """
     贴吧客户端
@@ -121,14 +255,32 @@ class Client(object):
             输入一个 (http代理地址, 代理验证) 的元组以手动设置代理. Defaults to False.
         time_cfg (TimeConfig, optional): 各种时间设置. Defaults to TimeConfig().
         loop (asyncio.AbstractEventLoop, optional): 事件循环. Defaults to None.
+        rate_limiter (RateLimiter, optional): 请求限流器 None则不限流. Defaults to None.
+        hedger (Hedger, optional): http读请求的对冲配置 None则不启用对冲. Defaults to None.
+        breakers (CircuitBreakers, optional): 熔断器组 None则不启用熔断. Defaults to None.
+        shared_network (SharedNetwork, optional): 与其他Client共享的网络上下文 None则独占一个连接器. Defaults to None.
+        request_budget (RequestBudget, optional): 在途请求预算 超出预算的请求将排队等待 None则不限制. Defaults to None.
+        proxy_pool (ProxyPool, optional): 代理池 设置后将忽略proxy参数 按策略为每个请求选择代理. Defaults to None.
+        resolver (PinnedResolver, optional): 在后台刷新解析结果的dns解析器 仅在未设置shared_network时有效
+            None则使用连接器自带的dns缓存. Defaults to None.
+        ws_pool_size (int, optional): websocket连接数 请求将被发往未完成请求最少的连接. Defaults to 1.
+        ws_reconnect (bool, optional): websocket意外断开时在后台自动重连 并重放未完成的幂等请求. Defaults to True.
+        ws_offload_threshold (int, optional): 不小于该字节数的websocket帧将在线程池中解密与解压
+            不大于0则始终在事件循环中解包. Defaults to 0.
     """
 
     __slots__ = [
         '_connector',
+        '_shared_network',
         '_account',
         '_http_core',
         '_ws_core',
         '_try_ws',
+        '_single_flight',
+        '_retry_policies',
+        '_keeper',
+        '_notify_streams',
+        '_msg_id_lock',
         '_user',
     ]
 
@@ -139,19 +291,39 @@ class Client(object):
         proxy: Union[Tuple[yarl.URL, aiohttp.BasicAuth], bool] = False,
         time_cfg: TimeConfig = TimeConfig(),
         loop: Optional[asyncio.AbstractEventLoop] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        hedger: Optional[Hedger] = None,
+        breakers: Optional[CircuitBreakers] = None,
+        shared_network: Optional[SharedNetwork] = None,
+        request_budget: Optional[RequestBudget] = None,
+        proxy_pool: Optional[ProxyPool] = None,
+        resolver: Optional[PinnedResolver] = None,
+        ws_pool_size: int = 1,
+        ws_reconnect: bool = True,
+        ws_offload_threshold: int = 0,
     ) -> None:
         if loop is None:
             loop = asyncio.get_running_loop()
 
-        connector = aiohttp.TCPConnector(
-            ttl_dns_cache=time_cfg.dns_ttl,
-            family=socket.AF_INET,
-            keepalive_timeout=time_cfg.http_keepalive,
-            limit=0,
-            ssl=False,
-            loop=loop,
-        )
+        if shared_network is None:
+            connector = aiohttp.TCPConnector(
+                use_dns_cache=resolver is None,
+                ttl_dns_cache=time_cfg.dns_ttl,
+                resolver=resolver,
+                family=socket.AF_INET,
+                keepalive_timeout=time_cfg.http_keepalive,
+                limit=0,
+                ssl=False,
+                loop=loop,
+            )
+            budget = None
+            bufsizes = None
+        else:
+            connector = shared_network.connector
+            budget = shared_network.budget
+            bufsizes = shared_network.bufsizes
         self._connector = connector
+        self._shared_network = shared_network
 
         if proxy is False:
             proxy = (None, None)
@@ -164,11 +336,19 @@ class Client(object):
 
         core = Account(BDUSS_key)
         self._account = core
-        network = Network(connector, time_cfg, proxy)
+        network = Network(
+            connector, time_cfg, proxy, rate_limiter, hedger, breakers, budget, request_budget, proxy_pool, bufsizes
+        )
         self._http_core = HttpCore(core, network, loop)
-        self._ws_core = WsCore(core, network, loop)
+        self._ws_core = WsCore(core, network, loop, ws_pool_size, ws_reconnect, ws_offload_threshold)
+        self._ws_core.handshake = self.__handshake
 
         self._try_ws = try_ws
+        self._single_flight = SingleFlight()
+        self._retry_policies = RetryPolicies()
+        self._keeper: Optional[asyncio.Task] = None
+        self._notify_streams: List[push_notify.NotifyStream] = []
+        self._msg_id_lock = asyncio.Lock()
 
         self._user = UserInfo_home()
 
@@ -176,8 +356,14 @@ class Client(object):
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self._keeper is not None:
+            self._keeper.cancel()
+            self._keeper = None
+        for stream in list(self._notify_streams):
+            stream.close()
         await self._ws_core.close()
-        await self._connector.close()
+        if self._shared_network is None:
+            await self._connector.close()
 
     def __hash__(self) -> int:
         return hash(self._account._BDUSS_key)
@@ -193,6 +379,98 @@ class Client(object):
 
         return self._account
 
+    @property
+    def request_budget(self) -> Optional[RequestBudget]:
+        """
+        在途请求预算
+
+        Note:
+            可通过client.request_budget.queue_depth获取当前排队的请求数
+            可通过client.request_budget.stats获取排队时间统计
+        """
+
+        return self._http_core.network.request_budget
+
+    @property
+    def proxy_pool(self) -> Optional[ProxyPool]:
+        """
+        代理池
+
+        Note:
+            可通过client.proxy_pool.nodes获取各代理的成功率与延迟
+        """
+
+        return self._http_core.network.proxy_pool
+
+    @property
+    def single_flight(self) -> SingleFlight:
+        """
+        并发请求合并设置
+
+        Note:
+            合并后所有调用者共享同一个返回对象 get_user_info与get_forum_detail的返回对象可变 请勿原地修改
+            可通过client.single_flight[client.get_fid] = False禁用某个方法的请求合并
+        """
+
+        return self._single_flight
+
+    @property
+    def retry_policies(self) -> RetryPolicies:
+        """
+        只读接口的重试策略
+
+        Note:
+            默认不重试 可通过client.retry_policies.default = RetryPolicy()为全部只读接口启用重试
+            可通过client.retry_policies[client.get_threads] = RetryPolicy(max_attempts=5)为某个方法单独设置重试策略
+            设置为None则禁用该方法的重试
+            可通过client.retry_policies.stats(client.get_threads)获取重试统计
+        """
+
+        return self._retry_policies
+
+    async def warmup(self, n_app: int = 4, n_web: int = 0, keep_alive: bool = False) -> int:
+        """
+        预先建立并停放长连接
+        以免启动或空闲后的首轮突发请求集中进行tcp与tls握手
+
+        Args:
+            n_app (int, optional): 到APP_BASE_HOST的连接数. Defaults to 4.
+            n_web (int, optional): 到WEB_BASE_HOST的连接数. Defaults to 0.
+            keep_alive (bool, optional): 是否启动后台任务 在http_keepalive到期前定期刷新这些连接. Defaults to False.
+
+        Returns:
+            int: 成功预热的连接数
+
+        Note:
+            再次调用warmup会停止上一次启动的后台任务
+            被服务端关闭的连接会在刷新时被重新建立
+        """
+
+        if self._keeper is not None:
+            self._keeper.cancel()
+            self._keeper = None
+
+        num_ok = await self.__warmup(n_app, n_web)
+
+        if keep_alive:
+            self._keeper = self._http_core.loop.create_task(self.__keep_warm(n_app, n_web), name="conn_keeper")
+
+        return num_ok
+
+    async def __warmup(self, n_app: int, n_web: int) -> int:
+        network = self._http_core.network
+        loop = self._http_core.loop
+        nums = await asyncio.gather(
+            warmup_conns(yarl.URL.build(scheme=APP_SECURE_SCHEME, host=APP_BASE_HOST), network, n_app, loop),
+            warmup_conns(yarl.URL.build(scheme=APP_SECURE_SCHEME, host=WEB_BASE_HOST), network, n_web, loop),
+        )
+        return sum(nums)
+
+    async def __keep_warm(self, n_app: int, n_web: int) -> None:
+        while True:
+            await asyncio.sleep(self._http_core.network.time.http_keepalive * 0.5)
+            await self.__warmup(n_app, n_web)
+
     @handle_exception(bool)
     async def init_websocket(self) -> bool:
         """
@@ -202,25 +480,86 @@ class Client(object):
             bool: True无须执行 False失败
         """
 
+        if self._ws_core.status == WsStatus.CONNECTING and await self._ws_core.wait_reconnect():
+            # 后台重连的握手已为新连接上传密钥
+            return True
+
         if self._ws_core.status != WsStatus.OPEN:
             await self._ws_core.connect()
             await self.__upload_sec_key()
         return True
 
+    async def _try_init_websocket(self) -> None:
+        """
+        尝试初始化websocket
+        websocket整体熔断期间不会重复尝试连接
+        """
+
+        # 正在后台重连时不重复连接
+        if self._ws_core.status != WsStatus.CLOSED:
+            return
+
+        breakers = self._ws_core.network.breakers
+        if breakers is None:
+            await self.init_websocket()
+            return
+
+        ws_breaker = breakers.transport('ws')
+        if not ws_breaker.allow(time.monotonic()):
+            return
+
+        start_time = time.monotonic()
+        if await self.init_websocket():
+            ws_breaker.record_success(time.monotonic(), time.monotonic() - start_time)
+        else:
+            ws_breaker.record_failure(time.monotonic())
+
+    def _use_ws(self, cmd: int) -> bool:
+        """
+        判断是否通过websocket发送cmd请求
+
+        Args:
+            cmd (int): 请求的cmd类型
+
+        Returns:
+            bool: True使用websocket False使用http
+        """
+
+        if self._ws_core.status != WsStatus.OPEN:
+            return False
+
+        breakers = self._ws_core.network.breakers
+        if breakers is None:
+            return True
+
+        # websocket熔断时改走http 若http也已整体熔断则仍使用websocket
+        return not breakers.is_open(cmd) or breakers.transport('http').is_open(time.monotonic())
+
     async def __upload_sec_key(self) -> None:
         from .api import init_websocket
         from .core.websocket import MsgIDPair
 
-        groups = await init_websocket.request(self._ws_core)
+        # 持有锁直至msg_id初始化完成 期间到达的推送将在此之后再拉取消息
+        async with self._msg_id_lock:
+            # 连接池中的每个连接都需要单独上传密钥
+            results = await asyncio.gather(
+                *[init_websocket.request(self._ws_core, conn) for conn in self._ws_core.conns]
+            )
+            groups = results[0]
 
-        mid_manager = self._ws_core.mid_manager
-        for group in groups:
-            if group._group_type == GroupType.PRIVATE_MSG:
-                mid_manager.priv_gid = group._group_id
-        mid_manager.gid2mid = {g._group_id: MsgIDPair(g._last_msg_id, g._last_msg_id) for g in groups}
+            mid_manager = self._ws_core.mid_manager
+            for group in groups:
+                if group._group_type == GroupType.PRIVATE_MSG:
+                    mid_manager.priv_gid = group._group_id
+            mid_manager.gid2mid = {g._group_id: MsgIDPair(g._last_msg_id, g._last_msg_id) for g in groups}
 
         self._ws_core._status = WsStatus.OPEN
 
+    async def __handshake(self, conn: WsConnection) -> None:
+        from .api import init_websocket
+
+        await init_websocket.request(self._ws_core, conn)
+
     async def __init_tbs(self) -> bool:
         if self._account._tbs:
             return True
@@ -279,7 +618,9 @@ class Client(object):
 
         return True
 
+    @_single_flight
     @handle_exception(int)
+    @_retry
     async def get_fid(self, fname: str) -> int:
         """
         通过贴吧名获取forum_id
@@ -291,7 +632,7 @@ class Client(object):
             int: forum_id
         """
 
-        if fid := ForumInfoCache.get_fid(fname):
+        if fid := await ForumInfoCache.load_fid(fname):
             return fid
 
         fid = await get_fid.request(self._http_core, fname)
@@ -299,6 +640,7 @@ class Client(object):
 
         return fid
 
+    @_single_flight
     async def get_fname(self, fid: int) -> str:
         """
         通过forum_id获取贴吧名
@@ -310,7 +652,7 @@ class Client(object):
             str: 贴吧名
         """
 
-        if fname := ForumInfoCache.get_fname(fid):
+        if fname := await ForumInfoCache.load_fname(fid):
             return fname
 
         fdetail = await self.get_forum_detail(fid)
@@ -321,6 +663,7 @@ class Client(object):
 
         return fname
 
+    @_single_flight
     async def get_user_info(self, _id: Union[str, int], /, require: ReqUInfo = ReqUInfo.ALL) -> TypeUserInfo:
         """
         获取用户信息
@@ -331,12 +674,21 @@ class Client(object):
 
         Returns:
             TypeUserInfo: 用户信息
+
+        Note:
+            require为BASIC的子集时优先从用户身份缓存中读取
         """
 
         if not _id:
             LOG().warning("Null input")
             return UserInfo(_id)
 
+        if (require | ReqUInfo.BASIC) == ReqUInfo.BASIC:
+            if (cached := UserInfoCache.get_user(_id, require)) is not None:
+                user = UserInfo()
+                user._user_id, user._portrait, user._user_name = cached
+                return user
+
         if isinstance(_id, int):
             if (require | ReqUInfo.BASIC) == ReqUInfo.BASIC:
                 # 仅有BASIC需求
@@ -372,6 +724,7 @@ class Client(object):
                 return user
 
     @handle_exception(get_uinfo_panel.UserInfo_panel)
+    @_retry
     async def _get_uinfo_panel(self, name_or_portrait: str) -> get_uinfo_panel.UserInfo_panel:
         """
         接口 https://tieba.baidu.com/home/get/panel
@@ -391,6 +744,7 @@ class Client(object):
         return await get_uinfo_panel.request(self._http_core, name_or_portrait)
 
     @handle_exception(get_uinfo_user_json.UserInfo_json)
+    @_retry
     async def _get_uinfo_user_json(self, user_name: str) -> get_uinfo_user_json.UserInfo_json:
         """
         接口 http://tieba.baidu.com/i/sys/user_json
@@ -404,10 +758,12 @@ class Client(object):
 
         user = await get_uinfo_user_json.request(self._http_core, user_name)
         user._user_name = user_name
+        UserInfoCache.add_user(user._user_id, user._portrait, user_name)
 
         return user
 
     @handle_exception(get_uinfo_getuserinfo_app.UserInfo_guinfo_app)
+    @_retry
     @_try_websocket
     async def _get_uinfo_getuserinfo(self, user_id: int) -> get_uinfo_getuserinfo_app.UserInfo_guinfo_app:
         """
@@ -421,12 +777,13 @@ class Client(object):
                 是否大神 / 是否超级会员
         """
 
-        if self._ws_core.status == WsStatus.OPEN:
+        if self._use_ws(get_uinfo_getuserinfo_app.CMD):
             return await get_uinfo_getuserinfo_app.request_ws(self._ws_core, user_id)
 
         return await get_uinfo_getuserinfo_app.request_http(self._http_core, user_id)
 
     @handle_exception(get_uinfo_getUserInfo_web.UserInfo_guinfo_web)
+    @_retry
     async def _get_uinfo_getUserInfo(self, user_id: int) -> get_uinfo_getUserInfo_web.UserInfo_guinfo_web:
         """
         接口 http://tieba.baidu.com/im/pcmsg/query/getUserInfo
@@ -447,6 +804,7 @@ class Client(object):
         return user
 
     @handle_exception(tieba_uid2user_info.UserInfo_TUid)
+    @_retry
     @_try_websocket
     async def tieba_uid2user_info(self, tieba_uid: int) -> tieba_uid2user_info.UserInfo_TUid:
         """
@@ -462,12 +820,13 @@ class Client(object):
             请注意tieba_uid与旧版user_id的区别
         """
 
-        if self._ws_core.status == WsStatus.OPEN:
+        if self._use_ws(tieba_uid2user_info.CMD):
             return await tieba_uid2user_info.request_ws(self._ws_core, tieba_uid)
 
         return await tieba_uid2user_info.request_http(self._http_core, tieba_uid)
 
     @handle_exception(get_threads.Threads)
+    @_retry
     @_try_websocket
     async def get_threads(
         self,
@@ -496,12 +855,13 @@ class Client(object):
 
         fname = fname_or_fid if isinstance(fname_or_fid, str) else await self.get_fname(fname_or_fid)
 
-        if self._ws_core.status == WsStatus.OPEN:
+        if self._use_ws(get_threads.CMD):
             return await get_threads.request_ws(self._ws_core, fname, pn, rn, sort, is_good)
 
         return await get_threads.request_http(self._http_core, fname, pn, rn, sort, is_good)
 
     @handle_exception(get_posts.Posts)
+    @_retry
     @_try_websocket
     async def get_posts(
         self,
@@ -516,6 +876,7 @@ class Client(object):
         comment_sort_by_agree: bool = True,
         comment_rn: int = 4,
         is_fold: bool = False,
+        expand_comments: bool = False,
     ) -> get_posts.Posts:
         """
         获取主题帖内回复
@@ -530,13 +891,15 @@ class Client(object):
             comment_sort_by_agree (bool, optional): True则楼中楼按点赞数顺序 False则楼中楼按时间顺序. Defaults to True.
             comment_rn (int, optional): 请求的楼中楼数量. Defaults to 4. Max to 50.
             is_fold (bool, optional): 是否请求被折叠的回复. Defaults to False.
+            expand_comments (bool, optional): 仅在with_comments为True时有效 True则为楼中楼被截断的楼层并发请求全部楼中楼
+                展开的楼中楼按时间顺序存放于Post.all_comments Post.comments保持不变. Defaults to False.
 
         Returns:
             Posts: 回复列表
         """
 
-        if self._ws_core.status == WsStatus.OPEN:
-            return await get_posts.request_ws(
+        if self._use_ws(get_posts.CMD):
+            posts = await get_posts.request_ws(
                 self._ws_core,
                 tid,
                 pn,
@@ -548,21 +911,147 @@ class Client(object):
                 comment_rn,
                 is_fold,
             )
+        else:
+            posts = await get_posts.request_http(
+                self._http_core,
+                tid,
+                pn,
+                rn,
+                sort,
+                only_thread_author,
+                with_comments,
+                comment_sort_by_agree,
+                comment_rn,
+                is_fold,
+            )
+
+        if with_comments and expand_comments:
+            await self.__expand_comments(posts)
+
+        return posts
+
+    async def __expand_comments(self, posts: Posts, concurrency: int = 8) -> None:
+        """
+        为楼中楼被截断的楼层并发请求全部楼中楼 并填充Post.all_comments
+
+        Args:
+            posts (Posts): 回复列表
+            concurrency (int, optional): 同时进行的最大请求数. Defaults to 8.
+        """
 
-        return await get_posts.request_http(
-            self._http_core,
-            tid,
-            pn,
-            rn,
-            sort,
-            only_thread_author,
-            with_comments,
-            comment_sort_by_agree,
-            comment_rn,
-            is_fold,
+        truncated = [post for post in posts if post.reply_num > len(post.comments)]
+        if not truncated:
+            return
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(tid: int, pid: int, pn: int) -> Comments:
+            async with semaphore:
+                return await self.get_comments(tid, pid, pn)
+
+        # 第一轮请求各楼层的首页以获取总页数 第二轮并发请求其余页
+        first_pages = await asyncio.gather(*[fetch(post.tid, post.pid, 1) for post in truncated])
+        rest_pages = await asyncio.gather(
+            *[
+                asyncio.gather(*[fetch(post.tid, post.pid, pn) for pn in range(2, first.page.total_page + 1)])
+                for post, first in zip(truncated, first_pages)
+            ]
         )
 
+        for post, first, rest in zip(truncated, first_pages, rest_pages):
+            if not first:
+                continue
+            comment_map = {}
+            for page in (first, *rest):
+                for comment in page:
+                    comment_map.setdefault(comment.pid, comment)
+            post._all_comments = list(comment_map.values())
+
+    @_priority(Priority.BULK)
+    async def get_all_posts(
+        self,
+        tid: int,
+        /,
+        *,
+        rn: int = 30,
+        only_thread_author: bool = False,
+        with_comments: bool = False,
+        comment_sort_by_agree: bool = True,
+        comment_rn: int = 4,
+        is_fold: bool = False,
+        expand_comments: bool = False,
+        concurrency: int = 8,
+    ) -> Posts:
+        """
+        获取主题帖内的全部回复
+
+        Args:
+            tid (int): 所在主题帖tid
+            rn (int, optional): 每页请求的条目数. Defaults to 30.
+            only_thread_author (bool, optional): True则只看楼主 False则请求全部. Defaults to False.
+            with_comments (bool, optional): True则同时请求高赞楼中楼 False则返回的Posts.comments为空. Defaults to False.
+            comment_sort_by_agree (bool, optional): True则楼中楼按点赞数顺序 False则楼中楼按时间顺序. Defaults to True.
+            comment_rn (int, optional): 请求的楼中楼数量. Defaults to 4. Max to 50.
+            is_fold (bool, optional): 是否请求被折叠的回复. Defaults to False.
+            expand_comments (bool, optional): 是否为楼中楼被截断的楼层请求全部楼中楼. Defaults to False.
+            concurrency (int, optional): 同时进行的最大请求数 对回复页与楼中楼页均有效. Defaults to 8.
+
+        Returns:
+            Posts: 按楼层排序并按pid去重的回复列表 页信息与第一页相同
+
+        Note:
+            先请求第一页以获取总页数 再并发请求其余页
+            请求失败的页将重试一次 仍失败则跳过该页并记录警告日志
+            默认以Priority.BULK优先级发出请求
+        """
+
+        async def fetch(pn: int) -> Posts:
+            return await self.get_posts(
+                tid,
+                pn,
+                rn=rn,
+                only_thread_author=only_thread_author,
+                with_comments=with_comments,
+                comment_sort_by_agree=comment_sort_by_agree,
+                comment_rn=comment_rn,
+                is_fold=is_fold,
+            )
+
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+        async def bounded_fetch(pn: int) -> Posts:
+            async with semaphore:
+                page = await fetch(pn)
+                # 请求失败时返回的空页没有页码
+                if not page.page.current_page:
+                    page = await fetch(pn)
+                return page
+
+        first = await bounded_fetch(1)
+        if not first.page.current_page:
+            LOG().warning(f"Failed to fetch the first page. tid={tid}")
+            return first
+
+        total_page = first.page.total_page
+        pages = await asyncio.gather(*[bounded_fetch(pn) for pn in range(2, total_page + 1)])
+
+        if failed_pns := [pn for pn, page in enumerate(pages, 2) if not page.page.current_page]:
+            LOG().warning(f"Failed to fetch pages {failed_pns}. Their posts are missing. tid={tid}")
+
+        post_map = {post.pid: post for post in first}
+        for page in pages:
+            for post in page:
+                post_map.setdefault(post.pid, post)
+        first._objs = sorted(post_map.values(), key=lambda post: post.floor)
+
+        # 合并后统一展开楼中楼 使楼中楼请求同样受concurrency限制 而不是每页各自并发
+        if with_comments and expand_comments:
+            await self.__expand_comments(first, max(concurrency, 1))
+
+        return first
+
     @handle_exception(get_comments.Comments)
+    @_retry
     @_try_websocket
     async def get_comments(
         self, tid: int, pid: int, /, pn: int = 1, *, is_floor: bool = False
@@ -580,12 +1069,124 @@ class Client(object):
             Comments: 楼中楼列表
         """
 
-        if self._ws_core.status == WsStatus.OPEN:
+        if self._use_ws(get_comments.CMD):
             return await get_comments.request_ws(self._ws_core, tid, pid, pn, is_floor)
 
         return await get_comments.request_http(self._http_core, tid, pid, pn, is_floor)
 
+    def iter_threads(
+        self,
+        fname_or_fid: Union[str, int],
+        /,
+        pn: int = 1,
+        *,
+        rn: int = 30,
+        sort: ThreadSortType = ThreadSortType.REPLY,
+        is_good: bool = False,
+        prefetch: int = 1,
+    ) -> AsyncIterator[Threads]:
+        """
+        从第pn页开始逐页迭代首页帖子 直到没有后继页
+
+        Args:
+            fname_or_fid (str | int): 贴吧名或fid 优先贴吧名
+            pn (int, optional): 起始页码. Defaults to 1.
+            rn (int, optional): 请求的条目数. Defaults to 30. Max to 100.
+            sort (ThreadSortType, optional): 排序方式. Defaults to ThreadSortType.REPLY.
+            is_good (bool, optional): True则获取精品区帖子 False则获取普通区帖子. Defaults to False.
+            prefetch (int, optional): 预取深度 即处理当前页时提前请求的后继页数. Defaults to 1.
+
+        Yields:
+            Threads: 帖子列表
+
+        Raises:
+            PageFetchError: 某一页请求失败
+        """
+
+        async def fetch(_pn: int) -> Threads:
+            return await self.get_threads(fname_or_fid, _pn, rn=rn, sort=sort, is_good=is_good)
+
+        return _iter_pages(fetch, pn, prefetch)
+
+    def iter_posts(
+        self,
+        tid: int,
+        /,
+        pn: int = 1,
+        *,
+        rn: int = 30,
+        sort: PostSortType = PostSortType.ASC,
+        only_thread_author: bool = False,
+        with_comments: bool = False,
+        comment_sort_by_agree: bool = True,
+        comment_rn: int = 4,
+        is_fold: bool = False,
+        prefetch: int = 1,
+    ) -> AsyncIterator[Posts]:
+        """
+        从第pn页开始逐页迭代主题帖内回复 直到没有后继页
+
+        Args:
+            tid (int): 所在主题帖tid
+            pn (int, optional): 起始页码. Defaults to 1.
+            rn (int, optional): 请求的条目数. Defaults to 30.
+            sort (PostSortType, optional): 0时间顺序 1时间倒序 2热门序. Defaults to PostSortType.ASC.
+            only_thread_author (bool, optional): True则只看楼主 False则请求全部. Defaults to False.
+            with_comments (bool, optional): True则同时请求高赞楼中楼 False则返回的Posts.comments为空. Defaults to False.
+            comment_sort_by_agree (bool, optional): True则楼中楼按点赞数顺序 False则楼中楼按时间顺序. Defaults to True.
+            comment_rn (int, optional): 请求的楼中楼数量. Defaults to 4. Max to 50.
+            is_fold (bool, optional): 是否请求被折叠的回复. Defaults to False.
+            prefetch (int, optional): 预取深度 即处理当前页时提前请求的后继页数. Defaults to 1.
+
+        Yields:
+            Posts: 回复列表
+
+        Raises:
+            PageFetchError: 某一页请求失败
+        """
+
+        async def fetch(_pn: int) -> Posts:
+            return await self.get_posts(
+                tid,
+                _pn,
+                rn=rn,
+                sort=sort,
+                only_thread_author=only_thread_author,
+                with_comments=with_comments,
+                comment_sort_by_agree=comment_sort_by_agree,
+                comment_rn=comment_rn,
+                is_fold=is_fold,
+            )
+
+        return _iter_pages(fetch, pn, prefetch)
+
+    def iter_comments(
+        self, tid: int, pid: int, /, pn: int = 1, *, is_floor: bool = False, prefetch: int = 1
+    ) -> AsyncIterator[Comments]:
+        """
+        从第pn页开始逐页迭代楼中楼回复 直到没有后继页
+
+        Args:
+            tid (int): 所在主题帖tid
+            pid (int): 所在回复pid或楼中楼pid
+            pn (int, optional): 起始页码. Defaults to 1.
+            is_floor (bool, optional): pid是否指向楼中楼. Defaults to False.
+            prefetch (int, optional): 预取深度 即处理当前页时提前请求的后继页数. Defaults to 1.
+
+        Yields:
+            Comments: 楼中楼列表
+
+        Raises:
+            PageFetchError: 某一页请求失败
+        """
+
+        async def fetch(_pn: int) -> Comments:
+            return await self.get_comments(tid, pid, _pn, is_floor=is_floor)
+
+        return _iter_pages(fetch, pn, prefetch)
+
     @handle_exception(search_post.Searches)
+    @_retry
     async def search_post(
         self,
         fname_or_fid: Union[str, int],
@@ -616,7 +1217,9 @@ class Client(object):
 
         return await search_post.request(self._http_core, fname, query, pn, rn, query_type, only_thread)
 
+    @_single_flight
     @handle_exception(get_forum_detail.Forum_detail)
+    @_retry
     async def get_forum_detail(self, fname_or_fid: Union[str, int]) -> get_forum_detail.Forum_detail:
         """
         通过forum_id获取贴吧信息
@@ -633,6 +1236,7 @@ class Client(object):
         return await get_forum_detail.request(self._http_core, fid)
 
     @handle_exception(get_bawu_info.BawuInfo)
+    @_retry
     @_try_websocket
     async def get_bawu_info(self, fname_or_fid: Union[str, int]) -> get_bawu_info.BawuInfo:
         """
@@ -647,12 +1251,13 @@ class Client(object):
 
         fid = fname_or_fid if isinstance(fname_or_fid, int) else await self.get_fid(fname_or_fid)
 
-        if self._ws_core.status == WsStatus.OPEN:
+        if self._use_ws(get_bawu_info.CMD):
             return await get_bawu_info.request_ws(self._ws_core, fid)
 
         return await get_bawu_info.request_http(self._http_core, fid)
 
     @handle_exception(dict)
+    @_retry
     @_try_websocket
     async def get_tab_map(self, fname_or_fid: Union[str, int]) -> Dict[str, int]:
         """
@@ -667,12 +1272,13 @@ class Client(object):
 
         fname = fname_or_fid if isinstance(fname_or_fid, str) else await self.get_fname(fname_or_fid)
 
-        if self._ws_core.status == WsStatus.OPEN:
+        if self._use_ws(get_tab_map.CMD):
             return await get_tab_map.request_ws(self._ws_core, fname)
 
         return await get_tab_map.request_http(self._http_core, fname)
 
     @handle_exception(get_rank_users.RankUsers)
+    @_retry
     async def get_rank_users(self, fname_or_fid: Union[str, int], /, pn: int = 1) -> get_rank_users.RankUsers:
         """
         获取pn页的等级排行榜用户列表
@@ -690,6 +1296,7 @@ class Client(object):
         return await get_rank_users.request(self._http_core, fname, pn)
 
     @handle_exception(get_member_users.MemberUsers)
+    @_retry
     async def get_member_users(self, fname_or_fid: Union[str, int], /, pn: int = 1) -> get_member_users.MemberUsers:
         """
         获取pn页的最新关注用户列表
@@ -707,6 +1314,7 @@ class Client(object):
         return await get_member_users.request(self._http_core, fname, pn)
 
     @handle_exception(get_square_forums.SquareForums)
+    @_retry
     @_try_websocket
     async def get_square_forums(self, cname: str, /, pn: int = 1, *, rn: int = 20) -> get_square_forums.SquareForums:
         """
@@ -721,12 +1329,13 @@ class Client(object):
             SquareForums: 吧广场列表
         """
 
-        if self._ws_core.status == WsStatus.OPEN:
+        if self._use_ws(get_square_forums.CMD):
             return await get_square_forums.request_ws(self._ws_core, cname, pn, rn)
 
         return await get_square_forums.request_http(self._http_core, cname, pn, rn)
 
     @handle_exception(get_homepage.null_ret_factory)
+    @_retry
     @_try_websocket
     async def get_homepage(
         self, _id: Union[str, int], *, with_threads: bool = True
@@ -748,12 +1357,13 @@ class Client(object):
         else:
             portrait = _id
 
-        if self._ws_core.status == WsStatus.OPEN:
+        if self._use_ws(get_homepage.CMD):
             return await get_homepage.request_ws(self._ws_core, portrait, with_threads)
 
         return await get_homepage.request_http(self._http_core, portrait, with_threads)
 
     @handle_exception(get_statistics.Statistics)
+    @_retry
     async def get_statistics(self, fname_or_fid: Union[str, int]) -> get_statistics.Statistics:
         """
         获取吧务后台中最近24天的统计数据
@@ -770,6 +1380,7 @@ class Client(object):
         return await get_statistics.request(self._http_core, fid)
 
     @handle_exception(get_follow_forums.FollowForums)
+    @_retry
     async def get_follow_forums(
         self, _id: Union[str, int], /, pn: int = 1, *, rn: int = 50
     ) -> get_follow_forums.FollowForums:
@@ -794,6 +1405,7 @@ class Client(object):
         return await get_follow_forums.request(self._http_core, user_id, pn, rn)
 
     @handle_exception(get_recom_status.RecomStatus)
+    @_retry
     async def get_recom_status(self, fname_or_fid: Union[str, int]) -> get_recom_status.RecomStatus:
         """
         获取大吧主推荐功能的月度配额状态
@@ -809,6 +1421,7 @@ class Client(object):
 
         return await get_recom_status.request(self._http_core, fid)
 
+    @_priority(Priority.WRITE)
     @handle_exception(bool, no_format=True)
     async def block(
         self, fname_or_fid: Union[str, int], /, _id: Union[str, int], *, day: Literal[1, 3, 10] = 1, reason: str = ''
@@ -843,6 +1456,7 @@ class Client(object):
 
         return await block.request(self._http_core, fname, fid, portrait, day, reason)
 
+    @_priority(Priority.WRITE)
     @handle_exception(bool, no_format=True)
     async def unblock(self, fname_or_fid: Union[str, int], /, _id: Union[str, int]) -> bool:
         """
@@ -873,6 +1487,7 @@ class Client(object):
 
         return await unblock.request(self._http_core, fname, fid, user_id)
 
+    @_priority(Priority.WRITE)
     @handle_exception(bool, no_format=True)
     async def hide_thread(self, fname_or_fid: Union[str, int], /, tid: int) -> bool:
         """
@@ -891,6 +1506,7 @@ class Client(object):
 
         return await del_thread.request(self._http_core, fid, tid, is_hide=True)
 
+    @_priority(Priority.WRITE)
     @handle_exception(bool, no_format=True)
     async def del_thread(self, fname_or_fid: Union[str, int], /, tid: int) -> bool:
         """
@@ -909,6 +1525,7 @@ class Client(object):
 
         return await del_thread.request(self._http_core, fid, tid, is_hide=False)
 
+    @_priority(Priority.WRITE)
     @handle_exception(bool, no_format=True)
     async def del_threads(self, fname_or_fid: Union[str, int], /, tids: List[int], *, block: bool = False) -> bool:
         """
@@ -928,6 +1545,7 @@ class Client(object):
 
         return await del_threads.request(self._http_core, fid, tids, block)
 
+    @_priority(Priority.WRITE)
     async def del_post(self, fname_or_fid: Union[str, int], /, pid: int) -> bool:
         """
         删除回复
@@ -945,6 +1563,7 @@ class Client(object):
 
         return await del_post.request(self._http_core, fid, pid)
 
+    @_priority(Priority.WRITE)
     @handle_exception(bool, no_format=True)
     async def del_posts(self, fname_or_fid: Union[str, int], /, pids: List[int], *, block: bool = False) -> bool:
         """
@@ -964,6 +1583,7 @@ class Client(object):
 
         return await del_posts.request(self._http_core, fid, pids, block)
 
+    @_priority(Priority.WRITE)
     @handle_exception(bool, no_format=True)
     async def unhide_thread(self, fname_or_fid: Union[str, int], /, tid: int) -> bool:
         """
@@ -988,6 +1608,7 @@ class Client(object):
 
         return await recover.request(self._http_core, fname, fid, tid, 0, is_hide=True)
 
+    @_priority(Priority.WRITE)
     @handle_exception(bool, no_format=True)
     async def recover_thread(self, fname_or_fid: Union[str, int], /, tid: int) -> bool:
         """
@@ -1012,6 +1633,7 @@ class Client(object):
 
         return await recover.request(self._http_core, fname, fid, tid, 0, is_hide=False)
 
+    @_priority(Priority.WRITE)
     @handle_exception(bool, no_format=True)
     async def recover_post(self, fname_or_fid: Union[str, int], /, pid: int) -> bool:
         """
@@ -1036,6 +1658,7 @@ class Client(object):
 
         return await recover.request(self._http_core, fname, fid, 0, pid, is_hide=False)
 
+    @_priority(Priority.WRITE)
     @handle_exception(bool, no_format=True)
     async def recover(
         self, fname_or_fid: Union[str, int], /, tid: int = 0, pid: int = 0, *, is_hide: bool = False
@@ -1064,6 +1687,7 @@ class Client(object):
 
         return await recover.request(self._http_core, fname, fid, tid, pid, is_hide)
 
+    @_priority(Priority.WRITE)
     @handle_exception(bool, no_format=True)
     async def move(self, fname_or_fid: Union[str, int], /, tid: int, *, to_tab_id: int, from_tab_id: int = 0) -> bool:
         """
@@ -1084,6 +1708,7 @@ class Client(object):
 
         return await move.request(self._http_core, fid, tid, to_tab_id, from_tab_id)
 
+    @_priority(Priority.WRITE)
     @handle_exception(bool, no_format=True)
     async def recommend(self, fname_or_fid: Union[str, int], /, tid: int) -> bool:
         """
@@ -1101,6 +1726,7 @@ class Client(object):
 
         return await recommend.request(self._http_core, fid, tid)
 
+    @_priority(Priority.WRITE)
     @handle_exception(bool, no_format=True)
     async def good(self, fname_or_fid: Union[str, int], /, tid: int, *, cname: str = '') -> bool:
         """
@@ -1128,6 +1754,7 @@ class Client(object):
 
         return await good.request(self._http_core, fname, fid, tid, cid)
 
+    @_priority(Priority.WRITE)
     @handle_exception(bool, no_format=True)
     async def ungood(self, fname_or_fid: Union[str, int], /, tid: int) -> bool:
         """
@@ -1180,6 +1807,7 @@ class Client(object):
 
         return cid
 
+    @_priority(Priority.WRITE)
     @handle_exception(bool, no_format=True)
     async def top(self, fname_or_fid: Union[str, int], /, tid: int) -> bool:
         """
@@ -1204,6 +1832,7 @@ class Client(object):
 
         return await top.request(self._http_core, fname, fid, tid, is_set=True)
 
+    @_priority(Priority.WRITE)
     @handle_exception(bool, no_format=True)
     async def untop(self, fname_or_fid: Union[str, int], /, tid: int) -> bool:
         """
@@ -1229,6 +1858,7 @@ class Client(object):
         return await top.request(self._http_core, fname, fid, tid, is_set=False)
 
     @handle_exception(get_recovers.Recovers)
+    @_retry
     async def get_recovers(
         self, fname_or_fid: Union[str, int], /, name: str = '', pn: int = 1
     ) -> get_recovers.Recovers:
@@ -1254,6 +1884,7 @@ class Client(object):
         return await get_recovers.request(self._http_core, fname, fid, name, pn)
 
     @handle_exception(get_blocks.Blocks)
+    @_retry
     async def get_blocks(self, fname_or_fid: Union[str, int], /, name: str = '', pn: int = 1) -> get_blocks.Blocks:
         """
         获取pn页的待解封用户列表
@@ -1277,6 +1908,7 @@ class Client(object):
         return await get_blocks.request(self._http_core, fname, fid, name, pn)
 
     @handle_exception(get_blacklist_users.BlacklistUsers)
+    @_retry
     async def get_blacklist_users(
         self, fname_or_fid: Union[str, int], /, pn: int = 1
     ) -> get_blacklist_users.BlacklistUsers:
@@ -1295,6 +1927,7 @@ class Client(object):
 
         return await get_blacklist_users.request(self._http_core, fname, pn)
 
+    @_priority(Priority.WRITE)
     @handle_exception(bool, no_format=True)
     async def blacklist_add(self, fname_or_fid: Union[str, int], /, _id: Union[str, int]) -> bool:
         """
@@ -1320,6 +1953,7 @@ class Client(object):
 
         return await blacklist_add.request(self._http_core, fname, user_id)
 
+    @_priority(Priority.WRITE)
     @handle_exception(bool, no_format=True)
     async def blacklist_del(self, fname_or_fid: Union[str, int], /, _id: Union[str, int]) -> bool:
         """
@@ -1346,6 +1980,7 @@ class Client(object):
         return await blacklist_del.request(self._http_core, fname, user_id)
 
     @handle_exception(get_unblock_appeals.Appeals)
+    @_retry
     async def get_unblock_appeals(
         self, fname_or_fid: Union[str, int], /, pn: int = 1, *, rn: int = 5
     ) -> get_unblock_appeals.Appeals:
@@ -1372,6 +2007,7 @@ class Client(object):
 
         return await get_unblock_appeals.request(self._http_core, fname, fid, pn, rn)
 
+    @_priority(Priority.WRITE)
     @handle_exception(bool, no_format=True)
     async def handle_unblock_appeals(
         self, fname_or_fid: Union[str, int], /, appeal_ids: List[int], *, refuse: bool = True
@@ -1400,27 +2036,39 @@ class Client(object):
         return await handle_unblock_appeals.request(self._http_core, fname, fid, appeal_ids, refuse)
 
     @handle_exception(get_images.null_ret_factory)
-    async def get_image(self, img_url: str) -> "np.ndarray":
+    async def get_image(self, img_url: str, *, max_size: int = 0, reduce: Literal[1, 2, 4, 8] = 1) -> "np.ndarray":
         """
         从链接获取静态图像
 
         Args:
             img_url (str): 图像链接
+            max_size (int, optional): 图像文件的大小上限 以字节为单位 超出时中止下载并返回空图像 0则不限制. Defaults to 0.
+            reduce (Literal[1, 2, 4, 8], optional): 解码时的缩小倍数 jpeg图像可在解码阶段直接缩小 速度更快且更省内存. Defaults to 1.
 
         Returns:
             np.ndarray: 图像
         """
 
-        return await get_images.request(self._http_core, yarl.URL(img_url))
+        return await get_images.request(self._http_core, yarl.URL(img_url), max_size, reduce)
 
     @handle_exception(get_images.null_ret_factory)
-    async def hash2image(self, raw_hash: str, /, size: Literal['s', 'm', 'l'] = 's') -> "np.ndarray":
+    async def hash2image(
+        self,
+        raw_hash: str,
+        /,
+        size: Literal['s', 'm', 'l'] = 's',
+        *,
+        max_size: int = 0,
+        reduce: Literal[1, 2, 4, 8] = 1,
+    ) -> "np.ndarray":
         """
         通过百度图库hash获取静态图像
 
         Args:
             raw_hash (str): 百度图库hash
             size (Literal['s', 'm', 'l'], optional): 获取图像的大小 s为宽720 m为宽960 l为原图. Defaults to 's'.
+            max_size (int, optional): 图像文件的大小上限 以字节为单位 超出时中止下载并返回空图像 0则不限制. Defaults to 0.
+            reduce (Literal[1, 2, 4, 8], optional): 解码时的缩小倍数 jpeg图像可在解码阶段直接缩小 速度更快且更省内存. Defaults to 1.
 
         Returns:
             np.ndarray: 图像
@@ -1440,7 +2088,7 @@ class Client(object):
             LOG().warning(f"Invalid size={size}")
             return get_images.null_ret_factory()
 
-        return await get_images.request(self._http_core, img_url)
+        return await get_images.request(self._http_core, img_url, max_size, reduce)
 
     @handle_exception(get_images.null_ret_factory)
     async def get_portrait(self, _id: Union[str, int], /, size: Literal['s', 'm', 'l'] = 's') -> "np.ndarray":
@@ -1491,6 +2139,7 @@ class Client(object):
         return True
 
     @handle_exception(get_replys.Replys)
+    @_retry
     @_try_websocket
     async def get_replys(self, pn: int = 1) -> get_replys.Replys:
         """
@@ -1503,12 +2152,13 @@ class Client(object):
             Replys: 回复列表
         """
 
-        if self._ws_core.status == WsStatus.OPEN:
+        if self._use_ws(get_replys.CMD):
             return await get_replys.request_ws(self._ws_core, pn)
 
         return await get_replys.request_http(self._http_core, pn)
 
     @handle_exception(get_ats.Ats)
+    @_retry
     async def get_ats(self, pn: int = 1) -> get_ats.Ats:
         """
         获取@信息
@@ -1523,6 +2173,7 @@ class Client(object):
         return await get_ats.request(self._http_core, pn)
 
     @handle_exception(list)
+    @_retry
     @_try_websocket
     async def get_self_public_threads(self, pn: int = 1) -> List[get_user_contents.UserThread]:
         """
@@ -1537,12 +2188,13 @@ class Client(object):
 
         user = await self.get_self_info(ReqUInfo.USER_ID)
 
-        if self._ws_core.status == WsStatus.OPEN:
+        if self._use_ws(get_user_contents.CMD):
             return await get_user_contents.get_threads.request_ws(self._ws_core, user.user_id, pn, public_only=True)
 
         return await get_user_contents.get_threads.request_http(self._http_core, user.user_id, pn, public_only=True)
 
     @handle_exception(list)
+    @_retry
     @_try_websocket
     async def get_self_threads(self, pn: int = 1) -> List[get_user_contents.UserThread]:
         """
@@ -1557,12 +2209,13 @@ class Client(object):
 
         user = await self.get_self_info(ReqUInfo.USER_ID)
 
-        if self._ws_core.status == WsStatus.OPEN:
+        if self._use_ws(get_user_contents.CMD):
             return await get_user_contents.get_threads.request_ws(self._ws_core, user.user_id, pn, public_only=False)
 
         return await get_user_contents.get_threads.request_http(self._http_core, user.user_id, pn, public_only=False)
 
     @handle_exception(list)
+    @_retry
     @_try_websocket
     async def get_self_posts(self, pn: int = 1) -> List[get_user_contents.UserPosts]:
         """
@@ -1577,12 +2230,13 @@ class Client(object):
 
         user = await self.get_self_info(ReqUInfo.USER_ID)
 
-        if self._ws_core.status == WsStatus.OPEN:
+        if self._use_ws(get_user_contents.CMD):
             return await get_user_contents.get_posts.request_ws(self._ws_core, user.user_id, pn)
 
         return await get_user_contents.get_posts.request_http(self._http_core, user.user_id, pn)
 
     @handle_exception(list)
+    @_retry
     @_try_websocket
     async def get_user_threads(self, _id: Union[str, int], pn: int = 1) -> List[get_user_contents.UserThread]:
         """
@@ -1602,12 +2256,13 @@ class Client(object):
         else:
             user_id = _id
 
-        if self._ws_core.status == WsStatus.OPEN:
+        if self._use_ws(get_user_contents.CMD):
             return await get_user_contents.get_threads.request_ws(self._ws_core, user_id, pn, public_only=True)
 
         return await get_user_contents.get_threads.request_http(self._http_core, user_id, pn, public_only=True)
 
     @handle_exception(get_fans.Fans)
+    @_retry
     async def get_fans(self, _id: Union[str, int, None] = None, /, pn: int = 1) -> get_fans.Fans:
         """
         获取粉丝列表
@@ -1633,6 +2288,7 @@ class Client(object):
         return await get_fans.request(self._http_core, user_id, pn)
 
     @handle_exception(get_follows.Follows)
+    @_retry
     async def get_follows(self, _id: Union[str, int, None] = None, /, pn: int = 1) -> get_follows.Follows:
         """
         获取关注列表
@@ -1658,6 +2314,7 @@ class Client(object):
         return await get_follows.request(self._http_core, user_id, pn)
 
     @handle_exception(get_self_follow_forums.SelfFollowForums)
+    @_retry
     async def get_self_follow_forums(self, pn: int = 1) -> get_self_follow_forums.SelfFollowForums:
         """
         获取本账号关注贴吧列表
@@ -1675,6 +2332,7 @@ class Client(object):
         return await get_self_follow_forums.request(self._http_core, pn)
 
     @handle_exception(get_dislike_forums.DislikeForums)
+    @_retry
     @_try_websocket
     async def get_dislike_forums(self, pn: int = 1, /, *, rn: int = 20) -> get_dislike_forums.DislikeForums:
         """
@@ -1688,7 +2346,7 @@ class Client(object):
             DislikeForums: 首页推荐屏蔽的贴吧列表
         """
 
-        if self._ws_core.status == WsStatus.OPEN:
+        if self._use_ws(get_dislike_forums.CMD):
             return await get_dislike_forums.request_ws(self._ws_core, pn, rn)
 
         return await get_dislike_forums.request_http(self._http_core, pn, rn)
@@ -2103,6 +2761,86 @@ class Client(object):
 
         return await set_msg_readed.request(self._ws_core, message)
 
+    def notifications(
+        self,
+        *,
+        maxsize: int = 256,
+        overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        fetch_msgs: bool = False,
+    ) -> push_notify.NotifyStream:
+        """
+        订阅websocket主动推送的消息提醒 以取代对get_group_msg的轮询
+
+        Args:
+            maxsize (int, optional): 缓冲队列的最大长度. Defaults to 256.
+            overflow (OverflowPolicy, optional): 缓冲队列已满时的处理策略. Defaults to OverflowPolicy.DROP_OLDEST.
+            fetch_msgs (bool, optional): True则自动拉取推送所对应的消息组 迭代得到WsMsgGroup
+                False则迭代得到WsNotify. Defaults to False.
+
+        Returns:
+            NotifyStream: 推送流 通过async for迭代 不再需要时调用close或使用async with
+
+        Note:
+            首次迭代时初始化websocket 初始化失败则迭代立即结束
+            同一次推送只会拉取一次消息组 由所有fetch_msgs为True的推送流共享
+        """
+
+        stream = push_notify.NotifyStream(self._ws_core.loop, maxsize, overflow, fetch_msgs)
+        stream._start = self.init_websocket
+        stream._on_close = self.__unsubscribe
+
+        if not self._notify_streams:
+            self._ws_core.callbacks[push_notify.CMD] = self.__push_notify
+        self._notify_streams.append(stream)
+
+        return stream
+
+    def __unsubscribe(self, stream: push_notify.NotifyStream) -> None:
+        self._notify_streams.remove(stream)
+        if not self._notify_streams:
+            self._ws_core.callbacks.pop(push_notify.CMD, None)
+
+    async def __push_notify(self, ws_core: WsCore, data: Union[bytes, memoryview], req_id: int) -> None:
+        notifies = push_notify.parse_body(data)
+
+        fetch = False
+        for stream in self._notify_streams:
+            if stream.fetch_msgs:
+                fetch = True
+                continue
+            for notify in notifies:
+                stream.put(notify)
+
+        if not fetch or not notifies:
+            return
+
+        groups = await self.__fetch_notify_msgs(notifies)
+        for stream in self._notify_streams:
+            if stream.fetch_msgs:
+                for group in groups:
+                    stream.put(group)
+
+    async def __fetch_notify_msgs(self, notifies: List[push_notify.WsNotify]) -> List[get_group_msg.WsMsgGroup]:
+        # 串行拉取 保证每次都从上一次推送的msg_id之后开始
+        async with self._msg_id_lock:
+            if self._ws_core.mid_manager.gid2mid is None:
+                # websocket初始化失败
+                return []
+
+            latest: Dict[int, int] = {}
+            for notify in notifies:
+                latest[notify._group_id] = max(latest.get(notify._group_id, 0), notify._msg_id)
+
+            mid_manager = self._ws_core.mid_manager
+            for group_id, msg_id in latest.items():
+                mid_manager.update_msg_id(group_id, msg_id)
+
+            try:
+                return await get_group_msg.request(self._ws_core, list(latest), 1)
+            except Exception as err:
+                LOG().warning(f"Failed to fetch pushed messages. {err}")
+                return []
+
     @handle_exception(list)
     @_force_websocket
     async def get_group_msg(self, group_ids: List[int], *, get_type: int = 1) -> List[get_group_msg.WsMsgGroup]:
@@ -6,5 +6,6 @@ APP_INSECURE_SCHEME = "http"
 
 APP_BASE_HOST = "tiebac.baidu.com"
 WEB_BASE_HOST = "tieba.baidu.com"
+WS_HOST = "im.tieba.baidu.com"
 
 CHECK_URL_PERFIX = "http://tieba.baidu.com/mo/q/checkurl?url="
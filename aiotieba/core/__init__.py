@@ -1,4 +1,13 @@
 from .account import Account
+from .breaker import CircuitBreakers
+from .budget import ConnectionBudget, RequestBudget
+from .bufsize import BufsizeEstimator
+from .hedge import Hedger
 from .http import HttpCore
-from .network import Network, TimeConfig
-from .websocket import WsCore, WsResponse
+from .looplag import LoopLagMonitor
+from .network import Network, SharedNetwork, TimeConfig
+from .priority import REQUEST_PRIORITY, get_priority, request_priority
+from .proxy import ProxyPool, ProxyStrategy
+from .ratelimit import RateLimiter
+from .resolver import PinnedResolver
+from .websocket import WsConnection, WsCore, WsResponse
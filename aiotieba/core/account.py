@@ -29,6 +29,7 @@ class Account(object):
         '_c3_aid',
         '_z_id',
         '_aes_ecb_sec_key',
+        '_aes_ecb_ws_key',
         '_aes_ecb_chiper',
         '_aes_cbc_sec_key',
         '_aes_cbc_chiper',
@@ -53,6 +54,7 @@ class Account(object):
         self._c3_aid: str = None
         self._z_id: str = None
         self._aes_ecb_sec_key: bytes = None
+        self._aes_ecb_ws_key: bytes = None
         self._aes_ecb_chiper = None
         self._aes_cbc_sec_key: bytes = None
         self._aes_cbc_chiper = None
@@ -269,12 +271,27 @@ class Account(object):
         """
 
         if self._aes_ecb_chiper is None:
-            salt = b'\xa4\x0b\xc8\x34\xd6\x95\xf3\x13'
-            ws_secret_key = hashlib.pbkdf2_hmac('sha1', self.aes_ecb_sec_key, salt, 5, 32)
-            self._aes_ecb_chiper = AES.new(ws_secret_key, AES.MODE_ECB)
+            self._aes_ecb_chiper = self.new_aes_ecb_chiper()
 
         return self._aes_ecb_chiper
 
+    def new_aes_ecb_chiper(self):
+        """
+        创建一个与aes_ecb_chiper使用相同密钥的独立AES-ECB加密器
+
+        Returns:
+            Any: AES chiper
+
+        Note:
+            加密器对象不是线程安全的 在其他线程中加解密时应使用独立的加密器
+        """
+
+        if self._aes_ecb_ws_key is None:
+            salt = b'\xa4\x0b\xc8\x34\xd6\x95\xf3\x13'
+            self._aes_ecb_ws_key = hashlib.pbkdf2_hmac('sha1', self.aes_ecb_sec_key, salt, 5, 32)
+
+        return AES.new(self._aes_ecb_ws_key, AES.MODE_ECB)
+
     @property
     def aes_cbc_sec_key(self) -> bytes:
         """
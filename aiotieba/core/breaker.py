@@ -0,0 +1,310 @@
+import enum
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Union
+
+TypeEndpoint = Union[str, int]
+
+
+class BreakerState(enum.IntEnum):
+    """
+    熔断器状态
+
+    Note:
+        0闭合 请求正常放行
+        1断开 请求被直接拒绝
+        2半开 放行单个探测请求
+    """
+
+    CLOSED = 0
+    OPEN = 1
+    HALF_OPEN = 2
+
+
+class CircuitBreaker(object):
+    """
+    熔断器
+
+    Args:
+        failure_threshold (int, optional): 触发熔断的连续失败次数. Defaults to 5.
+        slo (float, optional): 延迟目标 以秒为单位 成功但超过该延迟的请求也记为失败 None则不检查延迟. Defaults to None.
+        reset_timeout (float, optional): 熔断后经过多久放行探测请求 以秒为单位. Defaults to 10.0.
+    """
+
+    __slots__ = [
+        'failure_threshold',
+        'slo',
+        'reset_timeout',
+        '_state',
+        '_failures',
+        '_opened_time',
+        '_probe_time',
+    ]
+
+    def __init__(self, failure_threshold: int = 5, slo: Optional[float] = None, reset_timeout: float = 10.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.slo = slo
+        self.reset_timeout = reset_timeout
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+        self._opened_time = 0.0
+        self._probe_time = 0.0
+
+    @property
+    def state(self) -> BreakerState:
+        """
+        当前状态
+        """
+
+        return self._state
+
+    def is_open(self, now: float) -> bool:
+        """
+        判断此刻发起的请求是否会被拒绝
+        不会占用半开状态的探测名额
+
+        Args:
+            now (float): 当前时间 以秒为单位
+
+        Returns:
+            bool: True会被拒绝 False会被放行
+        """
+
+        if self._state == BreakerState.OPEN:
+            return now - self._opened_time < self.reset_timeout
+        if self._state == BreakerState.HALF_OPEN:
+            return now - self._probe_time < self.reset_timeout
+        return False
+
+    def allow(self, now: float) -> bool:
+        """
+        判断是否放行请求
+
+        Args:
+            now (float): 当前时间 以秒为单位
+
+        Returns:
+            bool: True放行 False拒绝
+
+        Note:
+            半开状态下同一时刻仅放行一个探测请求
+            若探测请求在reset_timeout内既未成功也未失败 例如被取消 则放行下一个探测请求
+        """
+
+        if self._state == BreakerState.CLOSED:
+            return True
+        if self.is_open(now):
+            return False
+
+        self._state = BreakerState.HALF_OPEN
+        self._probe_time = now
+        return True
+
+    def record_success(self, now: float, latency: float) -> None:
+        """
+        记录一次成功的请求
+
+        Args:
+            now (float): 当前时间 以秒为单位
+            latency (float): 请求延迟 以秒为单位
+        """
+
+        if self.slo is not None and latency > self.slo:
+            self.record_failure(now)
+            return
+
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+
+    def record_failure(self, now: float) -> None:
+        """
+        记录一次失败的请求
+
+        Args:
+            now (float): 当前时间 以秒为单位
+        """
+
+        self._failures += 1
+        if self._state == BreakerState.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._state = BreakerState.OPEN
+            self._opened_time = now
+
+
+class CircuitBreakers(object):
+    """
+    按端点和传输方式划分的熔断器组
+
+    Args:
+        failure_threshold (int, optional): 触发熔断的连续失败次数. Defaults to 5.
+        slo (float, optional): 各端点默认的延迟目标 以秒为单位 None则不检查延迟. Defaults to None.
+        reset_timeout (float, optional): 熔断后经过多久放行探测请求 以秒为单位. Defaults to 10.0.
+        capacity (int, optional): 自动创建的端点熔断器的最大数量 超出时淘汰最久未使用的熔断器. Defaults to 256.
+
+    Note:
+        http端点以url的path表示 如"/c/f/pb/page" websocket端点以cmd表示 如302001
+        除各端点的熔断器外 http和websocket两种传输方式各有一个整体的熔断器
+        请求仅在端点和传输方式的熔断器均放行时才会发出 否则抛出CircuitOpenError
+        图片等按资源区分path的请求会产生大量端点 因此自动创建的端点熔断器数量受capacity限制
+        通过set_endpoint单独设置的端点不受该限制
+        通过Client(breakers=...)为单个账号启用
+    """
+
+    __slots__ = [
+        'failure_threshold',
+        'slo',
+        'reset_timeout',
+        'capacity',
+        '_configured',
+        '_endpoints',
+        '_transports',
+    ]
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        slo: Optional[float] = None,
+        reset_timeout: float = 10.0,
+        capacity: int = 256,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.slo = slo
+        self.reset_timeout = reset_timeout
+        self.capacity = capacity
+        self._configured: Dict[TypeEndpoint, CircuitBreaker] = {}
+        self._endpoints: "OrderedDict[TypeEndpoint, CircuitBreaker]" = OrderedDict()
+        self._transports: Dict[str, CircuitBreaker] = {
+            'http': CircuitBreaker(failure_threshold, None, reset_timeout),
+            'ws': CircuitBreaker(failure_threshold, None, reset_timeout),
+        }
+
+    def set_endpoint(
+        self,
+        endpoint: TypeEndpoint,
+        failure_threshold: Optional[int] = None,
+        slo: Optional[float] = None,
+        reset_timeout: Optional[float] = None,
+    ) -> None:
+        """
+        单独设置端点的熔断参数
+
+        Args:
+            endpoint (str | int): http请求的path或websocket请求的cmd
+            failure_threshold (int, optional): 触发熔断的连续失败次数 None则使用默认值. Defaults to None.
+            slo (float, optional): 延迟目标 以秒为单位 None则使用默认值. Defaults to None.
+            reset_timeout (float, optional): 熔断后经过多久放行探测请求 以秒为单位 None则使用默认值. Defaults to None.
+        """
+
+        self._endpoints.pop(endpoint, None)
+        self._configured[endpoint] = CircuitBreaker(
+            self.failure_threshold if failure_threshold is None else failure_threshold,
+            self.slo if slo is None else slo,
+            self.reset_timeout if reset_timeout is None else reset_timeout,
+        )
+
+    def get(self, endpoint: TypeEndpoint) -> CircuitBreaker:
+        """
+        获取端点的熔断器
+
+        Args:
+            endpoint (str | int): http请求的path或websocket请求的cmd
+
+        Returns:
+            CircuitBreaker: 熔断器
+        """
+
+        breaker = self._find(endpoint)
+        if breaker is None:
+            while len(self._endpoints) >= self.capacity > 0:
+                self._endpoints.popitem(last=False)
+            breaker = self._endpoints[endpoint] = CircuitBreaker(self.failure_threshold, self.slo, self.reset_timeout)
+        return breaker
+
+    def _find(self, endpoint: TypeEndpoint) -> Optional[CircuitBreaker]:
+        breaker = self._configured.get(endpoint, None)
+        if breaker is None:
+            breaker = self._endpoints.get(endpoint, None)
+            if breaker is not None:
+                self._endpoints.move_to_end(endpoint)
+        return breaker
+
+    def transport(self, name: str) -> CircuitBreaker:
+        """
+        获取传输方式的整体熔断器
+
+        Args:
+            name (str): 传输方式 "http"或"ws"
+
+        Returns:
+            CircuitBreaker: 熔断器
+        """
+
+        return self._transports[name]
+
+    def _transport_of(self, endpoint: TypeEndpoint) -> CircuitBreaker:
+        return self._transports['ws' if isinstance(endpoint, int) else 'http']
+
+    def is_open(self, endpoint: TypeEndpoint) -> bool:
+        """
+        判断此刻向端点发起的请求是否会被拒绝
+
+        Args:
+            endpoint (str | int): http请求的path或websocket请求的cmd
+
+        Returns:
+            bool: True会被拒绝 False会被放行
+        """
+
+        now = time.monotonic()
+        if self._transport_of(endpoint).is_open(now):
+            return True
+        breaker = self._find(endpoint)
+        return breaker is not None and breaker.is_open(now)
+
+    def allow(self, endpoint: TypeEndpoint) -> bool:
+        """
+        判断是否放行向端点发起的请求
+
+        Args:
+            endpoint (str | int): http请求的path或websocket请求的cmd
+
+        Returns:
+            bool: True放行 False拒绝
+
+        Note:
+            先检查两个熔断器再放行 避免其中一个拒绝时白白占用另一个的半开探测名额
+        """
+
+        now = time.monotonic()
+        breaker = self.get(endpoint)
+        transport = self._transport_of(endpoint)
+        if breaker.is_open(now) or transport.is_open(now):
+            return False
+
+        breaker.allow(now)
+        transport.allow(now)
+        return True
+
+    def record_success(self, endpoint: TypeEndpoint, latency: float) -> None:
+        """
+        记录一次成功的请求
+
+        Args:
+            endpoint (str | int): http请求的path或websocket请求的cmd
+            latency (float): 请求延迟 以秒为单位
+        """
+
+        now = time.monotonic()
+        self._transport_of(endpoint).record_success(now, latency)
+        self.get(endpoint).record_success(now, latency)
+
+    def record_failure(self, endpoint: TypeEndpoint) -> None:
+        """
+        记录一次失败的请求
+
+        Args:
+            endpoint (str | int): http请求的path或websocket请求的cmd
+        """
+
+        now = time.monotonic()
+        self._transport_of(endpoint).record_failure(now)
+        self.get(endpoint).record_failure(now)
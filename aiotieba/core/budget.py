@@ -0,0 +1,326 @@
+import asyncio
+import collections
+import time
+from typing import Dict, Hashable, List, Optional, OrderedDict, Union
+
+from .priority import PriorityWaiter, get_priority
+
+TypeEndpoint = Union[str, int]
+
+
+class ConnectionBudget(object):
+    """
+    全局连接预算
+    超出预算的连接请求优先按请求优先级放行 同优先级时按账号轮转 以保证各账号公平地获得连接
+
+    Args:
+        limit (int): 允许同时占用的最大连接数
+        aging (float, optional): 排队请求每等待多少秒提升一级优先级 用于防止低优先级请求饿死 0则不提升. Defaults to 5.0.
+
+    Note:
+        连接从被取出到被放回连接池或关闭的期间均占用预算
+    """
+
+    __slots__ = [
+        'limit',
+        'aging',
+        '_in_use',
+        '_waiters',
+        '_seq',
+    ]
+
+    def __init__(self, limit: int, aging: float = 5.0) -> None:
+        self.limit = limit
+        self.aging = aging
+        self._in_use = 0
+        self._waiters: OrderedDict[Hashable, List[PriorityWaiter]] = collections.OrderedDict()
+        self._seq = 0
+
+    @property
+    def in_use(self) -> int:
+        """
+        正在占用的连接数
+        """
+
+        return self._in_use
+
+    @property
+    def waiting(self) -> int:
+        """
+        正在排队的连接请求数
+        """
+
+        return sum(len(q) for q in self._waiters.values())
+
+    async def acquire(self, key: Hashable) -> None:
+        """
+        占用一个连接预算
+
+        Args:
+            key (Hashable): 账号标识
+        """
+
+        if self._in_use < self.limit and not self._waiters:
+            self._in_use += 1
+            return
+
+        self._seq += 1
+        waiter = PriorityWaiter(get_priority(), self._seq, asyncio.get_running_loop().create_future())
+        queue = self._waiters.get(key, None)
+        if queue is None:
+            queue = self._waiters[key] = []
+        queue.append(waiter)
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # 已被分配预算但随即被取消
+                self.release()
+            elif (queue := self._waiters.get(key, None)) is not None:
+                queue.remove(waiter)
+                if not queue:
+                    del self._waiters[key]
+            raise
+
+    def release(self) -> None:
+        """
+        归还一个连接预算
+        """
+
+        self._in_use -= 1
+
+        while self._in_use < self.limit and self._waiters:
+            now = time.monotonic()
+
+            # 选出各账号中最优先的等待者 优先级相同时选择排在最前的账号
+            best_key = None
+            best_waiter = None
+            best_order = None
+            for key, queue in self._waiters.items():
+                waiter = min(queue, key=lambda w: w.order(now, self.aging))
+                order = waiter.order(now, self.aging)[0]
+                if best_order is None or order < best_order:
+                    best_key, best_waiter, best_order = key, waiter, order
+
+            # 被选中的账号移到队尾 实现轮转
+            queue = self._waiters.pop(best_key)
+            queue.remove(best_waiter)
+            if queue:
+                self._waiters[best_key] = queue
+
+            if best_waiter.future.done():
+                continue
+            self._in_use += 1
+            best_waiter.future.set_result(None)
+
+
+class BudgetStats(object):
+    """
+    在途请求预算的排队统计
+
+    Attributes:
+        waited (int): 发生过排队的请求数
+        total_wait (float): 累计排队时间 以秒为单位
+        max_wait (float): 最长排队时间 以秒为单位
+    """
+
+    __slots__ = [
+        'waited',
+        'total_wait',
+        'max_wait',
+    ]
+
+    def __init__(self) -> None:
+        self.waited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def avg_wait(self) -> float:
+        """
+        平均排队时间 以秒为单位
+        """
+
+        return self.total_wait / self.waited if self.waited else 0.0
+
+    def __repr__(self) -> str:
+        return str(
+            {
+                'waited': self.waited,
+                'total_wait': self.total_wait,
+                'max_wait': self.max_wait,
+            }
+        )
+
+
+def _decrease(counter: Dict, key: Hashable) -> None:
+    if (num := counter[key] - 1) > 0:
+        counter[key] = num
+    else:
+        del counter[key]
+
+
+class RequestBudget(object):
+    """
+    在途请求预算
+    超出预算的请求将排队等待 而不是无限制地占用连接与内存
+
+    Args:
+        limit (int, optional): 最大在途请求数 0则不限制. Defaults to 64.
+        per_host (int, optional): 单个主机的最大在途请求数 0则不限制. Defaults to 0.
+        endpoints (dict[str | int, int], optional): 各端点的最大在途请求数
+            http端点以url的path表示 如"/c/f/pb/page" websocket端点以cmd表示 如302001. Defaults to None.
+        by_priority (bool, optional): True则按请求优先级排队 同优先级先进先出 False则先进先出. Defaults to True.
+        aging (float, optional): 排队请求每等待多少秒提升一级优先级 用于防止低优先级请求饿死 0则不提升. Defaults to 5.0.
+
+    Note:
+        通过Client(request_budget=...)启用 可将同一个预算传给多个Client以实现全局限制
+        http请求从发送到读取完响应 websocket请求从发送到读取响应或超时的期间均占用预算
+        请求优先级见Priority与request_priority
+    """
+
+    __slots__ = [
+        'limit',
+        'per_host',
+        'by_priority',
+        'aging',
+        '_endpoint_limits',
+        '_in_flight',
+        '_host_in_flight',
+        '_endpoint_in_flight',
+        '_waiters',
+        '_seq',
+        'stats',
+    ]
+
+    def __init__(
+        self,
+        limit: int = 64,
+        per_host: int = 0,
+        endpoints: Optional[Dict[TypeEndpoint, int]] = None,
+        by_priority: bool = True,
+        aging: float = 5.0,
+    ) -> None:
+        self.limit = limit
+        self.per_host = per_host
+        self.by_priority = by_priority
+        self.aging = aging
+        self._endpoint_limits: Dict[TypeEndpoint, int] = dict(endpoints) if endpoints else {}
+        self._in_flight = 0
+        # 仅保存有在途请求的主机和端点 以免按资源区分的path无限累积
+        self._host_in_flight: Dict[str, int] = {}
+        self._endpoint_in_flight: Dict[TypeEndpoint, int] = {}
+        self._waiters: List[PriorityWaiter] = []
+        self._seq = 0
+        self.stats = BudgetStats()
+
+    def set_endpoint(self, endpoint: TypeEndpoint, limit: int) -> None:
+        """
+        设置端点的最大在途请求数
+
+        Args:
+            endpoint (str | int): http请求的path或websocket请求的cmd
+            limit (int): 最大在途请求数 0则不限制
+        """
+
+        self._endpoint_limits[endpoint] = limit
+
+    @property
+    def in_flight(self) -> int:
+        """
+        在途请求数
+        """
+
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        正在排队的请求数
+        """
+
+        return len(self._waiters)
+
+    def _fits(self, host: str, endpoint: TypeEndpoint) -> bool:
+        if self.limit and self._in_flight >= self.limit:
+            return False
+        if self.per_host and self._host_in_flight.get(host, 0) >= self.per_host:
+            return False
+        ep_limit = self._endpoint_limits.get(endpoint, 0)
+        if ep_limit and self._endpoint_in_flight.get(endpoint, 0) >= ep_limit:
+            return False
+        return True
+
+    def _take(self, host: str, endpoint: TypeEndpoint) -> None:
+        self._in_flight += 1
+        self._host_in_flight[host] = self._host_in_flight.get(host, 0) + 1
+        self._endpoint_in_flight[endpoint] = self._endpoint_in_flight.get(endpoint, 0) + 1
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        if self.by_priority:
+            self._waiters.sort(key=lambda w: w.order(now, self.aging))
+
+        # 按顺序放行所有能放行的等待者 受主机或端点限制的等待者不会阻塞其后的等待者
+        remains = []
+        for waiter in self._waiters:
+            if waiter.future.done():
+                continue
+            if not self._fits(waiter.host, waiter.endpoint):
+                remains.append(waiter)
+                continue
+            self._take(waiter.host, waiter.endpoint)
+            waiter.future.set_result(None)
+
+            wait_time = now - waiter.enqueue_time
+            self.stats.waited += 1
+            self.stats.total_wait += wait_time
+            if wait_time > self.stats.max_wait:
+                self.stats.max_wait = wait_time
+
+        self._waiters = remains
+
+    async def acquire(self, host: str, endpoint: TypeEndpoint) -> None:
+        """
+        占用一个在途请求预算
+
+        Args:
+            host (str): 目标主机
+            endpoint (str | int): http请求的path或websocket请求的cmd
+        """
+
+        if not self._waiters and self._fits(host, endpoint):
+            self._take(host, endpoint)
+            return
+
+        self._seq += 1
+        future = asyncio.get_running_loop().create_future()
+        waiter = PriorityWaiter(get_priority(), self._seq, future, host, endpoint)
+        self._waiters.append(waiter)
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 已被放行但随即被取消
+                self.release(host, endpoint)
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self, host: str, endpoint: TypeEndpoint) -> None:
+        """
+        归还一个在途请求预算
+
+        Args:
+            host (str): 目标主机
+            endpoint (str | int): http请求的path或websocket请求的cmd
+        """
+
+        self._in_flight -= 1
+        _decrease(self._host_in_flight, host)
+        _decrease(self._endpoint_in_flight, endpoint)
+        if self._waiters:
+            self._dispatch()
@@ -0,0 +1,110 @@
+from collections import OrderedDict
+from typing import Optional
+
+from .histogram import SlidingHistogram
+
+
+class _BodySizeStats(object):
+    """
+    单个端点的响应body大小统计
+    """
+
+    __slots__ = [
+        'ewma',
+        'hist',
+    ]
+
+    def __init__(self, window: int) -> None:
+        self.ewma = 0.0
+        self.hist = SlidingHistogram(window)
+
+
+class BufsizeEstimator(object):
+    """
+    按端点学习响应body的大小 以估计合适的读缓冲区大小
+    样本不足时使用各接口硬编码的读缓冲区大小作为初值
+
+    Args:
+        alpha (float, optional): body大小指数移动平均的平滑系数. Defaults to 0.2.
+        percentile (float, optional): 参考的body大小分位数. Defaults to 0.9.
+        min_samples (int, optional): 开始使用估计值前所需的最少样本数. Defaults to 8.
+        window (int, optional): 每个端点保留的最近样本数. Defaults to 64.
+        min_bufsize (int, optional): 读缓冲区大小的下限 以字节为单位. Defaults to 4KiB.
+        max_bufsize (int, optional): 读缓冲区大小的上限 以字节为单位. Defaults to 4MiB.
+        capacity (int, optional): 最多统计的端点数 超出时淘汰最久未使用的端点. Defaults to 256.
+
+    Note:
+        估计值取指数移动平均与分位数中的较大者 并向上取整到2的幂 以免估计值随每个样本抖动
+        http端点以url的path表示 记录的是未解压的body大小
+        图片等按资源区分path的请求会产生大量端点 因此统计的端点数受capacity限制
+    """
+
+    __slots__ = [
+        'alpha',
+        'percentile',
+        'min_samples',
+        'min_bufsize',
+        'max_bufsize',
+        'capacity',
+        '_window',
+        '_stats',
+    ]
+
+    def __init__(
+        self,
+        alpha: float = 0.2,
+        percentile: float = 0.9,
+        min_samples: int = 8,
+        window: int = 64,
+        min_bufsize: int = 4 * 1024,
+        max_bufsize: int = 4 * 1024 * 1024,
+        capacity: int = 256,
+    ) -> None:
+        self.alpha = alpha
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_bufsize = min_bufsize
+        self.max_bufsize = max_bufsize
+        self.capacity = capacity
+        self._window = window
+        self._stats: "OrderedDict[str, _BodySizeStats]" = OrderedDict()
+
+    def record(self, path: str, size: int) -> None:
+        """
+        记录端点的一次响应body大小
+
+        Args:
+            path (str): url的path
+            size (int): body大小 以字节为单位
+        """
+
+        stats = self._stats.get(path, None)
+        if stats is None:
+            while len(self._stats) >= self.capacity > 0:
+                self._stats.popitem(last=False)
+            stats = self._stats[path] = _BodySizeStats(self._window)
+            stats.ewma = float(size)
+        else:
+            self._stats.move_to_end(path)
+            stats.ewma += self.alpha * (size - stats.ewma)
+        stats.hist.record(size)
+
+    def estimate(self, path: str, hint: int) -> int:
+        """
+        估计端点的读缓冲区大小
+
+        Args:
+            path (str): url的path
+            hint (int): 样本不足时使用的读缓冲区大小 以字节为单位
+
+        Returns:
+            int: 读缓冲区大小 以字节为单位
+        """
+
+        stats: Optional[_BodySizeStats] = self._stats.get(path, None)
+        if stats is None or len(stats.hist) < self.min_samples:
+            return hint
+
+        size = int(max(stats.ewma, stats.hist.percentile(self.percentile)))
+        bufsize = 1 << max(size - 1, 0).bit_length()
+        return min(max(bufsize, self.min_bufsize), self.max_bufsize)
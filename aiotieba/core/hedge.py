@@ -0,0 +1,98 @@
+from typing import Dict, Iterable, Optional
+
+from .histogram import SlidingHistogram
+
+
+class Hedger(object):
+    """
+    对冲请求配置
+    若请求在最近延迟的某个分位数内仍未完成 则通过另一个连接发送一个相同的请求
+    最先返回的响应将被采用 另一个请求将被取消
+
+    Args:
+        paths (Iterable[str], optional): 启用对冲的http端点 以url的path表示.
+            Defaults to ("/c/f/frs/page", "/c/f/pb/page").
+        percentile (float, optional): 决定对冲延迟的延迟分位数. Defaults to 0.95.
+        min_delay (float, optional): 对冲延迟的下限 以秒为单位. Defaults to 0.05.
+        max_delay (float, optional): 对冲延迟的上限 以秒为单位 样本不足时也使用该值. Defaults to 2.0.
+        min_samples (int, optional): 使用分位数前所需的最少样本数. Defaults to 16.
+        window (int, optional): 每个端点保留的最近样本数. Defaults to 128.
+
+    Note:
+        通过Client(hedger=...)为单个账号启用
+        对冲请求会带来额外的服务端负载 仅应对幂等的读请求启用
+    """
+
+    __slots__ = [
+        'paths',
+        'percentile',
+        'min_delay',
+        'max_delay',
+        'min_samples',
+        '_window',
+        '_hists',
+        'hedged',
+        'hedge_wins',
+    ]
+
+    def __init__(
+        self,
+        paths: Iterable[str] = ("/c/f/frs/page", "/c/f/pb/page"),
+        percentile: float = 0.95,
+        min_delay: float = 0.05,
+        max_delay: float = 2.0,
+        min_samples: int = 16,
+        window: int = 128,
+    ) -> None:
+        self.paths = set(paths)
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self._window = window
+        self._hists: Dict[str, SlidingHistogram] = {}
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def histogram(self, path: str) -> Optional[SlidingHistogram]:
+        """
+        获取端点的延迟直方图
+
+        Args:
+            path (str): url的path
+
+        Returns:
+            SlidingHistogram | None: 延迟直方图 无记录时返回None
+        """
+
+        return self._hists.get(path, None)
+
+    def record(self, path: str, latency: float) -> None:
+        """
+        记录端点的一次成功请求的延迟
+
+        Args:
+            path (str): url的path
+            latency (float): 延迟 以秒为单位
+        """
+
+        hist = self._hists.get(path, None)
+        if hist is None:
+            hist = self._hists[path] = SlidingHistogram(self._window)
+        hist.record(latency)
+
+    def delay(self, path: str) -> float:
+        """
+        计算端点的对冲延迟
+
+        Args:
+            path (str): url的path
+
+        Returns:
+            float: 对冲延迟 以秒为单位
+        """
+
+        hist = self._hists.get(path, None)
+        if hist is None or len(hist) < self.min_samples:
+            return self.max_delay
+        return min(self.max_delay, max(self.min_delay, hist.percentile(self.percentile)))
@@ -0,0 +1,54 @@
+import bisect
+from collections import deque
+from typing import Deque, List
+
+
+class SlidingHistogram(object):
+    """
+    滑动窗口直方图
+
+    Args:
+        window (int, optional): 保留的最近样本数. Defaults to 128.
+    """
+
+    __slots__ = [
+        '_samples',
+        '_sorted',
+    ]
+
+    def __init__(self, window: int = 128) -> None:
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._sorted: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, value: float) -> None:
+        """
+        记录一个样本
+
+        Args:
+            value (float): 样本值
+        """
+
+        if len(self._samples) == self._samples.maxlen:
+            expired = self._samples[0]
+            del self._sorted[bisect.bisect_left(self._sorted, expired)]
+        self._samples.append(value)
+        bisect.insort(self._sorted, value)
+
+    def percentile(self, q: float) -> float:
+        """
+        获取样本的分位数
+
+        Args:
+            q (float): 分位 取值范围为[0, 1]
+
+        Returns:
+            float: 分位数 无样本时返回0.0
+        """
+
+        if not self._sorted:
+            return 0.0
+        idx = min(int(q * len(self._sorted)), len(self._sorted) - 1)
+        return self._sorted[idx]
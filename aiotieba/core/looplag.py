@@ -0,0 +1,95 @@
+import asyncio
+from typing import Optional
+
+from .histogram import SlidingHistogram
+
+
+class LoopLagMonitor(object):
+    """
+    事件循环延迟监视器
+    以固定间隔调度回调 记录其实际执行时刻相对预期时刻的延迟
+
+    Args:
+        interval (float, optional): 采样间隔 以秒为单位. Defaults to 0.05.
+        window (int, optional): 保留的最近样本数. Defaults to 1024.
+        loop (asyncio.AbstractEventLoop, optional): 事件循环. Defaults to None.
+
+    Attributes:
+        max_lag (float): 启动以来观测到的最大延迟 以秒为单位
+
+    Note:
+        延迟反映了事件循环被同步代码阻塞的时长 例如在事件循环中解密或解压大块数据
+    """
+
+    __slots__ = [
+        'interval',
+        'max_lag',
+        '_hist',
+        '_handle',
+        '_expected',
+        '_loop',
+    ]
+
+    def __init__(
+        self, interval: float = 0.05, window: int = 1024, loop: Optional[asyncio.AbstractEventLoop] = None
+    ) -> None:
+        if loop is None:
+            loop = asyncio.get_running_loop()
+
+        self.interval = interval
+        self.max_lag = 0.0
+        self._hist = SlidingHistogram(window)
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._expected = 0.0
+        self._loop = loop
+
+    def __len__(self) -> int:
+        return len(self._hist)
+
+    async def __aenter__(self) -> "LoopLagMonitor":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """
+        开始采样
+        """
+
+        if self._handle is None:
+            self._expected = self._loop.time() + self.interval
+            self._handle = self._loop.call_at(self._expected, self.__tick)
+
+    def stop(self) -> None:
+        """
+        停止采样
+        """
+
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def percentile(self, q: float) -> float:
+        """
+        获取最近样本中延迟的分位数
+
+        Args:
+            q (float): 分位 取值范围为[0, 1]
+
+        Returns:
+            float: 延迟 以秒为单位 无样本时返回0.0
+        """
+
+        return self._hist.percentile(q)
+
+    def __tick(self) -> None:
+        now = self._loop.time()
+        lag = max(now - self._expected, 0.0)
+        self._hist.record(lag)
+        if lag > self.max_lag:
+            self.max_lag = lag
+
+        self._expected = now + self.interval
+        self._handle = self._loop.call_at(self._expected, self.__tick)
@@ -1,8 +1,18 @@
+import asyncio
+import socket
 from typing import Optional, Tuple, Union
 
 import aiohttp
 import yarl
 
+from .breaker import CircuitBreakers
+from .budget import ConnectionBudget, RequestBudget
+from .bufsize import BufsizeEstimator
+from .hedge import Hedger
+from .proxy import ProxyPool
+from .ratelimit import RateLimiter
+from .resolver import PinnedResolver
+
 
 class TimeConfig(object):
     """
@@ -167,6 +177,13 @@ class Network(object):
         connector (aiohttp.TCPConnector): 用于生成TCP连接的连接器
         time_cfg (TimeConfig, optional): 各种时间设置. Defaults to TimeConfig().
         proxy (tuple[yarl.URL, aiohttp.BasicAuth], optional): 输入一个 (http代理地址, 代理验证) 的元组以手动设置代理. Defaults to (None, None).
+        limiter (RateLimiter, optional): 请求限流器 None则不限流. Defaults to None.
+        hedger (Hedger, optional): 对冲请求配置 None则不启用对冲. Defaults to None.
+        breakers (CircuitBreakers, optional): 熔断器组 None则不启用熔断. Defaults to None.
+        budget (ConnectionBudget, optional): 与其他账号共享的全局连接预算 None则不限制. Defaults to None.
+        request_budget (RequestBudget, optional): 在途请求预算 None则不限制. Defaults to None.
+        proxy_pool (ProxyPool, optional): 代理池 设置后将忽略proxy参数. Defaults to None.
+        bufsizes (BufsizeEstimator, optional): 按端点估计读缓冲区大小 None则使用默认配置新建一个. Defaults to None.
     """
 
     __slots__ = [
@@ -174,6 +191,13 @@ class Network(object):
         'time',
         'proxy',
         'proxy_auth',
+        'limiter',
+        'hedger',
+        'breakers',
+        'budget',
+        'request_budget',
+        'proxy_pool',
+        'bufsizes',
     ]
 
     def __init__(
@@ -181,7 +205,90 @@ class Network(object):
         connector: aiohttp.TCPConnector,
         time_cfg: TimeConfig = TimeConfig(),
         proxy: Union[Tuple[yarl.URL, aiohttp.BasicAuth], Tuple[None, None]] = (None, None),
+        limiter: Optional[RateLimiter] = None,
+        hedger: Optional[Hedger] = None,
+        breakers: Optional[CircuitBreakers] = None,
+        budget: Optional[ConnectionBudget] = None,
+        request_budget: Optional[RequestBudget] = None,
+        proxy_pool: Optional[ProxyPool] = None,
+        bufsizes: Optional[BufsizeEstimator] = None,
     ) -> None:
         self.connector = connector
         self.time = time_cfg
         self.proxy, self.proxy_auth = proxy
+        self.limiter = limiter
+        self.hedger = hedger
+        self.breakers = breakers
+        self.budget = budget
+        self.request_budget = request_budget
+        self.proxy_pool = proxy_pool
+        self.bufsizes = BufsizeEstimator() if bufsizes is None else bufsizes
+
+    def select_proxy(self) -> Union[Tuple[yarl.URL, Optional[aiohttp.BasicAuth]], Tuple[None, None]]:
+        """
+        为下一个请求选择代理
+
+        Returns:
+            tuple[yarl.URL, aiohttp.BasicAuth | None] | tuple[None, None]: (http代理地址, 代理验证)
+        """
+
+        if self.proxy_pool is None:
+            return self.proxy, self.proxy_auth
+
+        node = self.proxy_pool.select(self)
+        return node.url, node.auth
+
+
+class SharedNetwork(object):
+    """
+    可被多个Client共享的网络上下文
+    各账号共享同一个连接器 dns缓存 全局连接预算与读缓冲区大小的估计 而headers与cookies等账号状态仍相互独立
+
+    Args:
+        time_cfg (TimeConfig, optional): 连接器的dns缓存与长连接保持时间设置. Defaults to TimeConfig().
+        limit (int, optional): 全局连接预算 即所有账号同时占用的最大连接数 0则不限制. Defaults to 100.
+        loop (asyncio.AbstractEventLoop, optional): 事件循环. Defaults to None.
+        resolver (PinnedResolver, optional): 在后台刷新解析结果的dns解析器 None则使用连接器自带的dns缓存. Defaults to None.
+
+    Note:
+        通过Client(shared_network=...)共享
+        Client退出时不会关闭共享的连接器 应在所有Client退出后调用close或使用async with
+    """
+
+    __slots__ = [
+        'connector',
+        'budget',
+        'bufsizes',
+    ]
+
+    def __init__(
+        self,
+        time_cfg: TimeConfig = TimeConfig(),
+        limit: int = 100,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        resolver: Optional[PinnedResolver] = None,
+    ) -> None:
+        if loop is None:
+            loop = asyncio.get_running_loop()
+
+        self.connector = aiohttp.TCPConnector(
+            use_dns_cache=resolver is None,
+            ttl_dns_cache=time_cfg.dns_ttl,
+            resolver=resolver,
+            family=socket.AF_INET,
+            keepalive_timeout=time_cfg.http_keepalive,
+            limit=0,
+            ssl=False,
+            loop=loop,
+        )
+        self.budget = ConnectionBudget(limit) if limit > 0 else None
+        self.bufsizes = BufsizeEstimator()
+
+    async def __aenter__(self) -> "SharedNetwork":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await self.connector.close()
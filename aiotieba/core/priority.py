@@ -0,0 +1,91 @@
+import asyncio
+import contextlib
+import contextvars
+import time
+from typing import Iterator, Optional, Tuple, Union
+
+from ..enums import Priority
+
+REQUEST_PRIORITY: contextvars.ContextVar = contextvars.ContextVar('request_priority', default=None)
+"""
+当前任务中发出的请求的优先级 None表示未指定
+"""
+
+
+def get_priority() -> int:
+    """
+    获取当前任务中发出的请求的优先级
+
+    Returns:
+        int: 优先级 数值越小越优先 未指定时为Priority.INTERACTIVE
+    """
+
+    priority: Optional[int] = REQUEST_PRIORITY.get()
+    return Priority.INTERACTIVE if priority is None else priority
+
+
+@contextlib.contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """
+    在with块内以指定的优先级发出请求
+    会覆盖各Client方法的默认优先级 在with块内创建的任务同样继承该优先级
+
+    Args:
+        priority (int): 优先级 数值越小越优先 可使用Priority枚举
+
+    Examples:
+        with request_priority(Priority.BULK):
+            await client.get_posts(tid)
+    """
+
+    token = REQUEST_PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        REQUEST_PRIORITY.reset(token)
+
+
+def aged_priority(priority: int, wait_time: float, aging: float) -> int:
+    """
+    计算考虑等待时间后的有效优先级 用于防止低优先级请求饿死
+
+    Args:
+        priority (int): 原始优先级
+        wait_time (float): 已等待的时间 以秒为单位
+        aging (float): 每等待多少秒提升一级优先级 0则不提升
+
+    Returns:
+        int: 有效优先级 数值越小越优先
+    """
+
+    if aging <= 0.0:
+        return priority
+    return priority - int(wait_time // aging)
+
+
+class PriorityWaiter(object):
+    """
+    按优先级排队的等待者
+    """
+
+    __slots__ = [
+        'priority',
+        'seq',
+        'future',
+        'enqueue_time',
+        'host',
+        'endpoint',
+    ]
+
+    def __init__(
+        self, priority: int, seq: int, future: asyncio.Future, host: str = '', endpoint: Union[str, int] = ''
+    ) -> None:
+        self.priority = priority
+        self.seq = seq
+        self.future = future
+        self.enqueue_time = time.monotonic()
+        self.host = host
+        self.endpoint = endpoint
+
+    def order(self, now: float, aging: float) -> Tuple[int, int]:
+        return aged_priority(self.priority, now - self.enqueue_time, aging), self.seq
@@ -0,0 +1,298 @@
+import asyncio
+import enum
+import time
+from collections import deque
+from typing import Deque, Dict, Hashable, Iterable, List, Optional, Tuple, Union
+
+import aiohttp
+import yarl
+
+TypeProxy = Union[str, yarl.URL, Tuple[Union[str, yarl.URL], Optional[aiohttp.BasicAuth]]]
+
+
+class ProxyStrategy(enum.IntEnum):
+    """
+    代理选择策略
+
+    Note:
+        0轮转 依次使用各个可用代理
+        1最低延迟 选择平均延迟最低的可用代理 尚无延迟样本的代理优先
+        2账号粘滞 同一账号固定使用同一个代理 该代理被剔除时临时改用其后的可用代理
+    """
+
+    ROUND_ROBIN = 0
+    LEAST_LATENCY = 1
+    STICKY = 2
+
+
+class ProxyNode(object):
+    """
+    代理池中的单个代理及其健康状况
+
+    Attributes:
+        url (yarl.URL): 代理地址
+        auth (aiohttp.BasicAuth | None): 代理验证
+        latency (float): 延迟的指数移动平均 以秒为单位 无样本时为0.0
+        successes (int): 累计成功次数
+        failures (int): 累计失败次数
+        ejections (int): 累计被剔除次数
+    """
+
+    __slots__ = [
+        'url',
+        'auth',
+        'latency',
+        'successes',
+        'failures',
+        'ejections',
+        '_results',
+        '_consecutive_failures',
+        '_ejected_until',
+    ]
+
+    def __init__(self, url: yarl.URL, auth: Optional[aiohttp.BasicAuth], window: int) -> None:
+        self.url = url
+        self.auth = auth
+        self.latency = 0.0
+        self.successes = 0
+        self.failures = 0
+        self.ejections = 0
+        self._results: Deque[bool] = deque(maxlen=window)
+        self._consecutive_failures = 0
+        self._ejected_until = 0.0
+
+    def __repr__(self) -> str:
+        return str(
+            {
+                'url': str(self.url),
+                'latency': self.latency,
+                'success_rate': self.success_rate,
+                'ejections': self.ejections,
+            }
+        )
+
+    @property
+    def success_rate(self) -> float:
+        """
+        最近请求的成功率 无样本时为1.0
+        """
+
+        if not self._results:
+            return 1.0
+        return sum(self._results) / len(self._results)
+
+    def is_ejected(self, now: float) -> bool:
+        """
+        判断此刻是否处于被剔除状态
+
+        Args:
+            now (float): 当前时间 以秒为单位
+
+        Returns:
+            bool: True被剔除 False可用
+        """
+
+        return now < self._ejected_until
+
+
+class ProxyPool(object):
+    """
+    http代理池
+    按策略为每个请求选择代理 并根据各代理的成功率与延迟自动剔除和重新接纳代理
+
+    Args:
+        proxies (Iterable[str | yarl.URL | tuple[str | yarl.URL, aiohttp.BasicAuth | None]]): 代理地址 或 (代理地址, 代理验证) 的元组
+        strategy (ProxyStrategy, optional): 代理选择策略. Defaults to ProxyStrategy.ROUND_ROBIN.
+        eject_failures (int, optional): 连续失败多少次后剔除代理. Defaults to 3.
+        min_success_rate (float, optional): 最近请求的成功率低于该值时剔除代理. Defaults to 0.5.
+        eject_time (float, optional): 代理被剔除的时长 以秒为单位 期满后重新接纳. Defaults to 30.0.
+        window (int, optional): 计算成功率时保留的最近请求数 样本数不足一半时不按成功率剔除. Defaults to 32.
+        latency_alpha (float, optional): 延迟指数移动平均的平滑系数. Defaults to 0.2.
+
+    Note:
+        通过Client(proxy_pool=...)启用 启用后Client的proxy参数将被忽略 可将同一个代理池传给多个Client
+        http请求与websocket握手的结果均计入代理的健康状况
+        若所有代理均被剔除 则选择最早期满的代理 而不是拒绝请求
+    """
+
+    __slots__ = [
+        'strategy',
+        'eject_failures',
+        'min_success_rate',
+        'eject_time',
+        'latency_alpha',
+        '_nodes',
+        '_url2node',
+        '_rr_idx',
+    ]
+
+    def __init__(
+        self,
+        proxies: Iterable[TypeProxy],
+        strategy: ProxyStrategy = ProxyStrategy.ROUND_ROBIN,
+        eject_failures: int = 3,
+        min_success_rate: float = 0.5,
+        eject_time: float = 30.0,
+        window: int = 32,
+        latency_alpha: float = 0.2,
+    ) -> None:
+        self.strategy = strategy
+        self.eject_failures = eject_failures
+        self.min_success_rate = min_success_rate
+        self.eject_time = eject_time
+        self.latency_alpha = latency_alpha
+
+        self._nodes: List[ProxyNode] = []
+        self._url2node: Dict[yarl.URL, ProxyNode] = {}
+        for proxy in proxies:
+            if isinstance(proxy, tuple):
+                url, auth = proxy
+            else:
+                url, auth = proxy, None
+            url = yarl.URL(url)
+            node = ProxyNode(url, auth, window)
+            self._nodes.append(node)
+            self._url2node[url] = node
+
+        if not self._nodes:
+            raise ValueError("proxies must not be empty")
+
+        self._rr_idx = 0
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    @property
+    def nodes(self) -> List[ProxyNode]:
+        """
+        代理池中的全部代理
+        """
+
+        return self._nodes
+
+    def available(self) -> List[ProxyNode]:
+        """
+        获取当前未被剔除的代理
+
+        Returns:
+            list[ProxyNode]: 可用代理列表
+        """
+
+        now = time.monotonic()
+        return [node for node in self._nodes if not node.is_ejected(now)]
+
+    def select(self, key: Optional[Hashable] = None) -> ProxyNode:
+        """
+        按策略选择一个代理
+
+        Args:
+            key (Hashable, optional): 账号标识 仅用于账号粘滞策略. Defaults to None.
+
+        Returns:
+            ProxyNode: 被选中的代理
+        """
+
+        now = time.monotonic()
+        num_nodes = len(self._nodes)
+
+        if self.strategy == ProxyStrategy.STICKY:
+            start = hash(key) % num_nodes
+            for i in range(num_nodes):
+                node = self._nodes[(start + i) % num_nodes]
+                if not node.is_ejected(now):
+                    return node
+
+        elif self.strategy == ProxyStrategy.LEAST_LATENCY:
+            nodes = [node for node in self._nodes if not node.is_ejected(now)]
+            if nodes:
+                return min(nodes, key=lambda n: n.latency)
+
+        else:
+            for _ in range(num_nodes):
+                node = self._nodes[self._rr_idx]
+                self._rr_idx = (self._rr_idx + 1) % num_nodes
+                if not node.is_ejected(now):
+                    return node
+
+        # 所有代理均被剔除
+        return min(self._nodes, key=lambda n: n._ejected_until)
+
+    def get(self, url: Optional[yarl.URL]) -> Optional[ProxyNode]:
+        """
+        获取代理地址对应的代理
+
+        Args:
+            url (yarl.URL | None): 代理地址
+
+        Returns:
+            ProxyNode | None: 代理 不在代理池中时返回None
+        """
+
+        if url is None:
+            return None
+        return self._url2node.get(url, None)
+
+    def is_proxy_failure(self, err: Exception) -> bool:
+        """
+        判断异常是否应归咎于代理
+        仅连接错误 超时与代理自身返回的错误计入失败 4xx或响应过大等目标服务端的响应说明代理可用
+
+        Args:
+            err (Exception): 异常
+
+        Returns:
+            bool: True应归咎于代理
+        """
+
+        return isinstance(err, (aiohttp.ClientConnectionError, aiohttp.ClientHttpProxyError, asyncio.TimeoutError))
+
+    def record_success(self, url: Optional[yarl.URL], latency: float) -> None:
+        """
+        记录一次经由代理的成功请求
+
+        Args:
+            url (yarl.URL | None): 代理地址 不在代理池中时忽略
+            latency (float): 请求延迟 以秒为单位
+        """
+
+        if (node := self.get(url)) is None:
+            return
+
+        node.successes += 1
+        node._results.append(True)
+        node._consecutive_failures = 0
+        if node.latency:
+            node.latency += self.latency_alpha * (latency - node.latency)
+        else:
+            node.latency = latency
+
+    def record_failure(self, url: Optional[yarl.URL]) -> None:
+        """
+        记录一次经由代理的失败请求
+
+        Args:
+            url (yarl.URL | None): 代理地址 不在代理池中时忽略
+        """
+
+        if (node := self.get(url)) is None:
+            return
+
+        node.failures += 1
+        node._results.append(False)
+        node._consecutive_failures += 1
+
+        if node._consecutive_failures >= self.eject_failures or (
+            len(node._results) * 2 >= node._results.maxlen and node.success_rate < self.min_success_rate
+        ):
+            self._eject(node)
+
+    def _eject(self, node: ProxyNode) -> None:
+        now = time.monotonic()
+        if node.is_ejected(now):
+            return
+
+        node.ejections += 1
+        node._ejected_until = now + self.eject_time
+        # 重新接纳时从零开始统计 以免旧样本使其再次被立即剔除
+        node._results.clear()
+        node._consecutive_failures = 0
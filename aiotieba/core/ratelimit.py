@@ -0,0 +1,195 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .budget import TypeEndpoint
+from .priority import PriorityWaiter, get_priority
+
+
+class TokenBucket(object):
+    """
+    令牌桶
+
+    Args:
+        rate (float): 每秒生成的令牌数
+        burst (float, optional): 桶容量 即允许的最大突发请求数. Defaults to 1.0.
+
+    Note:
+        调用take前应先确认wait_time为0
+    """
+
+    __slots__ = [
+        'rate',
+        'burst',
+        '_tokens',
+        '_last_time',
+    ]
+
+    def __init__(self, rate: float, burst: float = 1.0) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._last_time = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._last_time) * self.rate)
+        self._last_time = now
+
+    def wait_time(self, now: float) -> float:
+        """
+        计算距离可取出一个令牌还需等待的时间
+
+        Args:
+            now (float): 当前时间 以秒为单位
+
+        Returns:
+            float: 需要等待的时间 以秒为单位
+        """
+
+        self._refill(now)
+        if self._tokens >= 1.0:
+            return 0.0
+        return (1.0 - self._tokens) / self.rate
+
+    def take(self) -> None:
+        """
+        取出一个令牌
+        """
+
+        self._tokens -= 1.0
+
+
+class RateLimiter(object):
+    """
+    请求限流器
+
+    Args:
+        rate (float, optional): 整体每秒请求数 None则不限制. Defaults to None.
+        burst (float, optional): 整体允许的最大突发请求数. Defaults to 1.0.
+        endpoints (dict[str | int, tuple[float, float]], optional): 各端点的 (每秒请求数, 最大突发请求数)
+            http端点以url的path表示 如"/c/f/pb/page" websocket端点以cmd表示 如302001. Defaults to None.
+        parent (RateLimiter, optional): 上级限流器 可将同一个上级限流器传给多个账号的限流器以实现全局限流. Defaults to None.
+        aging (float, optional): 排队请求每等待多少秒提升一级优先级 用于防止低优先级请求饿死 0则不提升. Defaults to 5.0.
+
+    Note:
+        通过Client(rate_limiter=...)为单个账号启用
+        排队的请求按请求优先级放行 见Priority与request_priority
+    """
+
+    __slots__ = [
+        '_bucket',
+        '_endpoint_buckets',
+        'parent',
+        'aging',
+        '_waiters',
+        '_timer',
+        '_seq',
+    ]
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: float = 1.0,
+        endpoints: Optional[Dict[TypeEndpoint, Tuple[float, float]]] = None,
+        parent: Optional["RateLimiter"] = None,
+        aging: float = 5.0,
+    ) -> None:
+        self._bucket = TokenBucket(rate, burst) if rate else None
+        self._endpoint_buckets: Dict[TypeEndpoint, TokenBucket] = {}
+        if endpoints:
+            for endpoint, (ep_rate, ep_burst) in endpoints.items():
+                self.set_endpoint(endpoint, ep_rate, ep_burst)
+        self.parent = parent
+        self.aging = aging
+        self._waiters: List[PriorityWaiter] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._seq = 0
+
+    def set_endpoint(self, endpoint: TypeEndpoint, rate: float, burst: float = 1.0) -> None:
+        """
+        设置端点的限流参数
+
+        Args:
+            endpoint (str | int): http请求的path或websocket请求的cmd
+            rate (float): 每秒请求数
+            burst (float, optional): 最大突发请求数. Defaults to 1.0.
+        """
+
+        self._endpoint_buckets[endpoint] = TokenBucket(rate, burst)
+
+    def _buckets(self, endpoint: TypeEndpoint) -> List[TokenBucket]:
+        buckets = []
+        limiter = self
+        while limiter is not None:
+            if (bucket := limiter._endpoint_buckets.get(endpoint, None)) is not None:
+                buckets.append(bucket)
+            if limiter._bucket is not None:
+                buckets.append(limiter._bucket)
+            limiter = limiter.parent
+        return buckets
+
+    def _try_take(self, endpoint: TypeEndpoint, now: float) -> float:
+        """
+        若端点 本限流器及所有上级限流器均有可用令牌 则各取出一个
+
+        Returns:
+            float: 0.0表示已取出 否则为仍需等待的时间 以秒为单位
+        """
+
+        buckets = self._buckets(endpoint)
+        delay = max((bucket.wait_time(now) for bucket in buckets), default=0.0)
+        if delay == 0.0:
+            for bucket in buckets:
+                bucket.take()
+        return delay
+
+    def _dispatch(self) -> None:
+        self._timer = None
+        now = time.monotonic()
+        self._waiters.sort(key=lambda w: w.order(now, self.aging))
+
+        # 按优先级依次放行 排在前面的等待者若因共享的令牌桶受阻 其后需要同一令牌桶的等待者也同样受阻
+        remains = []
+        min_delay = None
+        for waiter in self._waiters:
+            if waiter.future.done():
+                continue
+            delay = self._try_take(waiter.endpoint, now)
+            if delay == 0.0:
+                waiter.future.set_result(None)
+                continue
+            remains.append(waiter)
+            if min_delay is None or delay < min_delay:
+                min_delay = delay
+
+        self._waiters = remains
+        if min_delay is not None:
+            self._timer = asyncio.get_running_loop().call_later(min_delay, self._dispatch)
+
+    async def acquire(self, endpoint: TypeEndpoint) -> None:
+        """
+        等待直至允许向端点发送请求
+        排队的请求按请求优先级放行
+
+        Args:
+            endpoint (str | int): http请求的path或websocket请求的cmd
+        """
+
+        if not self._waiters and self._try_take(endpoint, time.monotonic()) == 0.0:
+            return
+
+        self._seq += 1
+        future = asyncio.get_running_loop().create_future()
+        waiter = PriorityWaiter(get_priority(), self._seq, future, endpoint=endpoint)
+        self._waiters.append(waiter)
+        # 每个新的等待者都立即尝试放行 使其只需等待共享同一令牌桶的等待者 而不是其他端点的定时器
+        if self._timer is not None:
+            self._timer.cancel()
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
@@ -0,0 +1,220 @@
+import asyncio
+import socket
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import aiohttp
+from aiohttp.abc import AbstractResolver
+
+from ..const import APP_BASE_HOST, WEB_BASE_HOST, WS_HOST
+from ..logging import get_logger as LOG
+
+try:
+    from aiohttp.abc import ResolveResult
+except ImportError:
+    # aiohttp<3.10 的解析结果为同结构的普通dict
+    ResolveResult = Dict[str, Any]
+
+TypeHostKey = Tuple[str, int]
+
+
+class _HostRecord(object):
+    """
+    单个主机的解析结果
+    """
+
+    __slots__ = [
+        'addrs',
+        'expire_time',
+        'rr_idx',
+    ]
+
+    def __init__(self, addrs: List[Tuple[str, int]], expire_time: float) -> None:
+        self.addrs = addrs
+        self.expire_time = expire_time
+        self.rr_idx = 0
+
+    def next_addrs(self) -> List[Tuple[str, int]]:
+        """
+        以轮转的起点返回全部地址
+        """
+
+        idx = self.rr_idx
+        self.rr_idx = (idx + 1) % len(self.addrs)
+        return self.addrs[idx:] + self.addrs[:idx]
+
+
+class PinnedResolver(AbstractResolver):
+    """
+    预解析并固定主机地址的dns解析器
+    在解析结果过期前于后台刷新 保留全部A记录并在各地址间轮转分配新连接
+
+    Args:
+        hosts (Iterable[str], optional): 需要在后台持续刷新的主机.
+            Defaults to ("tiebac.baidu.com", "tieba.baidu.com", "im.tieba.baidu.com").
+        overrides (dict[str, str | list[str]], optional): 静态的 主机->IP 映射 命中的主机不进行dns解析. Defaults to None.
+        ttl (float, optional): 解析结果的缓存时间 以秒为单位. Defaults to 600.0.
+        refresh_ahead (float, optional): 距过期还剩多少秒时开始后台刷新 以秒为单位. Defaults to 60.0.
+        retry_interval (float, optional): 后台刷新失败后的重试间隔 以秒为单位. Defaults to 5.0.
+        loop (asyncio.AbstractEventLoop, optional): 事件循环. Defaults to None.
+
+    Note:
+        通过Client(resolver=...)或SharedNetwork(resolver=...)启用 此时连接器自身的dns缓存将被关闭
+        连接器会按返回的顺序依次尝试各地址 因此某个IP连接失败时会自动切换到下一个IP
+        刷新失败时继续使用过期的解析结果 以免dns故障阻塞请求
+        Client退出时不会关闭传入的解析器 应在所有Client退出后调用close或使用async with
+    """
+
+    __slots__ = [
+        'hosts',
+        'overrides',
+        'ttl',
+        'refresh_ahead',
+        'retry_interval',
+        '_loop',
+        '_resolver',
+        '_records',
+        '_resolving',
+        '_refresher',
+    ]
+
+    def __init__(
+        self,
+        hosts: Iterable[str] = (APP_BASE_HOST, WEB_BASE_HOST, WS_HOST),
+        overrides: Optional[Dict[str, Union[str, List[str]]]] = None,
+        ttl: float = 600.0,
+        refresh_ahead: float = 60.0,
+        retry_interval: float = 5.0,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> None:
+        if loop is None:
+            loop = asyncio.get_running_loop()
+
+        self.hosts = list(hosts)
+        self.overrides: Dict[str, List[str]] = {}
+        if overrides:
+            for host, ips in overrides.items():
+                self.overrides[host] = [ips] if isinstance(ips, str) else list(ips)
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.retry_interval = retry_interval
+
+        self._loop = loop
+        self._resolver = aiohttp.DefaultResolver(loop=loop)
+        self._records: Dict[TypeHostKey, _HostRecord] = {}
+        self._resolving: Dict[TypeHostKey, asyncio.Task] = {}
+        self._refresher: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "PinnedResolver":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        """
+        启动后台刷新任务
+
+        Note:
+            首次解析时也会自动启动
+        """
+
+        if self._refresher is None or self._refresher.done():
+            self._refresher = self._loop.create_task(self.__refresh_loop(), name="dns_refresher")
+
+    async def close(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            self._refresher = None
+        for task in self._resolving.values():
+            task.cancel()
+        self._resolving.clear()
+        await self._resolver.close()
+
+    async def resolve(self, host: str, port: int = 0, family: int = socket.AF_INET) -> List[ResolveResult]:
+        if (ips := self.overrides.get(host, None)) is not None:
+            addrs = [(ip, socket.AF_INET6 if ':' in ip else socket.AF_INET) for ip in ips]
+            return self._pack(host, port, addrs)
+
+        self.start()
+
+        key = (host, family)
+        record = self._records.get(key, None)
+        if record is None:
+            record = await self._resolve(key)
+        elif time.monotonic() >= record.expire_time - self.refresh_ahead and key not in self._resolving:
+            # 提前在后台刷新 本次仍使用缓存的结果
+            self._loop.create_task(self._resolve_quietly(key))
+
+        return self._pack(host, port, record.next_addrs())
+
+    @staticmethod
+    def _pack(host: str, port: int, addrs: List[Tuple[str, int]]) -> List[ResolveResult]:
+        return [
+            {
+                'hostname': host,
+                'host': ip,
+                'port': port,
+                'family': family,
+                'proto': 0,
+                'flags': socket.AI_NUMERICHOST | socket.AI_NUMERICSERV,
+            }
+            for ip, family in addrs
+        ]
+
+    async def _resolve(self, key: TypeHostKey) -> _HostRecord:
+        # 合并对同一主机的并发解析
+        task = self._resolving.get(key, None)
+        if task is None:
+            task = self._resolving[key] = self._loop.create_task(self.__do_resolve(key))
+            task.add_done_callback(lambda _: self._resolving.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def __do_resolve(self, key: TypeHostKey) -> _HostRecord:
+        host, family = key
+        results = await self._resolver.resolve(host, 0, family)
+
+        # 去重并保持顺序
+        addrs = list(dict.fromkeys((res['host'], res['family']) for res in results))
+        if not addrs:
+            raise OSError(f"No address for host {host}")
+
+        record = self._records.get(key, None)
+        if record is not None and record.addrs == addrs:
+            record.expire_time = time.monotonic() + self.ttl
+        else:
+            record = self._records[key] = _HostRecord(addrs, time.monotonic() + self.ttl)
+        return record
+
+    async def _resolve_quietly(self, key: TypeHostKey) -> bool:
+        try:
+            await self._resolve(key)
+        except asyncio.CancelledError:
+            raise
+        except Exception as err:
+            LOG().warning(f"Failed to refresh host {key[0]}. {err}")
+            return False
+        return True
+
+    async def __refresh_loop(self) -> None:
+        while 1:
+            now = time.monotonic()
+            next_time = now + self.ttl - self.refresh_ahead
+            failed = False
+
+            for host in self.hosts:
+                if host in self.overrides:
+                    continue
+                key = (host, socket.AF_INET)
+                record = self._records.get(key, None)
+                if record is None or now >= record.expire_time - self.refresh_ahead:
+                    if not await self._resolve_quietly(key):
+                        failed = True
+                        continue
+                    record = self._records[key]
+                next_time = min(next_time, record.expire_time - self.refresh_ahead)
+
+            if failed:
+                next_time = min(next_time, time.monotonic() + self.retry_interval)
+            await asyncio.sleep(max(next_time - time.monotonic(), 1.0))
@@ -1,21 +1,37 @@
 import asyncio
 import binascii
+import heapq
+import random
 import secrets
 import time
-import weakref
-from typing import Awaitable, Callable, Dict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 import aiohttp
 import yarl
 
-from ..exception import HTTPStatusError
+from ..const import WS_HOST
+from ..exception import CircuitOpenError, HTTPStatusError
 from ..helper import WsStatus, timeout
+from ..logging import get_logger as LOG
 from ..request.common import req2res
 from ..request.websocket import pack_ws_bytes, parse_ws_bytes
 from .account import Account
+from .breaker import CircuitBreakers
+from .budget import RequestBudget
 from .network import Network
 
-TypeWebsocketCallback = Callable[["WsCore", bytes, int], Awaitable[None]]
+try:
+    from aiohttp._websocket.reader import WebSocketDataQueue
+except ImportError:
+    WebSocketDataQueue = None
+
+TypeWebsocketCallback = Callable[["WsCore", Union[bytes, memoryview], int], Awaitable[None]]
+TypeWebsocketHandshake = Callable[["WsConnection"], Awaitable[None]]
+
+# 重放可能产生副作用的cmd 连接断开时直接失败
+# 1001: 上传密钥 与具体连接绑定
+# 205001: 发送私信
+NON_IDEMPOTENT_CMDS = frozenset((1001, 205001))
 
 
 class MsgIDPair(object):
@@ -71,7 +87,7 @@ class MsgIDManager(object):
         if mid_pair is not None:
             mid_pair.update_msg_id(msg_id)
         else:
-            mid_pair = MsgIDPair(msg_id, msg_id)
+            self.gid2mid[group_id] = MsgIDPair(msg_id, msg_id)
 
     def get_msg_id(self, group_id: int) -> int:
         """
@@ -102,135 +118,452 @@ class WsResponse(object):
     websocket响应
 
     Args:
-        data_future (asyncio.Future): 用于等待读事件到来的Future
         req_id (int): 请求id
-        read_timeout (float): 读超时时间
+        deadline (float): 读超时的截止时刻 以事件循环的时钟为准
         loop (asyncio.AbstractEventLoop): 事件循环
     """
 
     __slots__ = [
-        '__weakref__',
         'future',
         'req_id',
-        'read_timeout',
+        'deadline',
+        'waiter',
         'loop',
+        'breakers',
+        'cmd',
+        'send_time',
+        'request_budget',
+        'req_data',
     ]
 
-    def __init__(self, req_id: int, read_timeout: float, loop: asyncio.AbstractEventLoop) -> None:
+    def __init__(self, req_id: int, deadline: float, loop: asyncio.AbstractEventLoop) -> None:
         self.future = loop.create_future()
         self.req_id = req_id
-        self.read_timeout = read_timeout
+        self.deadline = deadline
+        self.waiter: Optional[WsWaiter] = None
         self.loop = loop
+        self.breakers: Optional[CircuitBreakers] = None
+        self.cmd = 0
+        self.send_time = 0.0
+        self.request_budget: Optional[RequestBudget] = None
+        self.req_data = b''
 
-    async def read(self) -> bytes:
+    async def read(self) -> Union[bytes, memoryview]:
         """
         读取websocket响应
 
         Returns:
-            bytes
+            bytes | memoryview: 可直接交给protobuf解析
 
         Raises:
             asyncio.TimeoutError: 读取超时
         """
 
         try:
-            async with timeout(self.read_timeout, self.loop):
-                return await self.future
-        except asyncio.TimeoutError as err:
-            self.future.cancel()
-            raise asyncio.TimeoutError("Timeout to read") from err
+            data = await self.future
+        except asyncio.TimeoutError:
+            if self.breakers is not None:
+                self.breakers.record_failure(self.cmd)
+            raise
         except BaseException:
-            self.future.cancel()
+            self.cancel()
             raise
+        finally:
+            self.release_budget()
+
+        if self.breakers is not None:
+            self.breakers.record_success(self.cmd, time.monotonic() - self.send_time)
+        return data
+
+    def cancel(self) -> None:
+        """
+        取消等待并从所属的等待映射中移除
+        """
+
+        self.future.cancel()
+        if self.waiter is not None:
+            self.waiter.discard(self)
+
+    def release_budget(self) -> None:
+        """
+        归还占用的在途请求预算
+        """
+
+        if self.request_budget is not None:
+            self.request_budget.release(WS_HOST, self.cmd)
+            self.request_budget = None
 
 
 class WsWaiter(object):
     """
     websocket等待映射
+    由单个定时器按最早的截止时刻统一扫描超时 而非为每个请求创建超时上下文
+
+    Args:
+        loop (asyncio.AbstractEventLoop): 事件循环
+        read_timeout (float): 读超时时间 以秒为单位
+        granularity (float, optional): 超时扫描的合并粒度 以秒为单位. Defaults to 0.01.
+
+    Note:
+        响应完成 超时或被取消时都会立即从映射中移除 不依赖垃圾回收
+        已移除的截止时刻在扫描到时惰性丢弃
     """
 
     __slots__ = [
-        '__weakref__',
         'waiter',
         'req_id',
         'read_timeout',
+        'granularity',
         'loop',
+        '_deadlines',
+        '_timer',
+        '_timer_when',
     ]
 
-    def __init__(self, loop: asyncio.AbstractEventLoop, read_timeout: float) -> None:
+    def __init__(self, loop: asyncio.AbstractEventLoop, read_timeout: float, granularity: float = 0.01) -> None:
         self.loop = loop
         self.read_timeout = read_timeout
-        self.waiter = weakref.WeakValueDictionary()
+        self.granularity = granularity
+        self.waiter: Dict[int, WsResponse] = {}
         self.req_id = int(time.time())
-        weakref.finalize(self, self.__cancel_all)
 
-    def __cancel_all(self) -> None:
-        for ws_resp in self.waiter.values():
-            ws_resp.future.cancel()
+        self._deadlines: List[Tuple[float, int]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_when = 0.0
+
+    def __len__(self) -> int:
+        return len(self.waiter)
 
     def new(self) -> WsResponse:
         """
         创建一个可用于等待数据的响应对象
 
-        Args:
-            req_id (int): 请求id
-
         Returns:
             WsResponse: websocket响应
         """
 
         self.req_id += 1
-        ws_resp = WsResponse(self.req_id, self.read_timeout, self.loop)
-        self.waiter[self.req_id] = ws_resp
+        ws_resp = WsResponse(self.req_id, self.loop.time() + self.read_timeout, self.loop)
+        self.__add(ws_resp)
         return ws_resp
 
-    def set_done(self, req_id: int, data: bytes) -> None:
+    def adopt(self, ws_resp: WsResponse) -> None:
+        """
+        以新的请求id接管来自其他连接的响应对象 保留其原有的截止时刻
+
+        Args:
+            ws_resp (WsResponse): websocket响应
+        """
+
+        self.req_id += 1
+        ws_resp.req_id = self.req_id
+        self.__add(ws_resp)
+
+    def __add(self, ws_resp: WsResponse) -> None:
+        ws_resp.waiter = self
+        self.waiter[ws_resp.req_id] = ws_resp
+
+        deadline = ws_resp.deadline
+        heapq.heappush(self._deadlines, (deadline, ws_resp.req_id))
+        # 过期的截止时刻过多时重建堆 以免大量已完成请求占用内存
+        if len(self._deadlines) > 2 * len(self.waiter) + 64:
+            self._deadlines = [(r.deadline, i) for i, r in self.waiter.items()]
+            heapq.heapify(self._deadlines)
+        # 截止时刻递增 通常落在已设定的扫描时刻之后 无需重设定时器
+        if self._timer is None or deadline < self._timer_when - self.granularity:
+            self.__arm(deadline)
+
+    def discard(self, ws_resp: WsResponse) -> None:
+        """
+        将响应对象从映射中移除
+
+        Args:
+            ws_resp (WsResponse): websocket响应
+        """
+
+        if self.waiter.get(ws_resp.req_id, None) is ws_resp:
+            del self.waiter[ws_resp.req_id]
+            ws_resp.waiter = None
+
+    def pop_pending(self) -> List[WsResponse]:
+        """
+        取出所有尚未完成的响应对象
+
+        Returns:
+            list[WsResponse]: 尚未完成的响应对象
+        """
+
+        pending = [ws_resp for ws_resp in self.waiter.values() if not ws_resp.future.done()]
+        for ws_resp in pending:
+            ws_resp.waiter = None
+        self.waiter.clear()
+        self.__disarm()
+        return pending
+
+    def cancel_all(self) -> None:
+        """
+        取消所有尚未完成的响应对象
+        """
+
+        for ws_resp in self.pop_pending():
+            ws_resp.future.cancel()
+
+    def set_done(self, req_id: int, data: Union[bytes, memoryview]) -> None:
         """
         将req_id对应的响应Future设置为已完成
 
         Args:
             req_id (int): 请求id
-            data (bytes): 填入的数据
+            data (bytes | memoryview): 填入的数据
+        """
+
+        ws_resp = self.waiter.pop(req_id, None)
+        if ws_resp is None:
+            return
+        ws_resp.waiter = None
+        if not ws_resp.future.done():
+            ws_resp.future.set_result(data)
+
+    def set_exception(self, req_id: int, err: BaseException) -> None:
+        """
+        将req_id对应的响应Future设置为失败
+
+        Args:
+            req_id (int): 请求id
+            err (BaseException): 填入的异常
         """
 
-        ws_resp: WsResponse = self.waiter.get(req_id, None)
+        ws_resp = self.waiter.pop(req_id, None)
         if ws_resp is None:
             return
-        ws_resp.future.set_result(data)
+        ws_resp.waiter = None
+        _set_exception(ws_resp, err)
+
+    @property
+    def oldest_pending_age(self) -> float:
+        """
+        最早的未完成请求已等待的时间 以秒为单位 无未完成请求时为0.0
+        """
+
+        self.__drop_stale()
+        if not self._deadlines:
+            return 0.0
+        return max(self.loop.time() - (self._deadlines[0][0] - self.read_timeout), 0.0)
+
+    def __drop_stale(self) -> None:
+        deadlines = self._deadlines
+        while deadlines:
+            deadline, req_id = deadlines[0]
+            ws_resp = self.waiter.get(req_id, None)
+            if ws_resp is not None and ws_resp.deadline == deadline:
+                break
+            heapq.heappop(deadlines)
+
+    def __arm(self, deadline: float) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        # 向上取整到扫描粒度 使相近的截止时刻在同一次扫描中处理
+        when = (int(deadline / self.granularity) + 1) * self.granularity
+        self._timer_when = when
+        self._timer = self.loop.call_at(when, self.__sweep)
+
+    def __disarm(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._deadlines.clear()
+
+    def __sweep(self) -> None:
+        self._timer = None
+        now = self.loop.time()
+
+        deadlines = self._deadlines
+        while deadlines:
+            self.__drop_stale()
+            if not deadlines or deadlines[0][0] > now:
+                break
+            _, req_id = heapq.heappop(deadlines)
+            ws_resp = self.waiter.pop(req_id)
+            ws_resp.waiter = None
+            _set_exception(ws_resp, asyncio.TimeoutError("Timeout to read"))
+
+        if deadlines:
+            self.__arm(deadlines[0][0])
+
+
+def _make_websocket(
+    response: aiohttp.ClientResponse, network: Network, loop: asyncio.AbstractEventLoop
+) -> aiohttp.ClientWebSocketResponse:
+    conn = response.connection
+    conn_proto = conn.protocol
+    transport = conn.transport
+    writer = aiohttp.http.WebSocketWriter(conn_proto, transport, use_mask=True)
+
+    if WebSocketDataQueue is None:
+        reader = aiohttp.FlowControlDataQueue(conn_proto, 1 << 16, loop=loop)
+        conn_proto.set_parser(aiohttp.http.WebSocketReader(reader, 4 * 1024 * 1024), reader)
+        return aiohttp.ClientWebSocketResponse(
+            reader,
+            writer,
+            'chat',
+            response,
+            network.time.ws_keepalive,
+            True,
+            True,
+            loop,
+            receive_timeout=None,
+            heartbeat=network.time.ws_heartbeat,
+        )
+
+    # aiohttp>=3.11 改用WebSocketDataQueue与ClientWSTimeout 且解析器需在创建响应后设置
+    reader = WebSocketDataQueue(conn_proto, 1 << 16, loop=loop)
+    websocket = aiohttp.ClientWebSocketResponse(
+        reader,
+        writer,
+        'chat',
+        response,
+        aiohttp.ClientWSTimeout(ws_receive=None, ws_close=network.time.ws_keepalive),
+        True,
+        True,
+        loop,
+        heartbeat=network.time.ws_heartbeat,
+    )
+    websocket._parser = aiohttp.http.WebSocketReader(reader, 4 * 1024 * 1024, compress=True, decode_text=True)
+    data_received_cb = None if network.time.ws_heartbeat is None else websocket._on_data_received
+    conn_proto.set_parser(websocket._parser, reader, data_received_cb=data_received_cb)
+    return websocket
+
+
+class WsConnection(object):
+    """
+    连接池中的单个websocket连接
+
+    Attributes:
+        websocket (aiohttp.ClientWebSocketResponse): websocket连接
+        waiter (WsWaiter): 该连接的等待映射
+        outstanding (int): 已发出但尚未完成的请求数
+        closing (bool): 连接是否正被主动关闭 主动关闭的连接不会触发重连
+        offloading (asyncio.Task): 最后一个尚未分发完成的帧的分发任务 None则没有待分发的帧
+    """
+
+    __slots__ = [
+        'websocket',
+        'waiter',
+        'dispatcher',
+        'outstanding',
+        'closing',
+        'offloading',
+    ]
+
+    def __init__(self, websocket: aiohttp.ClientWebSocketResponse, waiter: WsWaiter) -> None:
+        self.websocket = websocket
+        self.waiter = waiter
+        self.dispatcher: asyncio.Task = None
+        self.outstanding = 0
+        self.closing = False
+        self.offloading: Optional[asyncio.Task] = None
+
+    @property
+    def closed(self) -> bool:
+        """
+        连接是否已关闭
+        """
+
+        return self.websocket._writer.transport.is_closing() or self.dispatcher.done()
+
+    def _on_response_done(self, _: asyncio.Future) -> None:
+        self.outstanding -= 1
+
+    def _on_offloading_done(self, task: asyncio.Task) -> None:
+        if self.offloading is task:
+            self.offloading = None
+
+    async def close(self) -> None:
+        self.closing = True
+        await self.websocket.close()
+        self.dispatcher.cancel()
+        if self.offloading is not None:
+            # 每个分发任务都在等待前一个 取消最后一个即可取消整条链
+            self.offloading.cancel()
+        self.waiter.cancel_all()
 
 
 class WsCore(object):
     """
     保存websocket接口相关状态的核心容器
+
+    Args:
+        account (Account): 贴吧的用户信息容器
+        network (Network): 网络请求相关容器
+        loop (asyncio.AbstractEventLoop): 事件循环
+        pool_size (int, optional): 每个账号的websocket连接数 请求将被发往未完成请求最少的连接. Defaults to 1.
+        auto_reconnect (bool, optional): 连接意外断开时是否在后台自动重连. Defaults to True.
+        offload_threshold (int, optional): 不小于该字节数的帧将在线程池中解密与解压 以免阻塞事件循环
+            不大于0则始终在事件循环中解包. Defaults to 0.
+
+    Attributes:
+        handshake (Callable[[WsConnection], Awaitable[None]]): 重连成功后 连接投入使用前需要执行的握手
+
+    Note:
+        连接断开时 其上未完成的幂等请求将被重放到其他可用连接 若无可用连接则在重连成功后重放
+        非幂等请求或未启用自动重连时 未完成的请求将立即以ConnectionResetError失败
+        重连的间隔从reconnect_delay开始指数增长 最长不超过reconnect_max_delay
     """
 
     __slots__ = [
         'account',
         'network',
-        'waiter',
+        'pool_size',
+        'auto_reconnect',
+        'offload_threshold',
+        'reconnect_delay',
+        'reconnect_max_delay',
+        'handshake',
+        'ws_url',
+        'conns',
         'callbacks',
-        'websocket',
-        'ws_dispatcher',
         'mid_manager',
         '_status',
-        '_req_id',
+        '_reconnector',
+        '_reconnected',
+        '_parking',
         'loop',
     ]
 
-    def __init__(self, account: Account, network: Network, loop: asyncio.AbstractEventLoop) -> None:
+    def __init__(
+        self,
+        account: Account,
+        network: Network,
+        loop: asyncio.AbstractEventLoop,
+        pool_size: int = 1,
+        auto_reconnect: bool = True,
+        offload_threshold: int = 0,
+    ) -> None:
         self.account = account
         self.network = network
         self.loop = loop
+        self.pool_size = pool_size
+        self.auto_reconnect = auto_reconnect
+        self.offload_threshold = offload_threshold
+        self.reconnect_delay = 0.5
+        self.reconnect_max_delay = 30.0
+        self.handshake: Optional[TypeWebsocketHandshake] = None
+        self.ws_url = yarl.URL.build(scheme="ws", host=WS_HOST, port=8000)
 
         self.callbacks: Dict[int, TypeWebsocketCallback] = {}
-        self.websocket: aiohttp.ClientWebSocketResponse = None
-        self.ws_dispatcher: asyncio.Task = None
+        self.conns: List[WsConnection] = []
 
         self._status = WsStatus.CLOSED
+        self._reconnector: Optional[asyncio.Task] = None
+        # 重连恢复首个连接或重连被中止时完成
+        self._reconnected: Optional[asyncio.Future] = None
+        # 等待重连后重放的请求 同样由等待映射负责超时
+        self._parking = WsWaiter(loop, network.time.ws_read)
 
     async def connect(self) -> None:
         """
-        建立weboscket连接
+        建立websocket连接池
+        部分连接建立失败时 仅使用建立成功的连接
 
         Raises:
             aiohttp.WSServerHandshakeError: websocket握手失败
@@ -238,12 +571,23 @@ class WsCore(object):
 
         self._status = WsStatus.CONNECTING
 
-        self.waiter = WsWaiter(self.loop, self.network.time.ws_read)
         self.mid_manager = MsgIDManager()
 
+        self.__stop_reconnect()
+        await self.__close_conns()
+        results = await asyncio.gather(*[self.__connect_one() for _ in range(self.pool_size)], return_exceptions=True)
+
+        self.conns = [res for res in results if isinstance(res, WsConnection)]
+        if not self.conns:
+            self._status = WsStatus.CLOSED
+            for res in results:
+                if isinstance(res, BaseException):
+                    raise res
+
+    async def __connect_one(self) -> WsConnection:
         from aiohttp import hdrs
 
-        ws_url = yarl.URL.build(scheme="ws", host="im.tieba.baidu.com", port=8000)
+        ws_url = self.ws_url
         sec_key_bytes = binascii.b2a_base64(secrets.token_bytes(16), newline=False)
         headers = {
             hdrs.UPGRADE: "websocket",
@@ -252,74 +596,233 @@ class WsCore(object):
             hdrs.SEC_WEBSOCKET_VERSION: "13",
             hdrs.SEC_WEBSOCKET_KEY: sec_key_bytes.decode('ascii'),
             hdrs.ACCEPT_ENCODING: "gzip",
-            hdrs.HOST: "im.tieba.baidu.com:8000",
+            hdrs.HOST: f"{ws_url.host}:{ws_url.port}",
         }
+        proxy, proxy_auth = self.network.select_proxy()
         request = aiohttp.ClientRequest(
             hdrs.METH_GET,
             ws_url,
             headers=headers,
             loop=self.loop,
-            proxy=self.network.proxy,
-            proxy_auth=self.network.proxy_auth,
+            proxy=proxy,
+            proxy_auth=proxy_auth,
             ssl=False,
         )
 
-        response = await req2res(request, self.network, False, 2 * 1024)
-
-        if response.status != 101:
-            raise HTTPStatusError(response.status, response.reason)
+        proxy_pool = self.network.proxy_pool
+        start_time = time.monotonic()
+        try:
+            response = await req2res(request, self.network, False, 2 * 1024)
+            if response.status != 101:
+                response.close()
+                raise HTTPStatusError(response.status, response.reason)
+        except Exception as err:
+            if proxy_pool is not None:
+                if proxy_pool.is_proxy_failure(err):
+                    proxy_pool.record_failure(proxy)
+                else:
+                    proxy_pool.record_success(proxy, time.monotonic() - start_time)
+            raise
+        if proxy_pool is not None:
+            proxy_pool.record_success(proxy, time.monotonic() - start_time)
 
         try:
-            conn = response.connection
-            conn_proto = conn.protocol
-            transport = conn.transport
-            reader = aiohttp.FlowControlDataQueue(conn_proto, 1 << 16, loop=self.loop)
-            conn_proto.set_parser(aiohttp.http.WebSocketReader(reader, 4 * 1024 * 1024), reader)
-            writer = aiohttp.http.WebSocketWriter(conn_proto, transport, use_mask=True)
+            websocket = _make_websocket(response, self.network, self.loop)
         except BaseException:
             response.close()
             raise
-        else:
-            self.websocket = aiohttp.ClientWebSocketResponse(
-                reader,
-                writer,
-                'chat',
-                response,
-                self.network.time.ws_keepalive,
-                True,
-                True,
-                self.loop,
-                receive_timeout=self.network.time.ws_read,
-                heartbeat=self.network.time.ws_heartbeat,
-            )
-
-        if self.ws_dispatcher is not None and not self.ws_dispatcher.done():
-            self.ws_dispatcher.cancel()
-        self.ws_dispatcher = self.loop.create_task(self.__ws_dispatch(), name="ws_dispatcher")
+
+        ws_conn = WsConnection(websocket, WsWaiter(self.loop, self.network.time.ws_read))
+        ws_conn.dispatcher = self.loop.create_task(self.__ws_dispatch(ws_conn), name="ws_dispatcher")
+        return ws_conn
 
     async def close(self) -> None:
-        if self.status == WsStatus.OPEN:
-            await self.websocket.close()
-            self.ws_dispatcher.cancel()
+        self.__stop_reconnect()
+        await self.__close_conns()
         self._status = WsStatus.CLOSED
 
-    def __default_callback(self, req_id: int, data: bytes) -> None:
-        self.waiter.set_done(req_id, data)
+    async def __close_conns(self) -> None:
+        conns, self.conns = self.conns, []
+        for conn in conns:
+            await conn.close()
+
+    def __stop_reconnect(self) -> None:
+        if self._reconnector is not None:
+            self._reconnector.cancel()
+            self._reconnector = None
+        self.__set_reconnected()
+        _fail_all(self._parking.pop_pending())
+
+    def __set_reconnected(self) -> None:
+        if self._reconnected is not None and not self._reconnected.done():
+            self._reconnected.set_result(None)
+
+    async def wait_reconnect(self) -> bool:
+        """
+        等待正在进行的后台重连恢复至少一个连接
+
+        Returns:
+            bool: True已有可用连接 False未在重连或重连未能在ws_read时间内完成
+
+        Note:
+            重连期间status同样为CONNECTING 此时再调用connect会中止重连并使暂存的请求失败
+        """
+
+        if self._reconnector is None or self._reconnector.done() or self._reconnected is None:
+            return self.status == WsStatus.OPEN
 
-    async def __ws_dispatch(self) -> None:
         try:
-            async for msg in self.websocket:
-                data, cmd, req_id = parse_ws_bytes(self.account, msg.data)
-                res_callback = self.callbacks.get(cmd, None)
-                if res_callback is None:
-                    self.__default_callback(req_id, data)
-                else:
-                    self.loop.create_task(res_callback(self, data, req_id))
+            async with timeout(self.network.time.ws_read, self.loop):
+                await asyncio.shield(self._reconnected)
+        except asyncio.TimeoutError:
+            return False
+        return self.status == WsStatus.OPEN
+
+    async def __ws_dispatch(self, conn: WsConnection) -> None:
+        try:
+            # 9字节头部不加密 解包失败时据此结束对应的请求 而不影响连接上的其他请求
+            async for msg in conn.websocket:
+                offload = 0 < self.offload_threshold <= len(msg.data)
+                if offload or conn.offloading is not None:
+                    # pycryptodome与zlib在处理时会释放GIL 大帧交给线程池 分发任务继续处理后续的帧
+                    # 仍有帧在线程池中解包时 后续的帧排在其后分发 以保持接收顺序
+                    task = self.loop.create_task(self.__dispatch_in_order(conn, conn.offloading, msg.data, offload))
+                    task.add_done_callback(conn._on_offloading_done)
+                    conn.offloading = task
+                    continue
+                try:
+                    data, cmd, req_id = parse_ws_bytes(self.account, msg.data)
+                except Exception as err:
+                    conn.waiter.set_exception(int.from_bytes(msg.data[5:9], 'big'), err)
+                    continue
+                self.__dispatch_one(conn, data, cmd, req_id)
 
         except asyncio.CancelledError:
-            pass
+            return
+        except Exception as err:
+            # 读取出错时结束分发 该连接随即被视为已关闭
+            LOG().debug(f"Websocket dispatcher stopped. {err}")
+
+        if not conn.closing:
+            self.__on_conn_lost(conn)
+
+    def __dispatch_one(self, conn: WsConnection, data: Union[bytes, memoryview], cmd: int, req_id: int) -> None:
+        res_callback = self.callbacks.get(cmd, None)
+        if res_callback is None:
+            conn.waiter.set_done(req_id, data)
+        else:
+            self.loop.create_task(res_callback(self, data, req_id))
+
+    async def __dispatch_in_order(
+        self, conn: WsConnection, prev: Optional[asyncio.Task], raw: bytes, offload: bool
+    ) -> None:
+        parsing = None
+        if offload:
+            # 加密器对象不是线程安全的 每次解包使用独立的加密器
+            chiper = self.account.new_aes_ecb_chiper()
+            parsing = self.loop.run_in_executor(None, parse_ws_bytes, self.account, raw, chiper)
+
+        try:
+            if prev is not None:
+                # 前一个帧分发完成后才分发当前帧 解包则与之并行
+                await prev
+        except asyncio.CancelledError:
+            if parsing is not None:
+                parsing.cancel()
+            raise
+
+        try:
+            if parsing is not None:
+                data, cmd, req_id = await parsing
+            else:
+                data, cmd, req_id = parse_ws_bytes(self.account, raw)
+        except Exception as err:
+            conn.waiter.set_exception(int.from_bytes(raw[5:9], 'big'), err)
+            return
+        self.__dispatch_one(conn, data, cmd, req_id)
+
+    def __on_conn_lost(self, conn: WsConnection) -> None:
+        pending = conn.waiter.pop_pending()
+
+        if conn not in self.conns:
+            # 尚未投入使用的连接 例如重连时握手未完成
+            _fail_all(pending)
+            return
+        self.conns.remove(conn)
+
+        replay = []
+        for ws_resp in pending:
+            if self.auto_reconnect and ws_resp.cmd not in NON_IDEMPOTENT_CMDS:
+                replay.append(ws_resp)
+            else:
+                _fail_all((ws_resp,))
+
+        alive = [c for c in self.conns if not c.closed]
+        if alive:
+            self.__replay(replay)
+        else:
+            for ws_resp in replay:
+                self._parking.adopt(ws_resp)
+            self._status = WsStatus.CONNECTING if self.auto_reconnect else WsStatus.CLOSED
+
+        if self.auto_reconnect and (self._reconnector is None or self._reconnector.done()):
+            self._reconnected = self.loop.create_future()
+            self._reconnector = self.loop.create_task(self.__reconnect(), name="ws_reconnector")
+
+    async def __reconnect(self) -> None:
+        delay = self.reconnect_delay
+        while len(self.conns) < self.pool_size:
+            conn = None
+            try:
+                conn = await self.__connect_one()
+                if self.handshake is not None:
+                    await self.handshake(conn)
+
+            except asyncio.CancelledError:
+                if conn is not None:
+                    await conn.close()
+                raise
+            except Exception as err:
+                if conn is not None:
+                    await conn.close()
+                # 指数退避并加入抖动 以免大量连接同时重连
+                sleep_time = delay * random.uniform(0.5, 1.0)
+                LOG().warning(f"Failed to reconnect websocket. Retry in {sleep_time:.1f}s. {err}")
+                await asyncio.sleep(sleep_time)
+                delay = min(delay * 2, self.reconnect_max_delay)
+                continue
+
+            delay = self.reconnect_delay
+            self.conns.append(conn)
+            self._status = WsStatus.OPEN
+            self.__set_reconnected()
+
+            self.__replay(self._parking.pop_pending())
+
+    def __replay(self, ws_resps: List[WsResponse]) -> None:
+        for ws_resp in ws_resps:
+            if ws_resp.future.done():
+                continue
+
+            conn = self._pick_conn()
+            conn.waiter.adopt(ws_resp)
+            conn.outstanding += 1
+            ws_resp.future.add_done_callback(conn._on_response_done)
+            # 9字节头部不加密 仅需替换其中的请求id
+            req_data = ws_resp.req_data
+            ws_resp.req_data = b''.join([req_data[:5], ws_resp.req_id.to_bytes(4, 'big'), req_data[9:]])
+            self.loop.create_task(self.__resend(conn, ws_resp))
+
+    async def __resend(self, conn: WsConnection, ws_resp: WsResponse) -> None:
+        try:
+            async with timeout(self.network.time.ws_send, self.loop):
+                await conn.websocket.send_bytes(ws_resp.req_data)
+        except asyncio.TimeoutError:
+            if not ws_resp.future.done():
+                ws_resp.future.set_exception(asyncio.TimeoutError("Timeout to send"))
         except Exception:
-            self._status = WsStatus.CLOSED
+            # 连接已断开 该请求将由对应的分发任务再次重放
+            pass
 
     @property
     def status(self) -> WsStatus:
@@ -327,11 +830,44 @@ class WsCore(object):
         websocket状态
         """
 
-        if self._status == WsStatus.OPEN and self.websocket._writer.transport.is_closing():
+        if self._status == WsStatus.OPEN and all(conn.closed for conn in self.conns):
             self._status = WsStatus.CLOSED
         return self._status
 
-    async def send(self, data: bytes, cmd: int, *, compress: bool = False, encrypt: bool = True) -> WsResponse:
+    @property
+    def num_pending(self) -> int:
+        """
+        已发出但尚未完成的请求数 包括等待重连后重放的请求
+        """
+
+        return sum(len(conn.waiter) for conn in self.conns) + len(self._parking)
+
+    @property
+    def oldest_pending_age(self) -> float:
+        """
+        最早的未完成请求已等待的时间 以秒为单位 无未完成请求时为0.0
+        """
+
+        waiters = [conn.waiter for conn in self.conns]
+        waiters.append(self._parking)
+        return max(waiter.oldest_pending_age for waiter in waiters)
+
+    def _pick_conn(self) -> Optional[WsConnection]:
+        # 选择未完成请求最少的可用连接
+        conns = [conn for conn in self.conns if not conn.closed] or self.conns
+        if not conns:
+            return None
+        return min(conns, key=lambda c: c.outstanding)
+
+    async def send(
+        self,
+        data: bytes,
+        cmd: int,
+        *,
+        compress: bool = False,
+        encrypt: bool = True,
+        conn: Optional[WsConnection] = None,
+    ) -> WsResponse:
         """
         将protobuf序列化结果打包发送
 
@@ -340,24 +876,96 @@ class WsCore(object):
             cmd (int): 请求的cmd类型
             compress (bool, optional): 是否需要gzip压缩. Defaults to False.
             encrypt (bool, optional): 是否需要aes加密. Defaults to True.
+            conn (WsConnection, optional): 指定发送所用的连接 None则发往未完成请求最少的连接. Defaults to None.
 
         Returns:
             WsResponse: websocket响应对象
 
         Raises:
             asyncio.TimeoutError: 发送超时
+            CircuitOpenError: 该cmd或websocket整体的熔断器处于断开状态
+            ConnectionResetError: 已无可用连接且无法等待重连
+
+        Note:
+            若在等待预算或限流期间全部连接均已断开 且正在后台重连 则幂等请求将暂存至重连后发出
         """
 
-        response = self.waiter.new()
+        breakers = self.network.breakers
+        if breakers is not None and not breakers.allow(cmd):
+            raise CircuitOpenError(cmd)
+
+        if (request_budget := self.network.request_budget) is not None:
+            await request_budget.acquire(WS_HOST, cmd)
+
+        try:
+            if self.network.limiter is not None:
+                await self.network.limiter.acquire(cmd)
+        except BaseException:
+            if request_budget is not None:
+                request_budget.release(WS_HOST, cmd)
+            raise
+
+        if conn is None and (conn := self._pick_conn()) is None:
+            return self.__park(data, cmd, compress, encrypt, request_budget)
+
+        response = conn.waiter.new()
+        response.cmd = cmd
+        response.request_budget = request_budget
+        conn.outstanding += 1
+        response.future.add_done_callback(conn._on_response_done)
         req_data = pack_ws_bytes(self.account, data, cmd, response.req_id, compress=compress, encrypt=encrypt)
+        if cmd not in NON_IDEMPOTENT_CMDS:
+            response.req_data = req_data
+
+        if breakers is not None:
+            response.breakers = breakers
+            response.send_time = time.monotonic()
 
         try:
             async with timeout(self.network.time.ws_send, self.loop):
-                await self.websocket.send_bytes(req_data)
+                await conn.websocket.send_bytes(req_data)
         except asyncio.TimeoutError as err:
-            response.future.cancel()
+            response.cancel()
+            response.release_budget()
+            if breakers is not None:
+                breakers.record_failure(cmd)
             raise asyncio.TimeoutError("Timeout to send") from err
         except BaseException:
-            response.future.cancel()
+            response.cancel()
+            response.release_budget()
+            raise
         else:
             return response
+
+    def __park(
+        self, data: bytes, cmd: int, compress: bool, encrypt: bool, request_budget: Optional[RequestBudget]
+    ) -> WsResponse:
+        reconnecting = self._reconnector is not None and not self._reconnector.done()
+        if not reconnecting or cmd in NON_IDEMPOTENT_CMDS:
+            if request_budget is not None:
+                request_budget.release(WS_HOST, cmd)
+            raise ConnectionResetError("Websocket connection lost")
+
+        response = self._parking.new()
+        response.cmd = cmd
+        response.request_budget = request_budget
+        response.req_data = pack_ws_bytes(self.account, data, cmd, response.req_id, compress=compress, encrypt=encrypt)
+
+        if (breakers := self.network.breakers) is not None:
+            response.breakers = breakers
+            response.send_time = time.monotonic()
+
+        return response
+
+
+def _set_exception(ws_resp: WsResponse, err: BaseException) -> None:
+    future = ws_resp.future
+    if not future.done():
+        future.set_exception(err)
+        # 调用方可能已放弃等待该响应 标记异常已取回以免产生告警
+        future.exception()
+
+
+def _fail_all(ws_resps: Iterable[WsResponse]) -> None:
+    for ws_resp in ws_resps:
+        _set_exception(ws_resp, ConnectionResetError("Websocket connection lost"))
@@ -79,3 +79,28 @@ class WsStatus(enum.IntEnum):
     CLOSED = 0
     CONNECTING = 1
     OPEN = 2
+
+
+class Priority(enum.IntEnum):
+    """
+    请求优先级 数值越小越优先
+
+    Note:
+        0写入/吧务操作 1交互式读取 2批量爬取
+    """
+
+    WRITE = 0
+    INTERACTIVE = 1
+    BULK = 2
+
+
+class OverflowPolicy(enum.IntEnum):
+    """
+    有界队列已满时的处理策略
+
+    Note:
+        0丢弃最旧的条目 1丢弃新到达的条目
+    """
+
+    DROP_OLDEST = 0
+    DROP_NEWEST = 1
@@ -1,4 +1,4 @@
-from typing import Callable, Optional
+from typing import Callable, Optional, Union
 
 TypeExceptionHandler = Callable[[Exception], Optional[Exception]]
 
@@ -86,3 +86,40 @@ class ContentTypeError(RuntimeError):
     """
     无法解析响应头中的content-type
     """
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    熔断器处于断开状态 请求被直接拒绝
+    """
+
+    __slots__ = ['endpoint']
+
+    def __init__(self, endpoint: Union[str, int]) -> None:
+        super().__init__(endpoint)
+        self.endpoint = endpoint
+
+
+class ContentTooLargeError(RuntimeError):
+    """
+    响应body超出大小上限 下载已被中止
+    """
+
+    __slots__ = ['size', 'limit']
+
+    def __init__(self, size: int, limit: int) -> None:
+        super().__init__(size, limit)
+        self.size = size
+        self.limit = limit
+
+
+class PageFetchError(RuntimeError):
+    """
+    分页迭代时某一页请求失败 具体原因已由对应方法记录在日志中
+    """
+
+    __slots__ = ['pn']
+
+    def __init__(self, pn: int) -> None:
+        super().__init__(pn)
+        self.pn = pn
@@ -1,5 +1,5 @@
-from ..enums import GroupType, MsgType, PostSortType, ReqUInfo, ThreadSortType, WsStatus
-from . import cache, crypto, utils
+from ..enums import GroupType, MsgType, OverflowPolicy, PostSortType, Priority, ReqUInfo, ThreadSortType, WsStatus
+from . import cache, crypto, retry, singleflight, utils
 from .utils import (
     handle_exception,
     is_portrait,
@@ -1,15 +1,301 @@
+import asyncio
+import sqlite3
+import time
 from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from ..enums import ReqUInfo
+from ..logging import get_logger as LOG
+
+
+class MemoryForumCache(object):
+    """
+    基于内存的吧信息缓存
+
+    Args:
+        capacity (int, optional): 最大缓存条目数 超出时淘汰最久未使用的条目. Defaults to 1024.
+        ttl (float, optional): 缓存条目的过期时间 以秒为单位 None则永不过期. Defaults to None.
+    """
+
+    __slots__ = [
+        'capacity',
+        'ttl',
+        '_fname2entry',
+        '_fid2fname',
+    ]
+
+    def __init__(self, capacity: int = 1024, ttl: Optional[float] = None) -> None:
+        self.capacity = capacity
+        self.ttl = ttl
+        # fname -> [fid, expire_time]
+        self._fname2entry: "OrderedDict[str, List]" = OrderedDict()
+        self._fid2fname: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._fname2entry)
+
+    def _expire_time(self) -> float:
+        return time.time() + self.ttl if self.ttl is not None else float('inf')
+
+    def _get_entry(self, fname: str) -> Optional[List]:
+        entry = self._fname2entry.get(fname, None)
+        if entry is None:
+            return None
+        if entry[1] < time.time():
+            self._remove(fname)
+            return None
+        self._fname2entry.move_to_end(fname)
+        return entry
+
+    def _remove(self, fname: str) -> None:
+        fid, _ = self._fname2entry.pop(fname)
+        if self._fid2fname.get(fid, None) == fname:
+            del self._fid2fname[fid]
+
+    def _put(self, fname: str, fid: int, expire_time: float) -> None:
+        if fname in self._fname2entry:
+            self._remove(fname)
+        if (old_fname := self._fid2fname.get(fid, None)) is not None:
+            self._remove(old_fname)
+
+        while len(self._fname2entry) >= self.capacity > 0:
+            self._remove(next(iter(self._fname2entry)))
+
+        self._fname2entry[fname] = [fid, expire_time]
+        self._fid2fname[fid] = fname
+
+    def get_fid(self, fname: str) -> int:
+        """
+        通过贴吧名获取forum_id
+
+        Args:
+            fname (str): 贴吧名
+
+        Returns:
+            int: 该贴吧的forum_id 未命中时返回0
+        """
+
+        entry = self._get_entry(fname)
+        return entry[0] if entry is not None else 0
+
+    def get_fname(self, fid: int) -> str:
+        """
+        通过forum_id获取贴吧名
+
+        Args:
+            fid (int): forum_id
+
+        Returns:
+            str: 该贴吧的贴吧名 未命中时返回空字符串
+        """
+
+        fname = self._fid2fname.get(fid, None)
+        if fname is None or self._get_entry(fname) is None:
+            return ''
+        return fname
+
+    async def load_fid(self, fname: str) -> int:
+        """
+        通过贴吧名获取forum_id 持久化后端将在后台线程中查询
+
+        Args:
+            fname (str): 贴吧名
+
+        Returns:
+            int: 该贴吧的forum_id 未命中时返回0
+        """
+
+        return self.get_fid(fname)
+
+    async def load_fname(self, fid: int) -> str:
+        """
+        通过forum_id获取贴吧名 持久化后端将在后台线程中查询
+
+        Args:
+            fid (int): forum_id
+
+        Returns:
+            str: 该贴吧的贴吧名 未命中时返回空字符串
+        """
+
+        return self.get_fname(fid)
+
+    def add_forum(self, fname: str, fid: int) -> None:
+        """
+        将贴吧名与forum_id的映射关系添加到缓存
+
+        Args:
+            fname (str): 贴吧名
+            fid (int): 贴吧id
+        """
+
+        self._put(fname, fid, self._expire_time())
+
+    def clear(self) -> None:
+        """
+        清空缓存
+        """
+
+        self._fname2entry.clear()
+        self._fid2fname.clear()
+
+
+class SqliteForumCache(MemoryForumCache):
+    """
+    以sqlite数据库为持久化后端的吧信息缓存
+    内存未命中时查询数据库 写入时在后台写入数据库
+
+    Args:
+        path (str | Path): 数据库文件路径
+        capacity (int, optional): 内存中的最大缓存条目数 不限制数据库大小. Defaults to 1024.
+        ttl (float, optional): 缓存条目的过期时间 以秒为单位 None则永不过期. Defaults to None.
+
+    Note:
+        数据库启用了WAL模式 可供同一台机器上的多个进程共享
+        全部数据库操作都在同一个后台线程中按提交顺序执行 写入不会阻塞调用方
+        get_fid / get_fname未命中内存时会同步等待查询结果 在协程中请使用load_fid / load_fname
+    """
+
+    __slots__ = ['_db', '_executor']
+
+    def __init__(self, path: Union[str, Path], capacity: int = 1024, ttl: Optional[float] = None) -> None:
+        super().__init__(capacity, ttl)
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="forum_cache")
+        # 连接仅在后台线程中使用
+        self._db = sqlite3.connect(str(path), isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS forum (fname TEXT PRIMARY KEY, fid INTEGER NOT NULL, update_time REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS forum_fid ON forum (fid)")
+
+    def _query(self, sql: str, key: Union[str, int]) -> Optional[tuple]:
+        return self._db.execute(sql, (key,)).fetchone()
+
+    def _write(self, fname: str, fid: int, update_time: float) -> None:
+        self._db.execute("BEGIN")
+        try:
+            # 贴吧改名后 移除该forum_id在旧贴吧名下的记录
+            self._db.execute("DELETE FROM forum WHERE fid=? AND fname<>?", (fid, fname))
+            self._db.execute("INSERT OR REPLACE INTO forum VALUES (?,?,?)", (fname, fid, update_time))
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _submit(self, func: Callable, *args) -> None:
+        future = self._executor.submit(func, *args)
+        future.add_done_callback(_log_write_error)
+
+    def _accept(self, row: Optional[tuple]) -> Optional[tuple]:
+        if row is None:
+            return None
+
+        fname, fid, update_time = row
+        expire_time = update_time + self.ttl if self.ttl is not None else float('inf')
+        if expire_time < time.time():
+            return None
+
+        self._put(fname, fid, expire_time)
+        return fname, fid
+
+    def _load(self, sql: str, key: Union[str, int]) -> Optional[tuple]:
+        return self._accept(self._executor.submit(self._query, sql, key).result())
+
+    async def _aload(self, sql: str, key: Union[str, int]) -> Optional[tuple]:
+        loop = asyncio.get_running_loop()
+        return self._accept(await loop.run_in_executor(self._executor, self._query, sql, key))
+
+    def get_fid(self, fname: str) -> int:
+        if fid := super().get_fid(fname):
+            return fid
+        row = self._load(_SELECT_BY_FNAME, fname)
+        return row[1] if row is not None else 0
+
+    def get_fname(self, fid: int) -> str:
+        if fname := super().get_fname(fid):
+            return fname
+        row = self._load(_SELECT_BY_FID, fid)
+        return row[0] if row is not None else ''
+
+    async def load_fid(self, fname: str) -> int:
+        if fid := super().get_fid(fname):
+            return fid
+        row = await self._aload(_SELECT_BY_FNAME, fname)
+        return row[1] if row is not None else 0
+
+    async def load_fname(self, fid: int) -> str:
+        if fname := super().get_fname(fid):
+            return fname
+        row = await self._aload(_SELECT_BY_FID, fid)
+        return row[0] if row is not None else ''
+
+    def add_forum(self, fname: str, fid: int) -> None:
+        super().add_forum(fname, fid)
+        self._submit(self._write, fname, fid, time.time())
+
+    def clear(self) -> None:
+        super().clear()
+        self._submit(self._db.execute, "DELETE FROM forum")
+
+    def close(self) -> None:
+        """
+        等待尚未完成的写入 随后关闭数据库连接
+        """
+
+        self._executor.submit(self._db.close)
+        self._executor.shutdown(wait=True)
+
+
+_SELECT_BY_FNAME = "SELECT fname, fid, update_time FROM forum WHERE fname=?"
+_SELECT_BY_FID = "SELECT fname, fid, update_time FROM forum WHERE fid=? ORDER BY update_time DESC"
+
+
+def _log_write_error(future: Future) -> None:
+    if not future.cancelled() and (err := future.exception()) is not None:
+        LOG().warning(f"Failed to write the forum cache. {err}")
+
+
+TypeForumCache = MemoryForumCache
 
 
 class ForumInfoCache(object):
     """
     吧信息缓存
+
+    Note:
+        进程内全局共享
+        默认使用容量为1024的内存缓存 可通过ForumInfoCache.set_backend(SqliteForumCache(...))替换
     """
 
     __slots__ = []
 
-    _fname2fid = OrderedDict()
-    _fid2fname = OrderedDict()
+    _backend: TypeForumCache = MemoryForumCache()
+
+    @classmethod
+    def set_backend(cls, backend: TypeForumCache) -> None:
+        """
+        替换缓存后端
+
+        Args:
+            backend (TypeForumCache): 缓存后端 需实现get_fid / get_fname / load_fid / load_fname / add_forum
+        """
+
+        cls._backend = backend
+
+    @classmethod
+    def get_backend(cls) -> TypeForumCache:
+        """
+        获取当前使用的缓存后端
+
+        Returns:
+            TypeForumCache: 缓存后端
+        """
+
+        return cls._backend
 
     @classmethod
     def get_fid(cls, fname: str) -> int:
@@ -23,7 +309,7 @@ class ForumInfoCache(object):
             int: 该贴吧的forum_id
         """
 
-        return cls._fname2fid.get(fname, '')
+        return cls._backend.get_fid(fname)
 
     @classmethod
     def get_fname(cls, fid: int) -> str:
@@ -37,7 +323,35 @@ class ForumInfoCache(object):
             str: 该贴吧的贴吧名
         """
 
-        return cls._fid2fname.get(fid, '')
+        return cls._backend.get_fname(fid)
+
+    @classmethod
+    async def load_fid(cls, fname: str) -> int:
+        """
+        通过贴吧名获取forum_id 不会因查询持久化后端而阻塞事件循环
+
+        Args:
+            fname (str): 贴吧名
+
+        Returns:
+            int: 该贴吧的forum_id
+        """
+
+        return await cls._backend.load_fid(fname)
+
+    @classmethod
+    async def load_fname(cls, fid: int) -> str:
+        """
+        通过forum_id获取贴吧名 不会因查询持久化后端而阻塞事件循环
+
+        Args:
+            fid (int): forum_id
+
+        Returns:
+            str: 该贴吧的贴吧名
+        """
+
+        return await cls._backend.load_fname(fid)
 
     @classmethod
     def add_forum(cls, fname: str, fid: int) -> None:
@@ -49,9 +363,215 @@ class ForumInfoCache(object):
             fid (int): 贴吧id
         """
 
-        if len(cls._fname2fid) == 128:
-            cls._fname2fid.popitem(last=False)
-            cls._fid2fname.popitem(last=False)
+        cls._backend.add_forum(fname, fid)
+
+
+class MemoryUserCache(object):
+    """
+    基于内存的用户身份缓存
+    维护 user_id / portrait / user_name 之间的映射关系
+
+    Args:
+        capacity (int, optional): 最大缓存用户数 超出时淘汰最久未使用的用户. Defaults to 65536.
+        id_ttl (float, optional): user_id与portrait映射的过期时间 以秒为单位. Defaults to 86400.0.
+        name_ttl (float, optional): user_name的过期时间 以秒为单位. Defaults to 600.0.
+
+    Attributes:
+        hits (int): 命中次数
+        misses (int): 未命中次数
+
+    Note:
+        user_id与portrait均不可变 而user_name可被用户修改 因此默认为user_name设置较短的过期时间
+    """
+
+    __slots__ = [
+        'capacity',
+        'id_ttl',
+        'name_ttl',
+        'hits',
+        'misses',
+        '_uid2entry',
+        '_portrait2uid',
+        '_name2uid',
+    ]
+
+    def __init__(self, capacity: int = 65536, id_ttl: float = 86400.0, name_ttl: float = 600.0) -> None:
+        self.capacity = capacity
+        self.id_ttl = id_ttl
+        self.name_ttl = name_ttl
+        self.hits = 0
+        self.misses = 0
+        # user_id -> [portrait, user_name, portrait_expire_time, user_name_expire_time]
+        self._uid2entry: "OrderedDict[int, List]" = OrderedDict()
+        self._portrait2uid: Dict[str, int] = {}
+        self._name2uid: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._uid2entry)
+
+    def _remove(self, user_id: int) -> None:
+        portrait, user_name, _, _ = self._uid2entry.pop(user_id)
+        if self._portrait2uid.get(portrait, None) == user_id:
+            del self._portrait2uid[portrait]
+        if self._name2uid.get(user_name, None) == user_id:
+            del self._name2uid[user_name]
+
+    def add_user(self, user_id: int, portrait: str, user_name: str) -> None:
+        """
+        将用户的身份映射关系添加到缓存
+
+        Args:
+            user_id (int): user_id
+            portrait (str): portrait 未知时填空字符串
+            user_name (str): 用户名 未知时填空字符串
+        """
+
+        if not user_id:
+            return
+        if '?' in portrait:
+            portrait = ''
+        if not (portrait or user_name):
+            return
+
+        now = time.monotonic()
+
+        entry = self._uid2entry.get(user_id, None)
+        if entry is None:
+            while len(self._uid2entry) >= self.capacity > 0:
+                self._remove(next(iter(self._uid2entry)))
+            entry = ['', '', 0.0, 0.0]
+            self._uid2entry[user_id] = entry
+        else:
+            self._uid2entry.move_to_end(user_id)
+
+        if portrait:
+            entry[0] = portrait
+            entry[2] = now + self.id_ttl
+            self._portrait2uid[portrait] = user_id
+
+        if user_name:
+            if (old_name := entry[1]) != user_name and self._name2uid.get(old_name, None) == user_id:
+                del self._name2uid[old_name]
+            entry[1] = user_name
+            entry[3] = now + self.name_ttl
+            self._name2uid[user_name] = user_id
+
+    def get_user(self, _id: Union[str, int], require: ReqUInfo) -> Optional[Tuple[int, str, str]]:
+        """
+        从缓存中查询用户身份
+
+        Args:
+            _id (str | int): 用户id user_id / portrait / user_name
+            require (ReqUInfo): 指示需要获取的字段 仅支持BASIC的子集
+
+        Returns:
+            tuple[int, str, str] | None: (user_id, portrait, user_name) 无法满足require时返回None
+        """
+
+        now = time.monotonic()
+
+        if isinstance(_id, int):
+            user_id = _id
+        elif _id.startswith('tb.'):
+            user_id = self._portrait2uid.get(_id, 0)
+            require |= ReqUInfo.PORTRAIT
+        else:
+            user_id = self._name2uid.get(_id, 0)
+            require |= ReqUInfo.USER_NAME
+
+        entry = self._uid2entry.get(user_id, None)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        portrait, user_name, portrait_expire, name_expire = entry
+        if portrait_expire < now:
+            portrait = ''
+        if name_expire < now:
+            user_name = ''
+        if not (portrait or user_name):
+            self._remove(user_id)
+            self.misses += 1
+            return None
+
+        if (require & ReqUInfo.PORTRAIT and not portrait) or (require & ReqUInfo.USER_NAME and not user_name):
+            self.misses += 1
+            return None
+
+        self._uid2entry.move_to_end(user_id)
+        self.hits += 1
+        return user_id, portrait, user_name
+
+    def clear(self) -> None:
+        """
+        清空缓存
+        """
+
+        self._uid2entry.clear()
+        self._portrait2uid.clear()
+        self._name2uid.clear()
+
+
+class UserInfoCache(object):
+    """
+    用户身份缓存
+    由各接口解析出的用户信息自动填充
+
+    Note:
+        进程内全局共享
+        可通过UserInfoCache.set_backend(MemoryUserCache(...))调整容量与过期时间
+    """
+
+    __slots__ = []
+
+    _backend: MemoryUserCache = MemoryUserCache()
+
+    @classmethod
+    def set_backend(cls, backend: MemoryUserCache) -> None:
+        """
+        替换缓存后端
+
+        Args:
+            backend (MemoryUserCache): 缓存后端
+        """
+
+        cls._backend = backend
+
+    @classmethod
+    def get_backend(cls) -> MemoryUserCache:
+        """
+        获取当前使用的缓存后端
+
+        Returns:
+            MemoryUserCache: 缓存后端
+        """
+
+        return cls._backend
+
+    @classmethod
+    def add_user(cls, user_id: int, portrait: str, user_name: str) -> None:
+        """
+        将用户的身份映射关系添加到缓存
+
+        Args:
+            user_id (int): user_id
+            portrait (str): portrait 未知时填空字符串
+            user_name (str): 用户名 未知时填空字符串
+        """
+
+        cls._backend.add_user(user_id, portrait, user_name)
+
+    @classmethod
+    def get_user(cls, _id: Union[str, int], require: ReqUInfo) -> Optional[Tuple[int, str, str]]:
+        """
+        从缓存中查询用户身份
+
+        Args:
+            _id (str | int): 用户id user_id / portrait / user_name
+            require (ReqUInfo): 指示需要获取的字段 仅支持BASIC的子集
+
+        Returns:
+            tuple[int, str, str] | None: (user_id, portrait, user_name) 无法满足require时返回None
+        """
 
-        cls._fname2fid[fname] = fid
-        cls._fid2fname[fid] = fname
+        return cls._backend.get_user(_id, require)
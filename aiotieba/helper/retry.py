@@ -0,0 +1,219 @@
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, Optional
+
+import aiohttp
+
+from ..exception import HTTPStatusError, TiebaServerError
+
+TRANSIENT_CODES = frozenset(
+    (
+        220034,  # 操作太快
+        340011,  # 操作太频繁
+    )
+)
+
+
+class RetryPolicy(object):
+    """
+    重试策略
+    使用带完全抖动 (full jitter) 的指数退避
+
+    Args:
+        max_attempts (int, optional): 最大尝试次数 包含首次请求. Defaults to 3.
+        base_delay (float, optional): 退避基准时间 以秒为单位. Defaults to 0.2.
+        max_delay (float, optional): 单次退避的最大时间 以秒为单位. Defaults to 2.0.
+        deadline (float, optional): 单次调用的总时间预算 以秒为单位 超出预算则不再重试. Defaults to 10.0.
+        retry_codes (Iterable[int], optional): 可重试的TiebaServerError错误码. Defaults to TRANSIENT_CODES.
+    """
+
+    __slots__ = [
+        'max_attempts',
+        'base_delay',
+        'max_delay',
+        'deadline',
+        'retry_codes',
+    ]
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.2,
+        max_delay: float = 2.0,
+        deadline: float = 10.0,
+        retry_codes: Iterable[int] = TRANSIENT_CODES,
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retry_codes: FrozenSet[int] = frozenset(retry_codes)
+
+    def is_retryable(self, err: Exception) -> bool:
+        """
+        判断异常是否可重试
+
+        Args:
+            err (Exception): 异常
+
+        Returns:
+            bool: True可重试 False不可重试
+        """
+
+        if isinstance(err, (aiohttp.ClientConnectionError, asyncio.TimeoutError)):
+            return True
+        if isinstance(err, HTTPStatusError):
+            return err.code >= 500
+        if isinstance(err, TiebaServerError):
+            return err.code in self.retry_codes
+        return False
+
+    def backoff(self, attempt: int) -> float:
+        """
+        计算第attempt次失败后的退避时间
+
+        Args:
+            attempt (int): 已失败的次数 从1开始
+
+        Returns:
+            float: 退避时间 以秒为单位
+        """
+
+        return random.uniform(0.0, min(self.max_delay, self.base_delay * (1 << (attempt - 1))))
+
+
+class RetryStats(object):
+    """
+    重试统计
+
+    Attributes:
+        calls (int): 调用次数
+        retries (int): 重试次数
+        successes (int): 成功次数 包含重试后成功
+        giveups (int): 用尽重试次数或时间预算后仍失败的次数
+    """
+
+    __slots__ = [
+        'calls',
+        'retries',
+        'successes',
+        'giveups',
+    ]
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.retries = 0
+        self.successes = 0
+        self.giveups = 0
+
+    def __repr__(self) -> str:
+        return str(
+            {
+                'calls': self.calls,
+                'retries': self.retries,
+                'successes': self.successes,
+                'giveups': self.giveups,
+            }
+        )
+
+
+class RetryPolicies(object):
+    """
+    各方法的重试策略
+
+    Args:
+        default (RetryPolicy, optional): 未单独设置的方法所使用的策略 None则默认不重试. Defaults to None.
+    """
+
+    __slots__ = [
+        'default',
+        '_policies',
+        '_stats',
+    ]
+
+    def __init__(self, default: Optional[RetryPolicy] = None) -> None:
+        self.default = default
+        self._policies: Dict[str, Optional[RetryPolicy]] = {}
+        self._stats: Dict[str, RetryStats] = {}
+
+    def get(self, meth: Callable) -> Optional[RetryPolicy]:
+        """
+        获取某个方法的重试策略
+
+        Args:
+            meth (Callable): 类方法
+
+        Returns:
+            RetryPolicy | None: 重试策略 None表示不重试
+        """
+
+        return self._policies.get(meth.__name__, self.default)
+
+    def __getitem__(self, meth: Callable) -> Optional[RetryPolicy]:
+        return self.get(meth)
+
+    def __setitem__(self, meth: Callable, policy: Optional[RetryPolicy]) -> None:
+        """
+        设置某个方法的重试策略
+
+        Args:
+            meth (Callable): 类方法
+            policy (RetryPolicy | None): 重试策略 None则禁用重试
+        """
+
+        self._policies[meth.__name__] = policy
+
+    def stats(self, meth: Callable) -> RetryStats:
+        """
+        获取某个方法的重试统计
+
+        Args:
+            meth (Callable): 类方法
+
+        Returns:
+            RetryStats: 重试统计
+        """
+
+        return self._stats.setdefault(meth.__name__, RetryStats())
+
+    async def call(self, meth_name: str, coro_func: Callable[[], Awaitable]) -> Any:
+        """
+        按重试策略执行请求
+
+        Args:
+            meth_name (str): 方法名
+            coro_func (Callable[[], Awaitable]): 用于实际发起请求的无参协程函数
+
+        Returns:
+            Any: 请求结果
+        """
+
+        policy = self._policies.get(meth_name, self.default)
+        if policy is None:
+            return await coro_func()
+
+        stats = self._stats.get(meth_name, None)
+        if stats is None:
+            stats = self._stats[meth_name] = RetryStats()
+        stats.calls += 1
+
+        start_time = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                ret = await coro_func()
+            except Exception as err:
+                if attempt >= policy.max_attempts or not policy.is_retryable(err):
+                    stats.giveups += 1
+                    raise
+                delay = policy.backoff(attempt)
+                if time.monotonic() - start_time + delay > policy.deadline:
+                    stats.giveups += 1
+                    raise
+                stats.retries += 1
+                await asyncio.sleep(delay)
+            else:
+                stats.successes += 1
+                return ret
@@ -0,0 +1,91 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight(object):
+    """
+    并发请求合并
+
+    Note:
+        同一时刻以相同参数并发调用的同一方法仅会实际执行一次
+        所有调用者将共享同一个返回对象 请勿原地修改该返回对象
+    """
+
+    __slots__ = [
+        '_enabled',
+        '_calls',
+    ]
+
+    def __init__(self) -> None:
+        self._enabled: Dict[str, bool] = {}
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def __getitem__(self, meth: Callable) -> bool:
+        """
+        获取某个方法是否启用了请求合并
+
+        Args:
+            meth (Callable): 类方法
+
+        Returns:
+            bool: True启用 False禁用 未设置时默认启用
+        """
+
+        return self._enabled.get(meth.__name__, True)
+
+    def __setitem__(self, meth: Callable, enable: bool) -> None:
+        """
+        设置某个方法是否启用请求合并
+
+        Args:
+            meth (Callable): 类方法
+            enable (bool): True启用 False禁用
+        """
+
+        self._enabled[meth.__name__] = enable
+
+    @property
+    def inflight(self) -> int:
+        """
+        正在执行的合并请求数
+        """
+
+        return len(self._calls)
+
+    def _on_done(self, key: Hashable, fut: asyncio.Future) -> None:
+        self._calls.pop(key, None)
+        if not fut.cancelled():
+            # 标记异常已被获取 避免没有调用者时产生警告
+            fut.exception()
+
+    async def do(self, meth_name: str, args: tuple, kwargs: Dict[str, Any], coro_func: Callable[[], Awaitable]) -> Any:
+        """
+        执行请求 若存在参数相同的正在执行的请求则等待其结果
+
+        Args:
+            meth_name (str): 方法名
+            args (tuple): 位置参数
+            kwargs (dict[str, Any]): 关键字参数
+            coro_func (Callable[[], Awaitable]): 用于实际发起请求的无参协程函数
+
+        Returns:
+            Any: 请求结果
+        """
+
+        if not self._enabled.get(meth_name, True):
+            return await coro_func()
+
+        key = (meth_name, args, tuple(sorted(kwargs.items())))
+        try:
+            fut = self._calls.get(key, None)
+        except TypeError:
+            # 参数不可哈希
+            return await coro_func()
+
+        if fut is None:
+            fut = asyncio.ensure_future(coro_func())
+            self._calls[key] = fut
+            fut.add_done_callback(lambda f: self._on_done(key, f))
+
+        # 单个调用者被取消时不应影响其他等待同一结果的调用者
+        return await asyncio.shield(fut)
@@ -170,6 +170,8 @@ def handle_exception(null_ret_factory: Callable[[], Any], no_format: bool = Fals
             else:
                 return ret
 
+        awrapper.__name__ = func.__name__
+
         return awrapper
 
     return wrapper
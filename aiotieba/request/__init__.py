@@ -1,3 +1,3 @@
-from .common import send_request
+from .common import send_request, warmup_conns
 from .http import pack_form_request, pack_proto_request, pack_web_form_request, pack_web_get_request
 from .websocket import pack_ws_bytes, parse_ws_bytes
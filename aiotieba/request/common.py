@@ -1,10 +1,13 @@
 import asyncio
+import time
+import zlib
 from typing import Callable
 
 import aiohttp
+import yarl
 
 from ..core import Network
-from ..exception import HTTPStatusError
+from ..exception import CircuitOpenError, ContentTooLargeError, HTTPStatusError
 from ..helper import timeout
 
 
@@ -16,11 +19,68 @@ def check_status_code(response: aiohttp.ClientResponse) -> None:
 TypeHeadersChecker = Callable[[aiohttp.ClientResponse], None]
 
 
+def _is_unavailable(err: Exception) -> bool:
+    """
+    判断异常是否表明服务端不可用
+    仅此类失败计入熔断器 4xx或响应过大等服务端已正常响应的情况不计入
+
+    Args:
+        err (Exception): 异常
+
+    Returns:
+        bool: True表明服务端不可用
+    """
+
+    if isinstance(err, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError)):
+        return True
+    if isinstance(err, HTTPStatusError):
+        return err.code >= 500
+    return False
+
+
+async def acquire_conn(request: aiohttp.ClientRequest, network: Network) -> aiohttp.connector.Connection:
+    """
+    获取用于发送请求的TCP连接
+    优先复用连接池中的空闲连接
+
+    Args:
+        request (aiohttp.ClientRequest): 待发送的请求
+        network (Network): 网络请求相关容器
+
+    Returns:
+        aiohttp.connector.Connection: TCP连接
+    """
+
+    # 占用全局连接预算
+    if (budget := network.budget) is not None:
+        await budget.acquire(network)
+
+    # 获取TCP连接
+    try:
+        async with timeout(network.time.http_connect, network.connector._loop):
+            conn = await network.connector.connect(request, [], network.time.http)
+    except asyncio.TimeoutError as exc:
+        if budget is not None:
+            budget.release()
+        raise aiohttp.ServerTimeoutError(f"Connection timeout to host {request.url}") from exc
+    except BaseException:
+        if budget is not None:
+            budget.release()
+        raise
+
+    if budget is not None:
+        # 连接被放回连接池或关闭时归还预算
+        conn.add_callback(budget.release)
+
+    return conn
+
+
 async def req2res(
     request: aiohttp.ClientRequest,
     network: Network,
     read_until_eof: bool = True,
     read_bufsize: int = 64 * 1024,
+    auto_decompress: bool = True,
 ) -> aiohttp.ClientResponse:
     """
     发送http请求并返回ClientResponse
@@ -30,22 +90,19 @@ async def req2res(
         network (Network): 网络请求相关容器
         read_until_eof (bool, optional): 是否读取到EOF就中止. Defaults to True.
         read_bufsize (int, optional): 读缓冲区大小 以字节为单位. Defaults to 64KiB.
+        auto_decompress (bool, optional): 是否边读取边解压响应. Defaults to True.
 
     Returns:
         ClientResponse: 响应
     """
 
     # 获取TCP连接
-    try:
-        async with timeout(network.time.http_connect, network.connector._loop):
-            conn = await network.connector.connect(request, [], network.time.http)
-    except asyncio.TimeoutError as exc:
-        raise aiohttp.ServerTimeoutError(f"Connection timeout to host {request.url}") from exc
+    conn = await acquire_conn(request, network)
 
     # 设置响应解析流程
     conn.protocol.set_response_params(
         read_until_eof=read_until_eof,
-        auto_decompress=True,
+        auto_decompress=auto_decompress,
         read_timeout=network.time.http_read,
         read_bufsize=read_bufsize,
     )
@@ -70,6 +127,7 @@ async def send_request(
     network: Network,
     read_bufsize: int = 64 * 1024,
     headers_checker: TypeHeadersChecker = check_status_code,
+    max_size: int = 0,
 ) -> bytes:
     """
     简单发送http请求
@@ -78,23 +136,281 @@ async def send_request(
     Args:
         request (aiohttp.ClientRequest): 待发送的请求
         network (Network): 网络请求相关容器
-        read_bufsize (int, optional): 读缓冲区大小 以字节为单位. Defaults to 64KiB.
+        read_bufsize (int, optional): 读缓冲区大小 以字节为单位 积累足够的响应样本后将改用按端点估计的大小. Defaults to 64KiB.
         headers_checker (TypeHeadersChecker, optional): headers检查函数. Defaults to check_status_code.
+        max_size (int, optional): 未解压的响应body的大小上限 以字节为单位 超出时中止下载并抛出ContentTooLargeError
+            0则不限制. Defaults to 0.
 
     Returns:
         bytes: body
     """
 
-    response = await req2res(request, network, True, read_bufsize)
+    path = request.url.path
+
+    breakers = network.breakers
+    if breakers is not None and not breakers.allow(path):
+        raise CircuitOpenError(path)
+
+    if (request_budget := network.request_budget) is not None:
+        host = request.url.host
+        await request_budget.acquire(host, path)
+
+    try:
+        if breakers is None:
+            return await _send_auto(request, network, read_bufsize, headers_checker, max_size)
+
+        start_time = time.monotonic()
+        try:
+            body = await _send_auto(request, network, read_bufsize, headers_checker, max_size)
+        except Exception as err:
+            if _is_unavailable(err):
+                breakers.record_failure(path)
+            else:
+                breakers.record_success(path, time.monotonic() - start_time)
+            raise
+        breakers.record_success(path, time.monotonic() - start_time)
+
+        return body
+
+    finally:
+        if request_budget is not None:
+            request_budget.release(host, path)
 
-    # 检查headers
-    headers_checker(response)
 
-    # 读取响应
-    response._body = await response.content.read()
-    body = response._body
+async def _send_auto(
+    request: aiohttp.ClientRequest,
+    network: Network,
+    read_bufsize: int,
+    headers_checker: TypeHeadersChecker,
+    max_size: int,
+) -> bytes:
+    if network.hedger is not None and request.url.path in network.hedger.paths:
+        return await _send_hedged(request, network, read_bufsize, headers_checker, max_size)
+
+    return await _send(request, network, read_bufsize, headers_checker, max_size)
+
+
+async def _send(
+    request: aiohttp.ClientRequest,
+    network: Network,
+    read_bufsize: int,
+    headers_checker: TypeHeadersChecker,
+    max_size: int,
+) -> bytes:
+    if network.limiter is not None:
+        await network.limiter.acquire(request.url.path)
+
+    if (proxy_pool := network.proxy_pool) is None:
+        return await _send_once(request, network, read_bufsize, headers_checker, max_size)
+
+    start_time = time.monotonic()
+    try:
+        body = await _send_once(request, network, read_bufsize, headers_checker, max_size)
+    except Exception as err:
+        if proxy_pool.is_proxy_failure(err):
+            proxy_pool.record_failure(request.proxy)
+        else:
+            proxy_pool.record_success(request.proxy, time.monotonic() - start_time)
+        raise
+    proxy_pool.record_success(request.proxy, time.monotonic() - start_time)
+
+    return body
+
+
+async def _send_once(
+    request: aiohttp.ClientRequest,
+    network: Network,
+    read_bufsize: int,
+    headers_checker: TypeHeadersChecker,
+    max_size: int,
+) -> bytes:
+    # 硬编码的read_bufsize仅作为冷启动时的初值
+    path = request.url.path
+    read_bufsize = network.bufsizes.estimate(path, read_bufsize)
+
+    response = await req2res(request, network, True, read_bufsize, False)
+
+    try:
+        # 检查headers
+        headers_checker(response)
+
+        # 读取未解压的响应
+        if max_size:
+            raw = await _read_capped(response, max_size)
+        else:
+            raw = await response.content.read()
+    except BaseException:
+        # 请求被取消或出错时 连接可能处于未读完的状态 不能放回连接池
+        response.close()
+        raise
 
     # 释放连接
     response.release()
 
+    network.bufsizes.record(path, len(raw))
+
+    # 一次性解压 以免解压出的分块与拼接后的body同时驻留内存
+    body = decompress_body(raw, response.headers.get(aiohttp.hdrs.CONTENT_ENCODING, ''))
+    response._body = body
+
     return body
+
+
+async def _read_capped(response: aiohttp.ClientResponse, max_size: int) -> bytes:
+    # 根据Content-Length提前中止
+    if (length := response.content_length) is not None and length > max_size:
+        raise ContentTooLargeError(length, max_size)
+
+    chunks = []
+    size = 0
+    async for chunk in response.content.iter_any():
+        size += len(chunk)
+        if size > max_size:
+            raise ContentTooLargeError(size, max_size)
+        chunks.append(chunk)
+
+    return b''.join(chunks)
+
+
+def decompress_body(raw: bytes, encoding: str) -> bytes:
+    """
+    按Content-Encoding解压完整的响应body
+
+    Args:
+        raw (bytes): 未解压的body
+        encoding (str): Content-Encoding
+
+    Returns:
+        bytes: 解压后的body
+    """
+
+    encoding = encoding.lower()
+
+    if not encoding or encoding == 'identity' or not raw:
+        return raw
+
+    try:
+        if encoding == 'gzip':
+            # gzip尾部的ISIZE字段记录了解压后的长度 据此预分配输出缓冲区 以免反复扩容
+            # 该字段不可信 因此限制预分配的大小
+            size_hint = int.from_bytes(raw[-4:], 'little')
+            bufsize = max(min(size_hint, len(raw) * 64), zlib.DEF_BUF_SIZE)
+            return zlib.decompress(raw, 31, bufsize)
+
+        if encoding == 'deflate':
+            # 兼容带zlib头部与不带头部的deflate数据
+            wbits = 15 if raw[0] & 0x0F == 8 else -15
+            return zlib.decompress(raw, wbits, len(raw) * 4)
+
+    except zlib.error as err:
+        raise aiohttp.ClientPayloadError(f"Can not decode content-encoding: {encoding}") from err
+
+    raise aiohttp.ClientPayloadError(f"Unsupported content-encoding: {encoding}")
+
+
+def _clone_request(request: aiohttp.ClientRequest, network: Network) -> aiohttp.ClientRequest:
+    if network.proxy_pool is None:
+        proxy, proxy_auth = request.proxy, request.proxy_auth
+    else:
+        # 对冲请求改用另一个代理 以绕开可能变慢的代理
+        proxy, proxy_auth = network.select_proxy()
+
+    return aiohttp.ClientRequest(
+        request.method,
+        request.original_url,
+        headers=request.headers,
+        data=request.body or None,
+        loop=request.loop,
+        proxy=proxy,
+        proxy_auth=proxy_auth,
+        ssl=False,
+    )
+
+
+async def _send_hedged(
+    request: aiohttp.ClientRequest,
+    network: Network,
+    read_bufsize: int,
+    headers_checker: TypeHeadersChecker,
+    max_size: int,
+) -> bytes:
+    hedger = network.hedger
+    path = request.url.path
+
+    async def _send_timed(_request: aiohttp.ClientRequest) -> bytes:
+        start_time = time.monotonic()
+        body = await _send(_request, network, read_bufsize, headers_checker, max_size)
+        hedger.record(path, time.monotonic() - start_time)
+        return body
+
+    primary = asyncio.ensure_future(_send_timed(request))
+    pending = {primary}
+
+    try:
+        done, _ = await asyncio.wait(pending, timeout=hedger.delay(path))
+        if done:
+            return primary.result()
+
+        # 主请求超过对冲延迟仍未完成 通过另一个连接发送相同的请求
+        hedger.hedged += 1
+        hedge = asyncio.ensure_future(_send_timed(_clone_request(request, network)))
+        pending.add(hedge)
+
+        exc = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if (exc := task.exception()) is None:
+                    if task is hedge:
+                        hedger.hedge_wins += 1
+                    return task.result()
+
+        # 两个请求均失败 抛出最后一个异常
+        raise exc
+
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def warmup_conns(url: yarl.URL, network: Network, num: int, loop: asyncio.AbstractEventLoop) -> int:
+    """
+    预先建立num个到url所在主机的连接并停放在连接池中
+
+    Args:
+        url (yarl.URL): 目标链接 仅使用其scheme/host/port
+        network (Network): 网络请求相关容器
+        num (int): 连接数
+        loop (asyncio.AbstractEventLoop): 事件循环
+
+    Returns:
+        int: 成功建立或刷新的连接数
+
+    Note:
+        已在连接池中的空闲连接会被取出再放回 从而刷新其空闲计时
+    """
+
+    if num <= 0:
+        return 0
+
+    proxy, proxy_auth = network.select_proxy()
+    request = aiohttp.ClientRequest(
+        aiohttp.hdrs.METH_GET,
+        url,
+        loop=loop,
+        proxy=proxy,
+        proxy_auth=proxy_auth,
+        ssl=False,
+    )
+
+    # 同时持有num个连接 以迫使连接池补足不够的部分
+    conns = await asyncio.gather(*[acquire_conn(request, network) for _ in range(num)], return_exceptions=True)
+
+    num_ok = 0
+    for conn in conns:
+        if isinstance(conn, BaseException):
+            continue
+        conn.release()
+        num_ok += 1
+
+    return num_ok
@@ -9,6 +9,32 @@ from ..core import HttpCore
 from ..helper.crypto import sign
 
 
+class _MultipartTemplate(object):
+    """
+    预编码的multipart表单模板
+    仅含一个名为data的文件字段 打包时只需在首尾拼接预编码的分隔部分
+    """
+
+    __slots__ = [
+        'content_type',
+        'prologue',
+        'epilogue',
+    ]
+
+    def __init__(self, boundary: str) -> None:
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        self.prologue = (
+            f"--{boundary}\r\n" 'Content-Disposition: form-data; name="data"; filename="file"\r\n\r\n'
+        ).encode('ascii')
+        self.epilogue = f"\r\n--{boundary}--\r\n".encode('ascii')
+
+    def pack(self, data: bytes) -> aiohttp.BytesPayload:
+        return aiohttp.BytesPayload(b''.join((self.prologue, data, self.epilogue)), content_type=self.content_type)
+
+
+_PROTO_TEMPLATES = [_MultipartTemplate(f"*-672328094--{i}") for i in range(10)]
+
+
 def pack_form_request(http_core: HttpCore, url: yarl.URL, data: List[Tuple[str, str]]) -> aiohttp.ClientRequest:
     """
     自动签名参数元组列表
@@ -28,14 +54,15 @@ def pack_form_request(http_core: HttpCore, url: yarl.URL, data: List[Tuple[str,
         content_type="application/x-www-form-urlencoded",
     )
 
+    proxy, proxy_auth = http_core.network.select_proxy()
     request = aiohttp.ClientRequest(
         aiohttp.hdrs.METH_POST,
         url,
         headers=http_core.app.headers,
         data=payload,
         loop=http_core.loop,
-        proxy=http_core.network.proxy,
-        proxy_auth=http_core.network.proxy_auth,
+        proxy=proxy,
+        proxy_auth=proxy_auth,
         ssl=False,
     )
 
@@ -55,24 +82,17 @@ def pack_proto_request(http_core: HttpCore, url: yarl.URL, data: bytes) -> aioht
         aiohttp.ClientRequest
     """
 
-    writer = aiohttp.MultipartWriter('form-data', boundary=f"*-672328094--{random.randint(0,9)}")
-    payload_headers = {
-        aiohttp.hdrs.CONTENT_DISPOSITION: aiohttp.helpers.content_disposition_header(
-            'form-data', name='data', filename='file'
-        )
-    }
-    payload = aiohttp.BytesPayload(data, content_type='', headers=payload_headers)
-    payload.headers.popone(aiohttp.hdrs.CONTENT_TYPE)
-    writer._parts.append((payload, None, None))
+    payload = random.choice(_PROTO_TEMPLATES).pack(data)
 
+    proxy, proxy_auth = http_core.network.select_proxy()
     request = aiohttp.ClientRequest(
         aiohttp.hdrs.METH_POST,
         url,
         headers=http_core.app_proto.headers,
-        data=writer,
+        data=payload,
         loop=http_core.loop,
-        proxy=http_core.network.proxy,
-        proxy_auth=http_core.network.proxy_auth,
+        proxy=proxy,
+        proxy_auth=proxy_auth,
         ssl=False,
     )
 
@@ -93,14 +113,15 @@ def pack_web_get_request(http_core: HttpCore, url: yarl.URL, params: List[Tuple[
     """
 
     url = url.update_query(params)
+    proxy, proxy_auth = http_core.network.select_proxy()
     request = aiohttp.ClientRequest(
         aiohttp.hdrs.METH_GET,
         url,
         headers=http_core.web.headers,
         cookies=http_core.web.cookie_jar.filter_cookies(url),
         loop=http_core.loop,
-        proxy=http_core.network.proxy,
-        proxy_auth=http_core.network.proxy_auth,
+        proxy=proxy,
+        proxy_auth=proxy_auth,
         ssl=False,
     )
 
@@ -125,6 +146,7 @@ def pack_web_form_request(http_core: HttpCore, url: yarl.URL, data: List[Tuple[s
         content_type="application/x-www-form-urlencoded",
     )
 
+    proxy, proxy_auth = http_core.network.select_proxy()
     request = aiohttp.ClientRequest(
         aiohttp.hdrs.METH_POST,
         url,
@@ -132,8 +154,8 @@ def pack_web_form_request(http_core: HttpCore, url: yarl.URL, data: List[Tuple[s
         data=payload,
         cookies=http_core.web.cookie_jar.filter_cookies(url),
         loop=http_core.loop,
-        proxy=http_core.network.proxy,
-        proxy_auth=http_core.network.proxy_auth,
+        proxy=proxy,
+        proxy_auth=proxy_auth,
         ssl=False,
     )
 
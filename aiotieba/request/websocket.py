@@ -1,8 +1,9 @@
 import gzip
-from typing import Tuple
+import zlib
+from typing import Tuple, Union
 
 from Crypto.Cipher import AES
-from Crypto.Util.Padding import pad, unpad
+from Crypto.Util.Padding import pad
 
 from ..core import Account
 
@@ -47,18 +48,23 @@ def pack_ws_bytes(
     return data
 
 
-def parse_ws_bytes(account: Account, data: bytes) -> Tuple[bytes, int, int]:
+def parse_ws_bytes(account: Account, data: bytes, chiper=None) -> Tuple[Union[bytes, memoryview], int, int]:
     """
     对websocket返回数据进行解包
 
     Args:
         account (Account): 贴吧的用户信息容器
         data (bytes): 接收到的websocket数据
+        chiper (Any, optional): 用于解密的AES-ECB加密器 None则使用account.aes_ecb_chiper
+            在其他线程中解包时应传入account.new_aes_ecb_chiper()创建的独立加密器. Defaults to None.
 
     Returns:
-        bytes: 解包后的websocket数据
+        bytes | memoryview: 解包后的websocket数据
         int: 对应请求的cmd类型
         int: 对应请求的id
+
+    Note:
+        为避免复制 未压缩的数据将以memoryview的形式返回 可直接交给protobuf解析
     """
 
     data_view = memoryview(data)
@@ -66,11 +72,20 @@ def parse_ws_bytes(account: Account, data: bytes) -> Tuple[bytes, int, int]:
     cmd = int.from_bytes(data_view[1:5], 'big')
     req_id = int.from_bytes(data_view[5:9], 'big')
 
-    data = data_view[9:].tobytes()
+    data_view = data_view[9:]
     if flag & 0b10000000:
-        data = account.aes_ecb_chiper.decrypt(data)
-        data = unpad(data, AES.block_size)
+        # 解密到预分配的缓冲区 并以切片的方式去除填充
+        buffer = bytearray(len(data_view))
+        if chiper is None:
+            chiper = account.aes_ecb_chiper
+        chiper.decrypt(data_view, output=buffer)
+        pad_len = buffer[-1] if buffer else 0
+        if not 0 < pad_len <= AES.block_size or buffer[-pad_len:] != bytes((pad_len,)) * pad_len:
+            raise ValueError("Padding is incorrect.")
+        data_view = memoryview(buffer)[:-pad_len]
     if flag & 0b01000000:
-        data = gzip.decompress(data)
+        # gzip尾部的ISIZE字段记录了解压后的长度 据此预分配输出缓冲区
+        bufsize = max(min(int.from_bytes(data_view[-4:], 'little'), len(data_view) * 64), zlib.DEF_BUF_SIZE)
+        return zlib.decompress(data_view, 31, bufsize), cmd, req_id
 
-    return data, cmd, req_id
+    return data_view, cmd, req_id
@@ -0,0 +1,59 @@
+"""
+pack_proto_request的微基准测试
+对比逐次构建MultipartWriter的旧实现与预编码模板的新实现
+
+Usage:
+    PYTHONPATH=. python tests/bench_pack_request.py
+"""
+
+import asyncio
+import os
+import random
+import timeit
+
+import aiohttp
+import yarl
+
+from aiotieba.core import Account, HttpCore, Network
+from aiotieba.request import pack_proto_request
+
+NUMBER = 20000
+
+
+def pack_proto_request_legacy(http_core: HttpCore, url: yarl.URL, data: bytes) -> aiohttp.ClientRequest:
+    writer = aiohttp.MultipartWriter('form-data', boundary=f"*-672328094--{random.randint(0,9)}")
+    payload_headers = {
+        aiohttp.hdrs.CONTENT_DISPOSITION: aiohttp.helpers.content_disposition_header(
+            'form-data', name='data', filename='file'
+        )
+    }
+    payload = aiohttp.BytesPayload(data, content_type='', headers=payload_headers)
+    payload.headers.popone(aiohttp.hdrs.CONTENT_TYPE)
+    writer._parts.append((payload, None, None))
+
+    return aiohttp.ClientRequest(
+        aiohttp.hdrs.METH_POST,
+        url,
+        headers=http_core.app_proto.headers,
+        data=writer,
+        loop=http_core.loop,
+        proxy=http_core.network.proxy,
+        proxy_auth=http_core.network.proxy_auth,
+        ssl=False,
+    )
+
+
+async def main() -> None:
+    loop = asyncio.get_running_loop()
+    async with aiohttp.TCPConnector() as connector:
+        http_core = HttpCore(Account(), Network(connector), loop)
+        url = yarl.URL.build(scheme="https", host="tiebac.baidu.com", path="/c/f/pb/page", query_string="cmd=302001")
+        data = os.urandom(256)
+
+        for name, func in [("legacy", pack_proto_request_legacy), ("template", pack_proto_request)]:
+            cost = timeit.timeit(lambda: func(http_core, url, data), number=NUMBER) / NUMBER
+            print(f"{name:>8}: {cost * 1e6:.2f} us/request")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""
+websocket大帧解包对事件循环延迟的基准测试
+服务端持续返回加密且压缩的大帧 对比在事件循环中解包与交给线程池解包时的事件循环延迟
+
+Usage:
+    PYTHONPATH=. python tests/bench_ws_offload.py
+"""
+
+import asyncio
+import random
+import time
+
+import aiohttp
+import yarl
+from aiohttp import web
+
+from aiotieba.core import Account, LoopLagMonitor, Network, WsCore
+from aiotieba.helper import WsStatus
+from aiotieba.request.websocket import pack_ws_bytes
+
+NUM_REQUESTS = 64
+CONCURRENCY = 8
+PAYLOAD_SIZE = 4 * 1024 * 1024
+
+ACCOUNT = Account()
+# 压缩率与真实的protobuf响应相近
+PAYLOAD = bytes(random.choice(b'0123456789abcdefghij') for _ in range(PAYLOAD_SIZE))
+
+
+async def handler(request: web.Request) -> web.WebSocketResponse:
+    ws = web.WebSocketResponse(max_msg_size=0)
+    await ws.prepare(request)
+    frame = pack_ws_bytes(ACCOUNT, PAYLOAD, 302001, 0, compress=True)
+    async for msg in ws:
+        await ws.send_bytes(frame[:5] + msg.data[5:9] + frame[9:])
+    return ws
+
+
+async def bench(port: int, threshold: int) -> None:
+    loop = asyncio.get_running_loop()
+    async with aiohttp.TCPConnector(limit=0) as connector:
+        ws_core = WsCore(ACCOUNT, Network(connector), loop, offload_threshold=threshold)
+        ws_core.ws_url = yarl.URL.build(scheme='ws', host='127.0.0.1', port=port)
+        await ws_core.connect()
+        ws_core._status = WsStatus.OPEN
+
+        sem = asyncio.Semaphore(CONCURRENCY)
+
+        async def fetch() -> None:
+            async with sem:
+                resp = await ws_core.send(b'', 302001)
+                await resp.read()
+
+        async with LoopLagMonitor(interval=0.005, window=4096) as monitor:
+            start = time.perf_counter()
+            await asyncio.gather(*[fetch() for _ in range(NUM_REQUESTS)])
+            cost = time.perf_counter() - start
+
+        await ws_core.close()
+
+    name = 'inline' if threshold <= 0 else 'offload'
+    print(
+        f"{name:>7}: {NUM_REQUESTS / cost:.1f} req/s"
+        f" lag p50={monitor.percentile(0.5) * 1e3:.2f}ms"
+        f" p99={monitor.percentile(0.99) * 1e3:.2f}ms"
+        f" max={monitor.max_lag * 1e3:.2f}ms"
+    )
+
+
+async def main() -> None:
+    app = web.Application()
+    app.router.add_get('/', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    for threshold in (0, 64 * 1024):
+        await bench(port, threshold)
+
+    await runner.cleanup()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+"""
+websocket连接池的吞吐量基准测试
+本地服务端逐帧串行处理并原样返回 以模拟单个连接的队头阻塞
+
+Usage:
+    PYTHONPATH=. python tests/bench_ws_pool.py
+"""
+
+import asyncio
+import time
+
+import aiohttp
+import yarl
+from aiohttp import web
+
+from aiotieba.core import Account, Network, WsCore
+from aiotieba.helper import WsStatus
+
+NUM_REQUESTS = 1000
+CONCURRENCY = 64
+SERVER_DELAY = 0.001
+
+
+async def echo_handler(request: web.Request) -> web.WebSocketResponse:
+    ws = web.WebSocketResponse()
+    await ws.prepare(request)
+    async for msg in ws:
+        await asyncio.sleep(SERVER_DELAY)
+        await ws.send_bytes(msg.data)
+    return ws
+
+
+async def bench(port: int, pool_size: int) -> float:
+    async with aiohttp.TCPConnector(limit=0) as connector:
+        ws_core = WsCore(Account(), Network(connector), asyncio.get_running_loop(), pool_size=pool_size)
+        ws_core.ws_url = yarl.URL.build(scheme='ws', host='127.0.0.1', port=port)
+        await ws_core.connect()
+        ws_core._status = WsStatus.OPEN
+
+        sem = asyncio.Semaphore(CONCURRENCY)
+
+        async def echo(i: int) -> None:
+            async with sem:
+                resp = await ws_core.send(i.to_bytes(4, 'big'), 309616, encrypt=False)
+                await resp.read()
+
+        start_time = time.perf_counter()
+        await asyncio.gather(*[echo(i) for i in range(NUM_REQUESTS)])
+        cost = time.perf_counter() - start_time
+
+        await ws_core.close()
+
+    return NUM_REQUESTS / cost
+
+
+async def main() -> None:
+    app = web.Application()
+    app.router.add_get('/', echo_handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    for pool_size in [1, 2, 4, 8]:
+        qps = await bench(port, pool_size)
+        print(f"pool_size={pool_size}: {qps:.0f} req/s")
+
+    await runner.cleanup()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
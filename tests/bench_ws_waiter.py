@@ -0,0 +1,71 @@
+"""
+websocket等待映射的基准测试
+大量并发读取在同一批次内完成 对比逐请求超时上下文与统一扫描截止时刻的开销
+
+Usage:
+    PYTHONPATH=. python tests/bench_ws_waiter.py
+"""
+
+import asyncio
+import time
+import weakref
+
+from aiotieba.core.websocket import WsWaiter
+from aiotieba.helper import timeout
+
+NUM_REQUESTS = 10000
+ROUNDS = 5
+
+
+class _LegacyResponse(object):
+    __slots__ = ['__weakref__', 'future', 'loop']
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.future = loop.create_future()
+        self.loop = loop
+
+    async def read(self) -> bytes:
+        async with timeout(8.0, self.loop):
+            return await self.future
+
+
+async def bench_legacy(loop: asyncio.AbstractEventLoop) -> float:
+    waiter = weakref.WeakValueDictionary()
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        resps = []
+        for req_id in range(NUM_REQUESTS):
+            resp = waiter[req_id] = _LegacyResponse(loop)
+            resps.append(resp)
+        tasks = [loop.create_task(resp.read()) for resp in resps]
+        await asyncio.sleep(0)
+        for req_id in range(NUM_REQUESTS):
+            waiter[req_id].future.set_result(b'')
+        await asyncio.gather(*tasks)
+        del resps, tasks
+    return time.perf_counter() - start
+
+
+async def bench_waiter(loop: asyncio.AbstractEventLoop) -> float:
+    waiter = WsWaiter(loop, 8.0)
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        resps = [waiter.new() for _ in range(NUM_REQUESTS)]
+        tasks = [loop.create_task(resp.read()) for resp in resps]
+        await asyncio.sleep(0)
+        for resp in resps:
+            waiter.set_done(resp.req_id, b'')
+        await asyncio.gather(*tasks)
+        del resps, tasks
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    loop = asyncio.get_running_loop()
+    for name, bench in [('legacy', bench_legacy), ('waiter', bench_waiter)]:
+        cost = min([await bench(loop) for _ in range(3)])
+        print(f"{name:>6}: {cost / (ROUNDS * NUM_REQUESTS) * 1e6:.2f} us/request")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import aiohttp
+import pytest
+import yarl
+from aiohttp import web
+
+from aiotieba.core import CircuitBreakers, Network
+from aiotieba.core.breaker import BreakerState
+from aiotieba.exception import HTTPStatusError
+from aiotieba.request import send_request
+
+
+def test_CircuitBreakers():
+    breakers = CircuitBreakers(failure_threshold=2, slo=0.5, reset_timeout=0.05)
+
+    assert breakers.allow(302001)
+    breakers.record_failure(302001)
+    # 成功但超过延迟目标同样记为失败
+    breakers.record_success(302001, 1.0)
+    assert breakers.get(302001).state == BreakerState.OPEN
+    assert breakers.is_open(302001)
+    assert not breakers.allow(302001)
+
+    # 其他端点不受影响
+    assert not breakers.is_open(302002)
+    assert not breakers.is_open("/c/f/pb/page")
+
+    # 半开状态仅放行一个探测请求
+    time.sleep(0.06)
+    assert not breakers.is_open(302001)
+    assert breakers.allow(302001)
+    assert not breakers.allow(302001)
+    breakers.record_success(302001, 0.1)
+    assert breakers.get(302001).state == BreakerState.CLOSED
+    assert breakers.allow(302001)
+
+    # 探测失败则重新断开
+    breakers.record_failure(302001)
+    breakers.record_failure(302001)
+    time.sleep(0.06)
+    assert breakers.allow(302001)
+    breakers.record_failure(302001)
+    assert not breakers.allow(302001)
+
+
+def test_CircuitBreakers_probe():
+    breakers = CircuitBreakers(failure_threshold=1, reset_timeout=0.05)
+
+    breakers.record_failure(302001)
+    breakers.record_failure(302002)
+    time.sleep(0.06)
+
+    # 端点熔断器拒绝时不占用传输方式熔断器的探测名额
+    breakers.get(302002).allow(time.monotonic())
+    assert not breakers.allow(302002)
+    assert breakers.transport('ws').state == BreakerState.OPEN
+    assert breakers.allow(302001)
+    assert breakers.transport('ws').state == BreakerState.HALF_OPEN
+
+
+def test_CircuitBreakers_capacity():
+    breakers = CircuitBreakers(capacity=4)
+    breakers.set_endpoint("/c/f/pb/page", failure_threshold=1)
+
+    for i in range(16):
+        breakers.record_success(f"/forum/pic/item/{i}.jpg", 0.1)
+    assert len(breakers._endpoints) == 4
+    assert "/forum/pic/item/15.jpg" in breakers._endpoints
+
+    # 单独设置的端点不会被淘汰
+    assert breakers.get("/c/f/pb/page").failure_threshold == 1
+    # 查询状态不会创建熔断器
+    assert not breakers.is_open("/forum/pic/item/0.jpg")
+    assert "/forum/pic/item/0.jpg" not in breakers._endpoints
+
+
+@pytest.mark.asyncio
+async def test_CircuitBreakers_send_request():
+    async def handler(request: web.Request) -> web.Response:
+        return web.Response(status=int(request.match_info['status']))
+
+    app = web.Application()
+    app.router.add_get('/{status}', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    breakers = CircuitBreakers(failure_threshold=1)
+    async with aiohttp.TCPConnector(limit=0) as connector:
+        network = Network(connector, breakers=breakers)
+        for status, opened in (('404', False), ('503', True)):
+            url = yarl.URL.build(scheme='http', host='127.0.0.1', port=port, path=f'/{status}')
+            request = aiohttp.ClientRequest(aiohttp.hdrs.METH_GET, url, loop=asyncio.get_running_loop())
+            with pytest.raises(HTTPStatusError):
+                await send_request(request, network)
+            # 仅5xx计入熔断器 4xx表明服务端可用
+            assert breakers.is_open(f'/{status}') == opened
+
+    await runner.cleanup()
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from aiotieba.core import REQUEST_PRIORITY, ConnectionBudget, RequestBudget
+from aiotieba.core.priority import aged_priority
+from aiotieba.enums import Priority
+
+
+@pytest.mark.asyncio
+async def test_ConnectionBudget():
+    budget = ConnectionBudget(1)
+    order = []
+
+    async def worker(key: str) -> None:
+        await budget.acquire(key)
+        order.append(key)
+        await asyncio.sleep(0.01)
+        budget.release()
+
+    tasks = [asyncio.ensure_future(worker(k)) for k in ('a', 'a', 'a', 'b')]
+    await asyncio.sleep(0)
+    assert budget.in_use == 1
+    assert budget.waiting == 3
+
+    await asyncio.gather(*tasks)
+    # 账号b不会被账号a的积压请求饿死
+    assert order == ['a', 'a', 'b', 'a']
+    assert budget.in_use == 0
+
+    # 排队中被取消的请求不占用预算
+    await budget.acquire('a')
+    task = asyncio.ensure_future(budget.acquire('b'))
+    await asyncio.sleep(0)
+    task.cancel()
+    await asyncio.sleep(0)
+    budget.release()
+    assert budget.in_use == 0
+    assert budget.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_RequestBudget():
+    budget = RequestBudget(limit=2, endpoints={"/c/f/pb/page": 1}, by_priority=True)
+    order = []
+
+    async def worker(name: str, endpoint: str, priority: int) -> None:
+        REQUEST_PRIORITY.set(priority)
+        await budget.acquire("tiebac.baidu.com", endpoint)
+        order.append(name)
+        await asyncio.sleep(0.01)
+        budget.release("tiebac.baidu.com", endpoint)
+
+    tasks = [
+        asyncio.ensure_future(worker('pb0', "/c/f/pb/page", 1)),
+        asyncio.ensure_future(worker('pb1', "/c/f/pb/page", 1)),
+        asyncio.ensure_future(worker('frs', "/c/f/frs/page", 1)),
+        asyncio.ensure_future(worker('del', "/c/c/bawu/delthread", 0)),
+    ]
+    await asyncio.sleep(0)
+    # pb1受端点限制排队 但不阻塞其后的请求
+    assert order == ['pb0', 'frs']
+    assert budget.in_flight == 2
+    assert budget.queue_depth == 2
+
+    await asyncio.gather(*tasks)
+    # 高优先级请求插队
+    assert order == ['pb0', 'frs', 'del', 'pb1']
+    assert budget.in_flight == 0
+    assert budget.stats.waited == 3
+    assert budget.stats.max_wait > 0.0
+    # 请求结束后不保留按主机和端点的计数
+    assert not budget._host_in_flight
+    assert not budget._endpoint_in_flight
+
+
+def test_aged_priority():
+    assert aged_priority(Priority.BULK, 4.0, 5.0) == Priority.BULK
+    # 低优先级请求等待足够久后不再排在新到的高优先级请求之后
+    assert aged_priority(Priority.BULK, 10.0, 5.0) == Priority.WRITE
+    assert aged_priority(Priority.BULK, 100.0, 0.0) == Priority.BULK
@@ -0,0 +1,34 @@
+from aiotieba.core import BufsizeEstimator
+
+
+def test_BufsizeEstimator():
+    estimator = BufsizeEstimator(min_samples=4)
+
+    # 样本不足时使用硬编码的初值
+    assert estimator.estimate('/c/f/frs/page', 256 * 1024) == 256 * 1024
+
+    for _ in range(4):
+        estimator.record('/c/f/frs/page', 300 * 1024)
+    assert estimator.estimate('/c/f/frs/page', 256 * 1024) == 512 * 1024
+
+    for _ in range(4):
+        estimator.record('/c/s/login', 100)
+    assert estimator.estimate('/c/s/login', 1024) == 4 * 1024
+
+    for _ in range(4):
+        estimator.record('/forum/pic', 64 * 1024 * 1024)
+    assert estimator.estimate('/forum/pic', 512 * 1024) == 4 * 1024 * 1024
+
+
+def test_BufsizeEstimator_capacity():
+    estimator = BufsizeEstimator(min_samples=1, capacity=4)
+
+    estimator.record('/c/f/frs/page', 300 * 1024)
+    for i in range(16):
+        estimator.record(f'/forum/pic/item/{i}.jpg', 100 * 1024)
+        # 持续使用的端点不会被淘汰
+        estimator.record('/c/f/frs/page', 300 * 1024)
+
+    assert len(estimator._stats) == 4
+    assert estimator.estimate('/c/f/frs/page', 1024) == 512 * 1024
+    assert estimator.estimate('/forum/pic/item/0.jpg', 1024) == 1024
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+from aiotieba.enums import ReqUInfo
+from aiotieba.helper.cache import MemoryForumCache, MemoryUserCache, SqliteForumCache
+
+
+def test_MemoryForumCache():
+    cache = MemoryForumCache(capacity=2)
+    cache.add_forum('a', 1)
+    cache.add_forum('b', 2)
+
+    # 命中会刷新使用顺序
+    assert cache.get_fid('a') == 1
+    cache.add_forum('c', 3)
+    assert cache.get_fname(1) == 'a'
+    assert cache.get_fid('b') == 0
+    assert cache.get_fname(3) == 'c'
+
+    # 贴吧改名
+    cache.add_forum('d', 3)
+    assert cache.get_fid('c') == 0
+    assert cache.get_fname(3) == 'd'
+    assert len(cache) == 2
+
+    cache = MemoryForumCache(ttl=0.01)
+    cache.add_forum('a', 1)
+    time.sleep(0.02)
+    assert cache.get_fid('a') == 0
+    assert cache.get_fname(1) == ''
+
+
+def test_SqliteForumCache(tmp_path):
+    db_path = tmp_path / "forum.db"
+    cache = SqliteForumCache(db_path, capacity=1)
+    cache.add_forum('a', 1)
+    cache.add_forum('b', 2)
+    assert len(cache) == 1
+    assert cache.get_fid('a') == 1
+    cache.close()
+
+    cache = SqliteForumCache(db_path)
+    assert cache.get_fname(2) == 'b'
+    assert cache.get_fid('a') == 1
+
+    # 贴吧改名后数据库中不再保留旧贴吧名
+    cache.add_forum('c', 2)
+    cache.close()
+    cache = SqliteForumCache(db_path)
+    assert cache.get_fid('b') == 0
+    assert cache.get_fname(2) == 'c'
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_SqliteForumCache_load(tmp_path, monkeypatch):
+    db_path = tmp_path / "forum.db"
+    cache = SqliteForumCache(db_path)
+    cache.add_forum('a', 1)
+    cache.close()
+
+    cache = SqliteForumCache(db_path)
+    threads = []
+    query = SqliteForumCache._query
+
+    def _query(self, sql, key):
+        threads.append(threading.current_thread())
+        return query(self, sql, key)
+
+    monkeypatch.setattr(SqliteForumCache, '_query', _query)
+    assert await cache.load_fid('a') == 1
+    assert await cache.load_fname(2) == ''
+    # 数据库查询不在事件循环所在的线程中执行
+    assert threads and threading.main_thread() not in threads
+    # 命中内存时不再查询数据库
+    assert await cache.load_fname(1) == 'a'
+    assert len(threads) == 2
+    cache.close()
+
+
+def test_MemoryUserCache():
+    cache = MemoryUserCache(capacity=2, name_ttl=0.01)
+    cache.add_user(1, 'tb.1.a', 'a')
+    cache.add_user(2, 'tb.1.b', '')
+
+    assert cache.get_user('tb.1.a', ReqUInfo.USER_ID) == (1, 'tb.1.a', 'a')
+    assert cache.get_user('a', ReqUInfo.PORTRAIT) == (1, 'tb.1.a', 'a')
+    assert cache.get_user(2, ReqUInfo.USER_NAME) is None
+    assert cache.get_user(2, ReqUInfo.PORTRAIT) == (2, 'tb.1.b', '')
+
+    # 用户名过期后仍可通过portrait查询
+    time.sleep(0.02)
+    assert cache.get_user('a', ReqUInfo.USER_ID) is None
+    assert cache.get_user(1, ReqUInfo.PORTRAIT) == (1, 'tb.1.a', '')
+
+    cache.add_user(3, 'tb.1.c', 'c')
+    assert cache.get_user(2, ReqUInfo.USER_ID) is None
+    assert len(cache) == 2
+
+    assert cache.hits == 4
+    assert cache.misses == 3
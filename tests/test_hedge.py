@@ -0,0 +1,47 @@
+import asyncio
+
+import aiohttp
+import pytest
+import yarl
+from aiohttp import web
+
+from aiotieba.core import Hedger, Network
+from aiotieba.request import send_request
+
+
+@pytest.mark.asyncio
+async def test_Hedger():
+    num_reqs = 0
+
+    async def handler(request: web.Request) -> web.Response:
+        nonlocal num_reqs
+        num_reqs += 1
+        # 首个请求卡住 模拟连接池中的慢连接
+        if num_reqs == 1:
+            await asyncio.sleep(5.0)
+        return web.Response(body=b'ok')
+
+    app = web.Application()
+    app.router.add_post('/c/f/pb/page', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    hedger = Hedger(max_delay=0.1)
+    async with aiohttp.TCPConnector(limit=0) as connector:
+        network = Network(connector, hedger=hedger)
+        url = yarl.URL.build(scheme='http', host='127.0.0.1', port=port, path='/c/f/pb/page')
+        request = aiohttp.ClientRequest(
+            aiohttp.hdrs.METH_POST, url, data=aiohttp.BytesPayload(b'data'), loop=asyncio.get_running_loop()
+        )
+        body = await asyncio.wait_for(send_request(request, network), 2.0)
+
+    assert body == b'ok'
+    assert num_reqs == 2
+    assert hedger.hedged == 1
+    assert hedger.hedge_wins == 1
+    assert len(hedger.histogram('/c/f/pb/page')) == 1
+
+    await runner.cleanup()
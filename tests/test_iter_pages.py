@@ -0,0 +1,224 @@
+import asyncio
+
+import pytest
+
+import aiotieba as tb
+from aiotieba import client as tb_client
+from aiotieba.api.get_comments import Comment, Comments
+from aiotieba.api.get_comments.protobuf import PbFloorResIdl_pb2
+from aiotieba.api.get_posts import Comment_p, Posts
+from aiotieba.api.get_posts.protobuf import PbPageResIdl_pb2
+from aiotieba.core import REQUEST_PRIORITY
+from aiotieba.enums import Priority
+from aiotieba.exception import PageFetchError
+
+
+class _Logger(object):
+    def __init__(self) -> None:
+        self.warnings = []
+
+    def warning(self, msg: str) -> None:
+        self.warnings.append(msg)
+
+
+def _make_posts(pn: int, total_page: int, floors: list, reply_num: int = 0) -> Posts:
+    data_proto = PbPageResIdl_pb2.PbPageResIdl.DataRes()
+    data_proto.page.current_page = pn
+    data_proto.page.total_page = total_page
+    data_proto.page.has_more = int(pn < total_page)
+    data_proto.user_list.add().id = 1
+    for floor in floors:
+        post_proto = data_proto.post_list.add()
+        post_proto.id = floor * 100
+        post_proto.floor = floor
+        post_proto.author_id = 1
+        post_proto.sub_post_number = reply_num
+        sub_proto = post_proto.sub_post_list.sub_post_list.add()
+        sub_proto.id = floor * 100 + 1
+        sub_proto.author_id = 1
+    return Posts(data_proto)
+
+
+def _make_comments(pid: int, pn: int, total_page: int) -> Comments:
+    data_proto = PbFloorResIdl_pb2.PbFloorResIdl.DataRes()
+    data_proto.page.current_page = pn
+    data_proto.page.total_page = total_page
+    data_proto.post.id = pid
+    for i in range(2):
+        data_proto.subpost_list.add().id = pid + (pn - 1) * 2 + i + 1
+    return Comments(data_proto)
+
+
+@pytest.mark.asyncio
+async def test_iter_pages():
+    fetched = []
+    priorities = []
+
+    async def fetch(pn: int) -> Posts:
+        fetched.append(pn)
+        priorities.append(REQUEST_PRIORITY.get())
+        await asyncio.sleep(0)
+        return _make_posts(pn, 4, [pn])
+
+    pages = []
+    async for page in tb_client._iter_pages(fetch, 1, 2):
+        await asyncio.sleep(0)
+        # 处理当前页时后继页已被预取
+        assert max(fetched) >= page.page.current_page + 2
+        pages.append(page.page.current_page)
+
+    assert pages == [1, 2, 3, 4]
+    # 末页之后最多多请求prefetch页
+    assert sorted(fetched) == list(range(1, 7))
+    assert all(p == Priority.BULK for p in priorities)
+
+
+@pytest.mark.asyncio
+async def test_iter_pages_cancel():
+    started = []
+    cancelled = []
+
+    async def fetch(pn: int) -> Posts:
+        started.append(pn)
+        if pn > 1:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(pn)
+                raise
+        return _make_posts(pn, 10, [pn])
+
+    iterator = tb_client._iter_pages(fetch, 1, 1)
+    page = await iterator.__anext__()
+    assert page.page.current_page == 1
+    await iterator.aclose()
+    await asyncio.sleep(0)
+    # 提前结束迭代时取消全部预取任务
+    assert started == [1, 2]
+    assert cancelled == [2]
+
+
+@pytest.mark.asyncio
+async def test_iter_pages_error():
+    async def fetch(pn: int) -> Posts:
+        # 第3页请求失败 返回空页
+        return Posts() if pn == 3 else _make_posts(pn, 5, [pn])
+
+    pages = []
+    with pytest.raises(PageFetchError) as exc_info:
+        async for page in tb_client._iter_pages(fetch, 2, 1):
+            pages.append(page.page.current_page)
+
+    # 空页不会被当作末页而静默结束迭代
+    assert pages == [2]
+    assert exc_info.value.pn == 3
+
+
+@pytest.mark.asyncio
+async def test_get_all_posts(monkeypatch):
+    requested = []
+
+    async def get_posts(self, tid, pn=1, **kwargs):
+        requested.append(pn)
+        # 第二页与第一页有重叠的楼层
+        floors = {1: [1, 2, 3], 2: [3, 4], 3: [5]}[pn]
+        return _make_posts(pn, 3, floors)
+
+    monkeypatch.setattr(tb.Client, 'get_posts', get_posts)
+
+    async with tb.Client() as client:
+        posts = await client.get_all_posts(1, concurrency=2)
+
+    assert sorted(requested) == [1, 2, 3]
+    assert requested[0] == 1
+    assert [post.floor for post in posts] == [1, 2, 3, 4, 5]
+    assert posts.page.current_page == 1
+
+
+@pytest.mark.asyncio
+async def test_get_all_posts_failure(monkeypatch):
+    requested = []
+    logger = _Logger()
+
+    async def get_posts(self, tid, pn=1, **kwargs):
+        requested.append(pn)
+        # 第2页首次请求失败 第3页始终失败
+        if pn == 3 or (pn == 2 and requested.count(2) == 1):
+            return Posts()
+        return _make_posts(pn, 3, [pn])
+
+    monkeypatch.setattr(tb.Client, 'get_posts', get_posts)
+    monkeypatch.setattr(tb_client, 'LOG', lambda: logger)
+
+    async with tb.Client() as client:
+        posts = await client.get_all_posts(1)
+
+    # 失败的页重试一次 仍失败则记录警告
+    assert sorted(requested) == [1, 2, 2, 3, 3]
+    assert [post.floor for post in posts] == [1, 2]
+    assert len(logger.warnings) == 1
+    assert "[3]" in logger.warnings[0]
+
+
+@pytest.mark.asyncio
+async def test_get_posts_expand_comments(monkeypatch):
+    requested = []
+
+    async def request_http(http_core, tid, pn, *args):
+        # 1楼的楼中楼被截断 2楼完整
+        posts = _make_posts(pn, 1, [1])
+        posts._objs += _make_posts(pn, 1, [2], reply_num=1)._objs
+        posts._objs[0]._reply_num = 4
+        return posts
+
+    async def get_comments(self, tid, pid, pn=1, *, is_floor=False):
+        requested.append((pid, pn))
+        return _make_comments(pid, pn, 2)
+
+    monkeypatch.setattr(tb_client.get_posts, 'request_http', request_http)
+    monkeypatch.setattr(tb.Client, 'get_comments', get_comments)
+
+    async with tb.Client() as client:
+        posts = await client.get_posts(1, with_comments=True)
+        assert not requested
+        assert all(not post.all_comments for post in posts)
+
+        posts = await client.get_posts(1, with_comments=True, expand_comments=True)
+
+    assert sorted(requested) == [(100, 1), (100, 2)]
+    first, second = posts
+    # Post.comments的类型保持不变 完整楼中楼存放于Post.all_comments
+    assert all(isinstance(c, Comment_p) for c in first.comments)
+    assert len(first.comments) == 1
+    assert [c.pid for c in first.all_comments] == [101, 102, 103, 104]
+    assert all(isinstance(c, Comment) for c in first.all_comments)
+    assert not second.all_comments
+
+
+@pytest.mark.asyncio
+async def test_get_all_posts_expand_comments(monkeypatch):
+    in_flight = 0
+    max_in_flight = 0
+
+    async def get_posts(self, tid, pn=1, **kwargs):
+        assert not kwargs.get('expand_comments', False)
+        return _make_posts(pn, 4, [pn * 2 - 1, pn * 2], reply_num=4)
+
+    async def get_comments(self, tid, pid, pn=1, *, is_floor=False):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return _make_comments(pid, pn, 2)
+
+    monkeypatch.setattr(tb.Client, 'get_posts', get_posts)
+    monkeypatch.setattr(tb.Client, 'get_comments', get_comments)
+
+    async with tb.Client() as client:
+        posts = await client.get_all_posts(1, with_comments=True, expand_comments=True, concurrency=2)
+
+    # 全部楼层的楼中楼请求共用同一个并发上限
+    assert max_in_flight == 2
+    assert len(posts) == 8
+    assert all(len(post.all_comments) == 4 for post in posts)
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+import yarl
+from aiohttp import web
+
+import aiotieba as tb
+from aiotieba.api.get_group_msg.protobuf import GetGroupMsgResIdl_pb2
+from aiotieba.api.init_websocket.protobuf import UpdateClientInfoResIdl_pb2
+from aiotieba.api.push_notify import NotifyStream
+from aiotieba.api.push_notify.protobuf import PushNotifyResIdl_pb2
+from aiotieba.helper import GroupType, OverflowPolicy
+
+
+def _pack_frame(cmd: int, req_id: int, body: bytes) -> bytes:
+    return b''.join([b'\x08', cmd.to_bytes(4, 'big'), req_id.to_bytes(4, 'big'), body])
+
+
+@pytest.mark.asyncio
+async def test_NotifyStream_overflow():
+    loop = asyncio.get_running_loop()
+
+    stream = NotifyStream(loop, maxsize=2, overflow=OverflowPolicy.DROP_OLDEST)
+    for i in range(4):
+        stream.put(i)
+    stream.close()
+    stream.put(4)
+    assert [i async for i in stream] == [2, 3]
+    assert stream.dropped == 2
+
+    stream = NotifyStream(loop, maxsize=2, overflow=OverflowPolicy.DROP_NEWEST)
+    for i in range(4):
+        stream.put(i)
+    stream.close()
+    assert [i async for i in stream] == [0, 1]
+    assert stream.dropped == 2
+
+
+@pytest.mark.asyncio
+async def test_Client_notifications():
+    priv_gid = 1024
+    fetched_mids = []
+
+    async def handler(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for msg in ws:
+            data = msg.data
+            cmd = int.from_bytes(data[1:5], 'big')
+            req_id = int.from_bytes(data[5:9], 'big')
+
+            if cmd == 1001:
+                res_proto = UpdateClientInfoResIdl_pb2.UpdateClientInfoResIdl()
+                group_proto = res_proto.data.groupInfo.add()
+                group_proto.groupId = priv_gid
+                group_proto.groupType = GroupType.PRIVATE_MSG
+                group_proto.lastMsgId = 100
+                await ws.send_bytes(_pack_frame(cmd, req_id, res_proto.SerializeToString()))
+
+                push_proto = PushNotifyResIdl_pb2.PushNotifyResIdl()
+                for msg_id in (101, 102):
+                    notify_proto = push_proto.multiMsg.add().data
+                    notify_proto.groupId = priv_gid
+                    notify_proto.msgId = msg_id
+                    notify_proto.groupType = GroupType.PRIVATE_MSG
+                await ws.send_bytes(_pack_frame(202006, 0, push_proto.SerializeToString()))
+
+            elif cmd == 202003:
+                # 请求体已加密 在此直接返回固定的消息组
+                res_proto = GetGroupMsgResIdl_pb2.GetGroupMsgResIdl()
+                group_proto = res_proto.data.groupInfo.add()
+                group_proto.groupInfo.groupId = priv_gid
+                group_proto.groupInfo.groupType = GroupType.PRIVATE_MSG
+                for msg_id in (101, 102):
+                    msg_proto = group_proto.msgList.add()
+                    msg_proto.msgId = msg_id
+                    msg_proto.content = str(msg_id)
+                fetched_mids.append(req_id)
+                await ws.send_bytes(_pack_frame(cmd, req_id, res_proto.SerializeToString()))
+        return ws
+
+    app = web.Application()
+    app.router.add_get('/', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    async with tb.Client() as client:
+        client._ws_core.ws_url = yarl.URL.build(scheme='ws', host='127.0.0.1', port=port)
+
+        notify_stream = client.notifications()
+        msg_stream = client.notifications(fetch_msgs=True)
+        assert client._ws_core.callbacks
+
+        async with notify_stream:
+            notifies = [await notify_stream.__anext__() for _ in range(2)]
+        assert [n.msg_id for n in notifies] == [101, 102]
+        assert all(n.group_id == priv_gid for n in notifies)
+
+        group = await asyncio.wait_for(msg_stream.__anext__(), 5)
+        assert [m.text for m in group.messages] == ['101', '102']
+        # 同一批推送只拉取一次
+        assert len(fetched_mids) == 1
+        assert client._ws_core.mid_manager.gid2mid[priv_gid].curr_id == 102
+
+        msg_stream.close()
+        assert not client._ws_core.callbacks
+
+    await runner.cleanup()
@@ -0,0 +1,127 @@
+import asyncio
+import socket
+
+import aiohttp
+import pytest
+import yarl
+from aiohttp import web
+
+from aiotieba.core import Network, ProxyPool, ProxyStrategy
+from aiotieba.exception import HTTPStatusError
+from aiotieba.request import send_request
+
+
+def _unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.mark.asyncio
+async def test_ProxyPool():
+    num_reqs = 0
+
+    async def handler(request: web.Request) -> web.Response:
+        nonlocal num_reqs
+        num_reqs += 1
+        return web.Response(body=b'ok')
+
+    # 充当代理的本地服务 直接响应经由其转发的请求
+    app = web.Application()
+    app.router.add_post('/c/f/pb/page', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    good = f"http://127.0.0.1:{port}"
+    dead = f"http://127.0.0.1:{_unused_port()}"
+    pool = ProxyPool([good, dead], eject_failures=2, eject_time=0.3)
+
+    async with aiohttp.TCPConnector(limit=0) as connector:
+        network = Network(connector, proxy_pool=pool)
+        url = yarl.URL.build(scheme='http', host='tieba.baidu.com', path='/c/f/pb/page')
+
+        num_fails = 0
+        for _ in range(8):
+            proxy, proxy_auth = network.select_proxy()
+            request = aiohttp.ClientRequest(
+                aiohttp.hdrs.METH_POST,
+                url,
+                data=aiohttp.BytesPayload(b'data'),
+                loop=asyncio.get_running_loop(),
+                proxy=proxy,
+                proxy_auth=proxy_auth,
+            )
+            try:
+                assert await send_request(request, network) == b'ok'
+            except aiohttp.ClientError:
+                num_fails += 1
+
+    good_node, dead_node = pool.nodes
+    assert num_fails == 2
+    assert num_reqs == 6
+    assert good_node.successes == 6
+    assert dead_node.ejections == 1
+    assert pool.available() == [good_node]
+
+    await asyncio.sleep(0.3)
+    assert pool.available() == [good_node, dead_node]
+
+    await runner.cleanup()
+
+
+def test_ProxyPool_strategy():
+    proxies = ["http://127.0.0.1:1", "http://127.0.0.1:2", "http://127.0.0.1:3"]
+
+    pool = ProxyPool(proxies, ProxyStrategy.LEAST_LATENCY)
+    for node, latency in zip(pool.nodes, [0.3, 0.1, 0.2]):
+        pool.record_success(node.url, latency)
+    assert pool.select() is pool.nodes[1]
+
+    pool = ProxyPool(proxies, ProxyStrategy.STICKY, eject_failures=1)
+    node = pool.select('account')
+    assert all(pool.select('account') is node for _ in range(4))
+    pool.record_failure(node.url)
+    assert pool.select('account') is not node
+
+
+@pytest.mark.asyncio
+async def test_ProxyPool_status_error():
+    async def handler(request: web.Request) -> web.Response:
+        return web.Response(status=404)
+
+    app = web.Application()
+    app.router.add_post('/c/f/pb/page', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    pool = ProxyPool([f"http://127.0.0.1:{port}"], eject_failures=1)
+
+    async with aiohttp.TCPConnector(limit=0) as connector:
+        network = Network(connector, proxy_pool=pool)
+        url = yarl.URL.build(scheme='http', host='tieba.baidu.com', path='/c/f/pb/page')
+        for _ in range(2):
+            proxy, proxy_auth = network.select_proxy()
+            request = aiohttp.ClientRequest(
+                aiohttp.hdrs.METH_POST,
+                url,
+                data=aiohttp.BytesPayload(b'data'),
+                loop=asyncio.get_running_loop(),
+                proxy=proxy,
+                proxy_auth=proxy_auth,
+            )
+            with pytest.raises(HTTPStatusError):
+                await send_request(request, network)
+
+    # 目标服务端返回的4xx说明代理可用 不应剔除代理
+    (node,) = pool.nodes
+    assert node.successes == 2
+    assert node.failures == 0
+    assert pool.available() == [node]
+
+    await runner.cleanup()
@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+import pytest
+
+from aiotieba.core import RateLimiter, request_priority
+from aiotieba.enums import Priority
+
+
+@pytest.mark.asyncio
+async def test_RateLimiter():
+    parent = RateLimiter(rate=100.0, burst=1.0)
+    limiter = RateLimiter(endpoints={"/c/f/pb/page": (20.0, 2.0)}, parent=parent)
+
+    start = time.monotonic()
+    await asyncio.gather(*[limiter.acquire("/c/f/pb/page") for _ in range(6)])
+    # 突发2个 其余4个按20rps放行
+    assert time.monotonic() - start >= 0.19
+
+    start = time.monotonic()
+    await asyncio.gather(*[limiter.acquire("/c/f/frs/page") for _ in range(6)])
+    # 仅受上级限流器100rps约束
+    assert time.monotonic() - start < 0.1
+
+
+@pytest.mark.asyncio
+async def test_RateLimiter_priority():
+    limiter = RateLimiter(rate=50.0, burst=1.0)
+    order = []
+
+    async def worker(name: str, priority: Priority) -> None:
+        with request_priority(priority):
+            await limiter.acquire("/c/f/pb/page")
+        order.append(name)
+
+    await limiter.acquire("/c/f/pb/page")
+    tasks = [asyncio.ensure_future(worker(f'bulk{i}', Priority.BULK)) for i in range(3)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.ensure_future(worker('del', Priority.WRITE)))
+    await asyncio.gather(*tasks)
+
+    # 后到的高优先级请求插队
+    assert order == ['del', 'bulk0', 'bulk1', 'bulk2']
+
+
+@pytest.mark.asyncio
+async def test_RateLimiter_unrelated_endpoint():
+    limiter = RateLimiter(rate=100.0, burst=1.0, endpoints={"/c/f/pb/page": (0.5, 1.0)})
+
+    await limiter.acquire("/c/f/pb/page")
+    await asyncio.sleep(0.02)
+    throttled = asyncio.ensure_future(limiter.acquire("/c/f/pb/page"))
+    await asyncio.sleep(0)
+    assert not throttled.done()
+
+    # 其他端点仅受整体100rps约束 不应等待被限流端点的定时器
+    start = time.monotonic()
+    await asyncio.wait_for(limiter.acquire("/c/f/frs/page"), 0.5)
+    await asyncio.wait_for(limiter.acquire("/c/f/frs/page"), 0.5)
+    assert time.monotonic() - start < 0.1
+    assert not throttled.done()
+
+    # 没有任何限流的端点直接放行
+    unlimited = RateLimiter(endpoints={"/c/f/pb/page": (0.5, 1.0)})
+    await unlimited.acquire("/c/f/pb/page")
+    blocked = asyncio.ensure_future(unlimited.acquire("/c/f/pb/page"))
+    await asyncio.sleep(0)
+    await asyncio.wait_for(unlimited.acquire("/c/s/login"), 0.05)
+
+    throttled.cancel()
+    blocked.cancel()
+    await asyncio.gather(throttled, blocked, return_exceptions=True)
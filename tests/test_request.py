@@ -0,0 +1,141 @@
+import asyncio
+import gzip
+import zlib
+
+import aiohttp
+import pytest
+import yarl
+from aiohttp import web
+
+from aiotieba.core import Account, HttpCore, Network
+from aiotieba.exception import ContentTooLargeError
+from aiotieba.request import pack_proto_request, pack_ws_bytes, parse_ws_bytes, send_request
+
+
+class _BufferWriter(object):
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+
+    async def write(self, chunk: bytes) -> None:
+        self.buffer += chunk
+
+
+@pytest.mark.asyncio
+async def test_pack_proto_request():
+    async with aiohttp.TCPConnector() as connector:
+        http_core = HttpCore(Account(), Network(connector), asyncio.get_running_loop())
+        url = yarl.URL.build(scheme="https", host="tiebac.baidu.com", path="/c/f/pb/page", query_string="cmd=302001")
+        data = b'\x08\x01proto'
+        request = pack_proto_request(http_core, url, data)
+
+        content_type = request.headers[aiohttp.hdrs.CONTENT_TYPE]
+        boundary = content_type.split('boundary=', 1)[1]
+
+        # 应与等价的MultipartWriter编码结果一致
+        writer = aiohttp.MultipartWriter('form-data', boundary=boundary)
+        payload_headers = {
+            aiohttp.hdrs.CONTENT_DISPOSITION: aiohttp.helpers.content_disposition_header(
+                'form-data', name='data', filename='file'
+            )
+        }
+        payload = aiohttp.BytesPayload(data, content_type='', headers=payload_headers)
+        payload.headers.popone(aiohttp.hdrs.CONTENT_TYPE)
+        writer._parts.append((payload, None, None))
+        expected = _BufferWriter()
+        await writer.write(expected)
+
+        actual = _BufferWriter()
+        await request.body.write(actual)
+
+        assert content_type == writer.content_type
+        assert actual.buffer == expected.buffer
+        assert int(request.headers[aiohttp.hdrs.CONTENT_LENGTH]) == len(expected.buffer)
+
+
+@pytest.mark.asyncio
+async def test_send_request_decompress():
+    raw = b'{"error_code":"0"}' * 1024
+
+    async def handler(request: web.Request) -> web.Response:
+        encoding = request.query['encoding']
+        if encoding == 'gzip':
+            body = gzip.compress(raw)
+        elif encoding == 'deflate':
+            body = zlib.compress(raw)
+        else:
+            body = raw
+        return web.Response(body=body, headers={aiohttp.hdrs.CONTENT_ENCODING: encoding})
+
+    app = web.Application()
+    app.router.add_get('/', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    async with aiohttp.TCPConnector() as connector:
+        network = Network(connector)
+        for encoding in ['gzip', 'deflate', 'identity']:
+            url = yarl.URL.build(scheme='http', host='127.0.0.1', port=port, path='/', query={'encoding': encoding})
+            request = aiohttp.ClientRequest(aiohttp.hdrs.METH_GET, url, loop=asyncio.get_running_loop())
+            assert await send_request(request, network) == raw
+
+    await runner.cleanup()
+
+
+def test_parse_ws_bytes():
+    account = Account()
+    data = b'\x08\x01proto' * 64
+
+    for compress in [False, True]:
+        for encrypt in [False, True]:
+            packed = pack_ws_bytes(account, data, 202006, 7, compress=compress, encrypt=encrypt)
+            res, cmd, req_id = parse_ws_bytes(account, packed)
+            assert bytes(res) == data
+            assert cmd == 202006
+            assert req_id == 7
+
+            # 独立的加密器与账号的加密器使用相同的密钥
+            res, _, _ = parse_ws_bytes(account, packed, account.new_aes_ecb_chiper())
+            assert bytes(res) == data
+    assert account.new_aes_ecb_chiper() is not account.aes_ecb_chiper
+
+
+@pytest.mark.asyncio
+async def test_send_request_max_size():
+    image = b'\xff\xd8' + b'\x00' * 64 * 1024
+
+    async def handler(request: web.Request) -> web.StreamResponse:
+        if request.query.get('chunked'):
+            # 不提供Content-Length 只能在读取过程中发现超限
+            response = web.StreamResponse()
+            response.enable_chunked_encoding()
+            await response.prepare(request)
+            for i in range(0, len(image), 4096):
+                await response.write(image[i : i + 4096])
+            await response.write_eof()
+            return response
+        return web.Response(body=image, content_type='image/jpeg')
+
+    app = web.Application()
+    app.router.add_get('/', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    async with aiohttp.TCPConnector() as connector:
+        network = Network(connector)
+        for query in [{}, {'chunked': '1'}]:
+            url = yarl.URL.build(scheme='http', host='127.0.0.1', port=port, path='/', query=query)
+
+            request = aiohttp.ClientRequest(aiohttp.hdrs.METH_GET, url, loop=asyncio.get_running_loop())
+            with pytest.raises(ContentTooLargeError):
+                await send_request(request, network, max_size=16 * 1024)
+
+            request = aiohttp.ClientRequest(aiohttp.hdrs.METH_GET, url, loop=asyncio.get_running_loop())
+            assert await send_request(request, network, max_size=len(image)) == image
+
+    await runner.cleanup()
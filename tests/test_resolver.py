@@ -0,0 +1,51 @@
+import asyncio
+import socket
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from aiotieba.core import PinnedResolver
+
+
+@pytest.mark.asyncio
+async def test_PinnedResolver_failover():
+    async def handler(request: web.Request) -> web.Response:
+        return web.Response(body=b'ok')
+
+    app = web.Application()
+    app.router.add_get('/', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    # 127.0.0.2上没有监听 连接会被拒绝
+    async with PinnedResolver(hosts=(), overrides={'tieba.test': ['127.0.0.2', '127.0.0.1']}) as resolver:
+        res = await resolver.resolve('tieba.test', port)
+        assert [r['host'] for r in res] == ['127.0.0.2', '127.0.0.1']
+        assert res[0]['port'] == port
+
+        connector = aiohttp.TCPConnector(use_dns_cache=False, resolver=resolver, force_close=True)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            for _ in range(3):
+                async with session.get(f"http://tieba.test:{port}/") as response:
+                    assert await response.read() == b'ok'
+
+    await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_PinnedResolver_refresh():
+    async with PinnedResolver(hosts=('localhost',), ttl=0.5, refresh_ahead=0.4) as resolver:
+        await asyncio.sleep(0.1)
+        record = resolver._records[('localhost', socket.AF_INET)]
+        assert ('127.0.0.1', socket.AF_INET) in record.addrs
+
+        expire_time = record.expire_time
+        await asyncio.sleep(1.2)
+        assert resolver._records[('localhost', socket.AF_INET)].expire_time > expire_time
+
+        res = await resolver.resolve('localhost')
+        assert res[0]['host'] == '127.0.0.1'
@@ -0,0 +1,96 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+import aiotieba as tb
+from aiotieba.exception import HTTPStatusError, TiebaServerError
+from aiotieba.helper.retry import TRANSIENT_CODES, RetryPolicies, RetryPolicy
+
+
+def test_RetryPolicy_is_retryable():
+    policy = RetryPolicy()
+
+    assert policy.is_retryable(aiohttp.ServerDisconnectedError())
+    assert policy.is_retryable(asyncio.TimeoutError())
+    assert policy.is_retryable(HTTPStatusError(503, "Service Unavailable"))
+    assert not policy.is_retryable(HTTPStatusError(404, "Not Found"))
+    assert all(policy.is_retryable(TiebaServerError(code, "")) for code in TRANSIENT_CODES)
+    assert not policy.is_retryable(TiebaServerError(1, ""))
+    assert not policy.is_retryable(ValueError())
+
+    policy = RetryPolicy(retry_codes=(1,))
+    assert policy.is_retryable(TiebaServerError(1, ""))
+    assert not policy.is_retryable(TiebaServerError(next(iter(TRANSIENT_CODES)), ""))
+
+
+def test_RetryPolicy_backoff():
+    policy = RetryPolicy(base_delay=0.1, max_delay=0.5)
+
+    for attempt, cap in ((1, 0.1), (2, 0.2), (3, 0.4), (4, 0.5), (10, 0.5)):
+        delays = [policy.backoff(attempt) for _ in range(200)]
+        assert all(0.0 <= d <= cap for d in delays)
+    # 完全抖动 退避时间不应恒定
+    assert len({policy.backoff(3) for _ in range(20)}) > 1
+
+
+@pytest.mark.asyncio
+async def test_RetryPolicies_call():
+    policies = RetryPolicies()
+    calls = 0
+
+    async def flaky():
+        nonlocal calls
+        calls += 1
+        if calls < 3:
+            raise aiohttp.ServerDisconnectedError()
+        return calls
+
+    # 默认不重试
+    with pytest.raises(aiohttp.ServerDisconnectedError):
+        await policies.call('get_threads', flaky)
+    assert calls == 1
+
+    calls = 0
+    policies.default = RetryPolicy(max_attempts=3, base_delay=0.001)
+    assert await policies.call('get_threads', flaky) == 3
+    stats = policies._stats['get_threads']
+    assert (stats.calls, stats.retries, stats.successes, stats.giveups) == (1, 2, 1, 0)
+
+    calls = 0
+    policies.default = RetryPolicy(max_attempts=2, base_delay=0.001)
+    with pytest.raises(aiohttp.ServerDisconnectedError):
+        await policies.call('get_threads', flaky)
+    assert calls == 2
+    assert stats.giveups == 1
+
+    async def fatal():
+        nonlocal calls
+        calls += 1
+        raise TiebaServerError(1, "")
+
+    calls = 0
+    with pytest.raises(TiebaServerError):
+        await policies.call('get_posts', fatal)
+    assert calls == 1
+
+    # 超出时间预算时不再重试
+    calls = 0
+    policies.default = RetryPolicy(max_attempts=10, base_delay=1.0, max_delay=1.0, deadline=0.0)
+    with pytest.raises(aiohttp.ServerDisconnectedError):
+        await policies.call('get_threads', flaky)
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_Client_retry_policies():
+    async with tb.Client() as client:
+        policies = client.retry_policies
+        assert policies.default is None
+        assert policies[client.get_threads] is None
+
+        policy = RetryPolicy(max_attempts=5)
+        policies[client.get_threads] = policy
+        assert policies[client.get_threads] is policy
+        assert policies[client.get_posts] is None
+        assert policies.stats(client.get_threads).calls == 0
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from aiotieba.helper.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_SingleFlight_coalesce():
+    single_flight = SingleFlight()
+    num_calls = 0
+
+    async def fetch() -> object:
+        nonlocal num_calls
+        num_calls += 1
+        await asyncio.sleep(0.01)
+        return object()
+
+    results = await asyncio.gather(*[single_flight.do('get_fid', ('tieba',), {}, fetch) for _ in range(8)])
+    assert num_calls == 1
+    assert all(res is results[0] for res in results)
+    assert single_flight.inflight == 0
+
+    # 参数不同或已完成的调用不合并
+    await asyncio.gather(
+        single_flight.do('get_fid', ('a',), {}, fetch),
+        single_flight.do('get_fid', ('b',), {}, fetch),
+    )
+    await single_flight.do('get_fid', ('tieba',), {}, fetch)
+    assert num_calls == 4
+
+
+@pytest.mark.asyncio
+async def test_SingleFlight_exception():
+    single_flight = SingleFlight()
+    num_calls = 0
+
+    async def fail() -> None:
+        nonlocal num_calls
+        num_calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        *[single_flight.do('get_fname', (1,), {}, fail) for _ in range(4)], return_exceptions=True
+    )
+    assert num_calls == 1
+    assert all(isinstance(res, ValueError) for res in results)
+    assert single_flight.inflight == 0
+
+    # 失败的调用已被清理 下次调用重新执行
+    with pytest.raises(ValueError):
+        await single_flight.do('get_fname', (1,), {}, fail)
+    assert num_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_SingleFlight_cancel_and_disable():
+    single_flight = SingleFlight()
+    num_calls = 0
+
+    async def fetch() -> int:
+        nonlocal num_calls
+        num_calls += 1
+        await asyncio.sleep(0.05)
+        return num_calls
+
+    # 单个调用者被取消不影响其他调用者
+    task = asyncio.create_task(single_flight.do('get_fid', ('x',), {}, fetch))
+    other = asyncio.create_task(single_flight.do('get_fid', ('x',), {}, fetch))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    assert await other == 1
+
+    async def get_fid() -> None:
+        pass
+
+    assert single_flight[get_fid]
+    single_flight[get_fid] = False
+    assert not single_flight[get_fid]
+    await asyncio.gather(*[single_flight.do('get_fid', ('x',), {}, fetch) for _ in range(3)])
+    assert num_calls == 4
+
+    # 不可哈希的参数直接执行
+    await single_flight.do('get_fname', ([1],), {}, fetch)
+    assert num_calls == 5
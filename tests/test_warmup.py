@@ -0,0 +1,38 @@
+import asyncio
+
+import aiohttp
+import pytest
+import yarl
+
+from aiotieba.core import Network
+from aiotieba.request import warmup_conns
+
+
+@pytest.mark.asyncio
+async def test_warmup_conns():
+    num_accepted = 0
+
+    async def on_accept(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        nonlocal num_accepted
+        num_accepted += 1
+        await reader.read()
+        writer.close()
+
+    server = await asyncio.start_server(on_accept, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    url = yarl.URL.build(scheme='http', host='127.0.0.1', port=port)
+    loop = asyncio.get_running_loop()
+
+    async with aiohttp.TCPConnector(limit=0) as connector:
+        network = Network(connector)
+        assert await warmup_conns(url, network, 3, loop) == 3
+        await asyncio.sleep(0.05)
+        assert num_accepted == 3
+
+        # 空闲连接被复用而非重新建立
+        assert await warmup_conns(url, network, 3, loop) == 3
+        await asyncio.sleep(0.05)
+        assert num_accepted == 3
+
+    server.close()
+    await server.wait_closed()
@@ -0,0 +1,122 @@
+import asyncio
+import os
+
+import aiohttp
+import pytest
+import yarl
+from aiohttp import web
+
+from aiotieba.core import Account, LoopLagMonitor, Network, WsCore
+from aiotieba.helper import WsStatus
+from aiotieba.request.websocket import pack_ws_bytes
+
+
+@pytest.mark.asyncio
+async def test_WsCore_offload():
+    account = Account()
+    payload = b'tieba' * 64 * 1024
+
+    async def handler(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for msg in ws:
+            cmd = int.from_bytes(msg.data[1:5], 'big')
+            req_id = int.from_bytes(msg.data[5:9], 'big')
+            if cmd == 302001:
+                await ws.send_bytes(pack_ws_bytes(account, payload, cmd, req_id, compress=True))
+            else:
+                # 无法通过填充校验的加密帧
+                await ws.send_bytes(b'\x88' + msg.data[1:9] + b'\x80' * 4096)
+        return ws
+
+    app = web.Application()
+    app.router.add_get('/', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    async with aiohttp.TCPConnector(limit=0) as connector, LoopLagMonitor(interval=0.01) as monitor:
+        for threshold in (0, 1024):
+            ws_core = WsCore(account, Network(connector), asyncio.get_running_loop(), offload_threshold=threshold)
+            ws_core.ws_url = yarl.URL.build(scheme='ws', host='127.0.0.1', port=port)
+            await ws_core.connect()
+            ws_core._status = WsStatus.OPEN
+
+            resps = [await ws_core.send(b'', 302001) for _ in range(4)]
+            results = await asyncio.gather(*[resp.read() for resp in resps])
+            assert all(bytes(res) == payload for res in results)
+
+            # 解包失败只结束对应的请求
+            resp = await ws_core.send(b'', 309616, encrypt=False)
+            with pytest.raises(ValueError):
+                await resp.read()
+            assert ws_core.status == WsStatus.OPEN
+            resp = await ws_core.send(b'', 302001)
+            assert bytes(await resp.read()) == payload
+
+            await ws_core.close()
+
+    assert len(monitor) > 0
+    assert monitor.max_lag >= monitor.percentile(0.5) >= 0.0
+
+    await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_WsCore_offload_order():
+    account = Account()
+    # 不可压缩的数据 使线程池中的解包耗时明显长于小帧
+    payload = os.urandom(2 * 1024 * 1024)
+
+    async def handler(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        reqs = []
+        async for msg in ws:
+            reqs.append((int.from_bytes(msg.data[1:5], 'big'), int.from_bytes(msg.data[5:9], 'big')))
+            if len(reqs) == 2:
+                # 先发送需要卸载的大帧 紧接着发送在事件循环中解包的小帧
+                for cmd, req_id in reqs:
+                    data = payload if cmd == 302001 else b'tieba'
+                    await ws.send_bytes(pack_ws_bytes(account, data, cmd, req_id, compress=True))
+                reqs.clear()
+        return ws
+
+    app = web.Application()
+    app.router.add_get('/', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    async with aiohttp.TCPConnector(limit=0) as connector:
+        # 默认不卸载
+        assert WsCore(account, Network(connector), asyncio.get_running_loop()).offload_threshold == 0
+
+        ws_core = WsCore(account, Network(connector), asyncio.get_running_loop(), offload_threshold=1024)
+        ws_core.ws_url = yarl.URL.build(scheme='ws', host='127.0.0.1', port=port)
+        await ws_core.connect()
+        ws_core._status = WsStatus.OPEN
+
+        order = []
+
+        async def read(resp, name: str) -> None:
+            await resp.read()
+            order.append(name)
+
+        for _ in range(3):
+            big = await ws_core.send(b'', 302001)
+            small = await ws_core.send(b'', 302002)
+            await asyncio.gather(read(small, 'small'), read(big, 'big'))
+            # 卸载的帧不会被其后在事件循环中解包的帧超过
+            assert order == ['big', 'small']
+            order.clear()
+
+        # 分发完成后不再持有任务
+        assert ws_core.conns[0].offloading is None
+        await ws_core.close()
+
+    await runner.cleanup()
@@ -0,0 +1,54 @@
+import asyncio
+import collections
+
+import aiohttp
+import pytest
+import yarl
+from aiohttp import web
+
+from aiotieba.core import Account, Network, WsCore
+from aiotieba.helper import WsStatus
+
+
+@pytest.mark.asyncio
+async def test_WsCore_pool():
+    frames = collections.Counter()
+
+    async def handler(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        # 逐帧串行处理并原样返回 模拟单个连接的队头阻塞
+        async for msg in ws:
+            frames[id(ws)] += 1
+            await asyncio.sleep(0.005)
+            await ws.send_bytes(msg.data)
+        return ws
+
+    app = web.Application()
+    app.router.add_get('/', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    async with aiohttp.TCPConnector(limit=0) as connector:
+        ws_core = WsCore(Account(), Network(connector), asyncio.get_running_loop(), pool_size=4)
+        ws_core.ws_url = yarl.URL.build(scheme='ws', host='127.0.0.1', port=port)
+        await ws_core.connect()
+        ws_core._status = WsStatus.OPEN
+        assert len(ws_core.conns) == 4
+
+        async def echo(i: int) -> bytes:
+            resp = await ws_core.send(str(i).encode(), 309616, encrypt=False)
+            return bytes(await resp.read())
+
+        results = await asyncio.gather(*[echo(i) for i in range(40)])
+        assert results == [str(i).encode() for i in range(40)]
+        assert sorted(frames.values()) == [10, 10, 10, 10]
+        assert all(conn.outstanding == 0 for conn in ws_core.conns)
+
+        await ws_core.close()
+        assert ws_core.status == WsStatus.CLOSED
+
+    await runner.cleanup()
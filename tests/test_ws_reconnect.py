@@ -0,0 +1,155 @@
+import asyncio
+
+import aiohttp
+import pytest
+import yarl
+from aiohttp import web
+
+from aiotieba.core import Account, Network, WsCore
+from aiotieba.helper import WsStatus
+
+
+@pytest.mark.asyncio
+async def test_WsCore_reconnect():
+    num_conns = 0
+
+    async def handler(request: web.Request) -> web.WebSocketResponse:
+        nonlocal num_conns
+        num_conns += 1
+        conn_idx = num_conns
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for msg in ws:
+            cmd = int.from_bytes(msg.data[1:5], 'big')
+            # 第一个连接与发送私信的请求都会在回复前断开
+            if conn_idx == 1 or cmd == 205001:
+                await ws.close()
+                break
+            await ws.send_bytes(msg.data)
+        return ws
+
+    app = web.Application()
+    app.router.add_get('/', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    async with aiohttp.TCPConnector(limit=0) as connector:
+        ws_core = WsCore(Account(), Network(connector), asyncio.get_running_loop())
+        ws_core.ws_url = yarl.URL.build(scheme='ws', host='127.0.0.1', port=port)
+        ws_core.reconnect_delay = 0.05
+
+        num_handshakes = 0
+
+        async def handshake(conn) -> None:
+            nonlocal num_handshakes
+            num_handshakes += 1
+
+        ws_core.handshake = handshake
+        await ws_core.connect()
+        ws_core._status = WsStatus.OPEN
+
+        # 幂等请求在重连后被透明地重放
+        resp = await ws_core.send(b'replay', 309616, encrypt=False)
+        assert bytes(await resp.read()) == b'replay'
+        assert num_conns == 2
+        assert num_handshakes == 1
+        assert ws_core.status == WsStatus.OPEN
+
+        # 非幂等请求在连接断开时立即失败
+        resp = await ws_core.send(b'msg', 205001, encrypt=False)
+        with pytest.raises(ConnectionResetError):
+            await resp.read()
+
+        for _ in range(50):
+            if ws_core.status == WsStatus.OPEN:
+                break
+            await asyncio.sleep(0.02)
+        assert ws_core.status == WsStatus.OPEN
+        assert num_handshakes == 2
+
+        resp = await ws_core.send(b'echo', 309616, encrypt=False)
+        assert bytes(await resp.read()) == b'echo'
+
+        await ws_core.close()
+        assert ws_core.status == WsStatus.CLOSED
+        assert len(ws_core.conns) == 0
+
+    await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_WsCore_send_while_reconnecting():
+    num_conns = 0
+
+    async def handler(request: web.Request) -> web.WebSocketResponse:
+        nonlocal num_conns
+        num_conns += 1
+        conn_idx = num_conns
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for msg in ws:
+            if conn_idx == 1:
+                await ws.close()
+                break
+            await ws.send_bytes(msg.data)
+        return ws
+
+    app = web.Application()
+    app.router.add_get('/', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    async with aiohttp.TCPConnector(limit=0) as connector:
+        ws_core = WsCore(Account(), Network(connector), asyncio.get_running_loop())
+        ws_core.ws_url = yarl.URL.build(scheme='ws', host='127.0.0.1', port=port)
+        ws_core.reconnect_delay = 0.05
+
+        gate = asyncio.Event()
+
+        async def handshake(conn) -> None:
+            await gate.wait()
+
+        ws_core.handshake = handshake
+        await ws_core.connect()
+        ws_core._status = WsStatus.OPEN
+
+        first = await ws_core.send(b'first', 309616, encrypt=False)
+        for _ in range(50):
+            if not ws_core.conns:
+                break
+            await asyncio.sleep(0.02)
+        assert not ws_core.conns
+
+        # 全部连接断开且正在重连时 幂等请求暂存至重连后发出 非幂等请求立即失败
+        parked = await ws_core.send(b'parked', 309616, encrypt=False)
+        with pytest.raises(ConnectionResetError):
+            await ws_core.send(b'msg', 205001, encrypt=False)
+        assert ws_core.num_pending == 2
+
+        # 重连期间状态同样为CONNECTING 应等待重连而不是重新连接
+        assert ws_core.status == WsStatus.CONNECTING
+        waiter = asyncio.ensure_future(ws_core.wait_reconnect())
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+
+        gate.set()
+        assert await waiter
+        assert ws_core.status == WsStatus.OPEN
+        assert bytes(await first.read()) == b'first'
+        assert bytes(await parked.read()) == b'parked'
+
+        # 未在重连时无可用连接则直接失败
+        await ws_core.close()
+        assert not await ws_core.wait_reconnect()
+        with pytest.raises(ConnectionResetError):
+            await ws_core.send(b'closed', 309616, encrypt=False)
+
+    await runner.cleanup()
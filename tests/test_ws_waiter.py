@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from aiotieba.core.websocket import WsWaiter
+
+
+@pytest.mark.asyncio
+async def test_WsWaiter():
+    waiter = WsWaiter(asyncio.get_running_loop(), 0.2)
+
+    resps = [waiter.new() for _ in range(4)]
+    assert len(waiter) == 4
+
+    waiter.set_done(resps[0].req_id, b'done')
+    assert bytes(await resps[0].read()) == b'done'
+    assert len(waiter) == 3
+
+    # 被取消的读取立即从映射中移除
+    task = asyncio.create_task(resps[1].read())
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert len(waiter) == 2
+
+    await asyncio.sleep(0.1)
+    assert 0.1 <= waiter.oldest_pending_age < 0.2
+
+    # 剩余的请求由同一次扫描统一超时
+    for resp in resps[2:]:
+        with pytest.raises(asyncio.TimeoutError):
+            await resp.read()
+    assert len(waiter) == 0
+    assert waiter.oldest_pending_age == 0.0
+
+    # 迟到的响应被忽略
+    waiter.set_done(resps[2].req_id, b'late')
+
+
+@pytest.mark.asyncio
+async def test_WsWaiter_adopt():
+    loop = asyncio.get_running_loop()
+    old = WsWaiter(loop, 0.2)
+    new = WsWaiter(loop, 10.0)
+
+    resp = old.new()
+    (pending,) = old.pop_pending()
+    new.adopt(pending)
+    assert len(old) == 0 and len(new) == 1
+
+    # 接管后保留原有的截止时刻
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(resp.read(), 1.0)
+    assert len(new) == 0